@@ -7,8 +7,11 @@ import os
 import sys
 import pandas as pd
 from datetime import datetime
-from run_strategy_timeframe import run_strategy_with_timeframe
+from run_strategy_timeframe import run_strategy_with_timeframe, strategy_job
 from config import TradingConfig
+from utils.result_store import ResultStore
+from utils.job_queue import JobQueue
+from utils.profiler import BacktestProfiler, NULL_PROFILER
 
 def get_all_strategies():
     """Get list of all available strategies"""
@@ -33,11 +36,33 @@ def get_all_strategies():
 def analyze_all_strategies(symbol='SUIUSDT', start_date='2025-01-01', end_date='2025-08-22',
                           initial_balance=1000, reward_ratio=1.0, is_reverse=True,
                           no_fees=True, trailing_ratio=0, enable_scaling=True, 
-                          scaling_multiplier=1.0, timeframes=['5m', '15m', '30m', '1h', '4h']):
+                          scaling_multiplier=1.0, timeframes=['5m', '15m', '30m', '1h', '4h'], base_timeframe=None,
+                          result_store_path='cache/results.sqlite', enqueue_path=None, profile_memory=False):
     """
     Analyze all strategies with fixed parameters
+    
+    base_timeframe: Fetch only this timeframe and derive the others locally (e.g. '5m')
+    result_store_path: SQLite store of finished cells; a rerun only computes cells whose
+                       candles, parameters or backtest code changed (None = recompute all)
+    enqueue_path: Only add the cells to this job queue for job_worker.py processes; rerun
+                  without it once the queue is drained to build the report from the store
+    profile_memory: Print the peak and retained memory of each phase (fetch, indicators,
+                    simulation, metrics, report) over the whole sweep
     """
     
+    if enqueue_path:
+        jobs = [
+            strategy_job(strategy, timeframe, symbol, start_date, end_date, initial_balance,
+                         reward_ratio=reward_ratio, trailing_ratio=trailing_ratio, is_reverse=is_reverse,
+                         enable_scaling=enable_scaling, scaling_threshold=1.0,
+                         scaling_multiplier=scaling_multiplier, no_fees=no_fees, base_timeframe=base_timeframe)
+            for strategy in get_all_strategies() for timeframe in timeframes
+        ]
+        with JobQueue(enqueue_path) as queue:
+            added = queue.enqueue(jobs)
+        print(f"📥 Queued {added} new of {len(jobs)} cells in {enqueue_path}")
+        return None
+    
     # Create reports directory
     reports_dir = 'reports'
     if not os.path.exists(reports_dir):
@@ -51,6 +76,8 @@ def analyze_all_strategies(symbol='SUIUSDT', start_date='2025-01-01', end_date='
     all_results = []
     
     strategies = get_all_strategies()
+    result_store = ResultStore(result_store_path) if result_store_path else None
+    profiler = BacktestProfiler(timing=False, memory=True) if profile_memory else NULL_PROFILER
     
     print(f"🔍 ANALYZING {len(strategies)} STRATEGIES")
     print(f"🪙 SYMBOL: {symbol}")
@@ -61,6 +88,8 @@ def analyze_all_strategies(symbol='SUIUSDT', start_date='2025-01-01', end_date='
     print(f"💰 FEES: {'Disabled' if no_fees else 'Enabled'}")
     print(f"📈 SCALING: {'Yes' if enable_scaling else 'No'} (x{scaling_multiplier})")
     print(f"⏰ TIMEFRAMES: {', '.join(timeframes)}")
+    if base_timeframe:
+        print(f"🧱 BASE TIMEFRAME: {base_timeframe} (higher timeframes resampled locally)")
     print("=" * 80)
     
     # Process each strategy
@@ -88,7 +117,10 @@ def analyze_all_strategies(symbol='SUIUSDT', start_date='2025-01-01', end_date='
                     scaling_threshold=1.0,
                     scaling_multiplier=scaling_multiplier,
                     no_fees=no_fees,
-                    trailing_ratio=trailing_ratio
+                    trailing_ratio=trailing_ratio,
+                    base_timeframe=base_timeframe,
+                    result_store=result_store,
+                    profiler=profiler
                 )
                 
                 if result and 'metrics' in result:
@@ -127,15 +159,21 @@ def analyze_all_strategies(symbol='SUIUSDT', start_date='2025-01-01', end_date='
             best_result = max(strategy_results, key=lambda x: x['total_return'])
             all_results.append(best_result)
     
+    if result_store is not None:
+        result_store.close()
+    
     # Sort all results by total return
     all_results.sort(key=lambda x: x['total_return'], reverse=True)
     
     # Generate report
-    generate_report(all_results, report_filename, symbol, start_date, end_date, 
-                   initial_balance, reward_ratio, is_reverse, no_fees, 
-                   enable_scaling, scaling_multiplier, timeframes)
+    with profiler.memory('report'):
+        generate_report(all_results, report_filename, symbol, start_date, end_date, 
+                       initial_balance, reward_ratio, is_reverse, no_fees, 
+                       enable_scaling, scaling_multiplier, timeframes)
     
     print(f"\n📊 REPORT GENERATED: {report_filename}")
+    if profiler.enabled:
+        print(f"\n{BacktestProfiler.format_profile(profiler.summary())}")
     return all_results
 
 def generate_report(results, filename, symbol, start_date, end_date, 
@@ -235,6 +273,10 @@ if __name__ == "__main__":
     parser.add_argument('--trailing_ratio', type=float, default=0, help='Trailing ratio')
     parser.add_argument('--enable_scaling', type=int, choices=[0, 1], default=1, help='Enable scaling')
     parser.add_argument('--scaling_multiplier', type=float, default=1.0, help='Scaling multiplier')
+    parser.add_argument('--base_timeframe', default=None, help='Derive higher timeframes from this timeframe (e.g., 5m)')
+    parser.add_argument('--result_store', default='cache/results.sqlite', help='SQLite store of finished cells (empty string = recompute all)')
+    parser.add_argument('--enqueue', default=None, help='Only queue the cells in this job queue for job_worker.py (e.g., cache/jobs.sqlite)')
+    parser.add_argument('--profile_memory', type=int, choices=[0, 1], default=0, help='Print peak/retained memory per pipeline phase over the sweep')
     
     args = parser.parse_args()
     
@@ -249,7 +291,14 @@ if __name__ == "__main__":
         no_fees=bool(args.no_fees),
         trailing_ratio=args.trailing_ratio,
         enable_scaling=bool(args.enable_scaling),
-        scaling_multiplier=args.scaling_multiplier
+        scaling_multiplier=args.scaling_multiplier,
+        base_timeframe=args.base_timeframe,
+        result_store_path=args.result_store or None,
+        enqueue_path=args.enqueue,
+        profile_memory=bool(args.profile_memory)
     )
     
-    print(f"\n✅ Analysis completed! Check the reports folder for detailed results.")
+    if args.enqueue:
+        print(f"👷 Run: python job_worker.py --queue {args.enqueue} --result_store {args.result_store}")
+    else:
+        print(f"\n✅ Analysis completed! Check the reports folder for detailed results.")
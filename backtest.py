@@ -3,26 +3,54 @@ import numpy as np
 from datetime import datetime, timedelta
 import ccxt
 import logging
+import tempfile
 from config import TradingConfig
 from strategies import TradingStrategies
 from indicators import TechnicalIndicators
-from utils import get_cached_fetcher
+from utils import get_cached_fetcher, MultiTimeframeView
+from utils.resampler import can_resample
+from utils.intrabar import IntrabarResolver
+from utils.compact_frame import compact_frame, expand_frame, is_compact
+from utils.ensemble import parse_ensemble_name, combine_signals
+from utils.signal_arrays import SignalLookup
+from utils.profiler import NULL_PROFILER
+from time import perf_counter
 
 class Backtester:
-    def __init__(self, config=None):
+    def __init__(self, config=None, base_timeframe=None, exchange=None, cache_dir=None):
+        """
+        Args:
+            config: TradingConfig instance
+            base_timeframe: Derive higher timeframes from this cached timeframe
+                            (default: TradingConfig.RESAMPLE_BASE_TIMEFRAME)
+            exchange: ccxt-compatible exchange to fetch from (default: ccxt.binance,
+                      e.g. utils.fake_exchange.FakeExchange offline)
+            cache_dir: Candle cache directory (default: cache for Binance; a private
+                       temporary directory for any other exchange, since cache keys
+                       carry no exchange and its candles must not mix with Binance's)
+        """
         self.config = config or TradingConfig()
         self.strategies = TradingStrategies(self.config)
         self.indicators = TechnicalIndicators()
         
         # Initialize exchange for historical data
-        self.exchange = ccxt.binance({
+        self.exchange = exchange or ccxt.binance({
             'enableRateLimit': True
         })
         
         # Initialize cached data fetcher
         from utils import DataFetcher
         self.data_fetcher = DataFetcher(self.exchange)
-        self.cached_fetcher = get_cached_fetcher(self.data_fetcher)
+        self.base_timeframe = base_timeframe or self.config.RESAMPLE_BASE_TIMEFRAME
+        self._cache_tmp = None
+        if cache_dir is None:
+            if exchange is None:
+                cache_dir = 'cache'
+            else:
+                # Removed with the Backtester
+                self._cache_tmp = tempfile.TemporaryDirectory(prefix=f"{getattr(exchange, 'id', 'exchange')}_cache_")
+                cache_dir = self._cache_tmp.name
+        self.cached_fetcher = get_cached_fetcher(self.data_fetcher, cache_dir=cache_dir, base_timeframe=self.base_timeframe)
         
         self.results = {
             'trades': [],
@@ -30,7 +58,7 @@ class Backtester:
             'metrics': {}
         }
     
-    def run_backtest(self, symbol, start_date, end_date, initial_balance=10000, strategy_name='all', timeframe='1h', enable_scaling=False, scaling_threshold=1.0, scaling_multiplier=2.0, no_fees=False, reward_ratio=3.0):
+    def run_backtest(self, symbol, start_date, end_date, initial_balance=10000, strategy_name='all', timeframe='1h', enable_scaling=False, scaling_threshold=1.0, scaling_multiplier=2.0, no_fees=False, reward_ratio=3.0, data=None, higher_timeframes=None, htf_trend_filter=None, intrabar_timeframe=None, intrabar_data=None, indicators_ready=False, early_stop=None, checkpoint=None, profiler=None):
         """
         Run backtest on historical data
         
@@ -39,60 +67,327 @@ class Backtester:
             start_date: Start date (datetime)
             end_date: End date (datetime)
             initial_balance: Initial balance
-            strategy_name: Strategy to test ('all' for all strategies)
+            strategy_name: Strategy to test ('all' / 'all_vote' for the ENSEMBLE_STRATEGIES ensemble)
             timeframe: Timeframe to use ('5m', '15m', '30m', '1h', '2h', '4h')
+            data: Pre-loaded OHLCV DataFrame (optional, skips fetching)
+            higher_timeframes: Higher timeframes exposed to strategies through
+                               data.attrs['mtf_view'] (e.g. ['1h', '4h'])
+            htf_trend_filter: Only take trades in the EMA20/EMA50 trend direction of
+                              the last closed bar of this timeframe (e.g. '1h')
+            intrabar_timeframe: Exit on high/low touches and use this lower timeframe
+                                (e.g. '1m', '5m') to decide which level was hit first
+            intrabar_data: Pre-loaded intrabar_timeframe candles (optional, skips fetching)
+            indicators_ready: `data` already holds this backtester's indicators
+                              (e.g. a shared frame from utils.shared_frames); it is
+                              used as-is and never modified
+            early_stop: Called after every bar as early_stop(time, balance, peak_balance,
+                        initial_balance); a non-empty return value (the reason) ends
+                        the backtest there, e.g. utils.early_stop.EarlyStop thresholds
+            checkpoint: utils.checkpoint.BacktestCheckpoint; the engine state is saved
+                        periodically and a rerun of the same backtest with the same
+                        checkpoint continues from the last save (see resume_backtest)
+            profiler: utils.profiler.BacktestProfiler; times each stage (signals, exit
+                      checks, PnL, equity, indicators, ...), optionally tracks the
+                      memory of the fetch, indicators, simulation and finish phases,
+                      and adds its summary to the results as 'profile' (None = off)
         
         Returns:
             dict: Backtest results
         """
         logging.info(f"Starting backtest for {symbol} from {start_date} to {end_date}")
+        profiler = profiler or NULL_PROFILER
         
         # Fetch historical data
-        data = self._fetch_historical_data(symbol, start_date, end_date, timeframe)
+        if data is None:
+            with profiler.stage('fetch'), profiler.memory('fetch'):
+                data = self._fetch_historical_data(symbol, start_date, end_date, timeframe)
         if data.empty:
             logging.error("No historical data available")
             return None
         
+        # Saved state of an interrupted run with these candles and arguments
+        resume_state = None
+        if checkpoint is not None:
+            resume_state = checkpoint.bind(data, {
+                'symbol': symbol, 'start_date': start_date, 'end_date': end_date,
+                'initial_balance': initial_balance, 'strategy_name': strategy_name, 'timeframe': timeframe,
+                'enable_scaling': enable_scaling, 'scaling_threshold': scaling_threshold,
+                'scaling_multiplier': scaling_multiplier, 'no_fees': no_fees, 'reward_ratio': reward_ratio,
+                'higher_timeframes': higher_timeframes, 'htf_trend_filter': htf_trend_filter,
+                'intrabar_timeframe': intrabar_timeframe, 'early_stop': early_stop
+            })
+        
         # Get trading fee info for this symbol
         symbol_trading_fee_info = self.config.get_trading_fee_info(symbol, no_fees)
         
-        # Initialize backtest variables
-        balance = initial_balance
-        savings_account = 0.0  # Initialize savings account
-        position = None
-        trades = []
-        equity_curve = []
+        with profiler.memory('indicators'):
+            # Strategies read signal columns by name, so packed flags are unpacked
+            if is_compact(data):
+                data = expand_frame(data)
+
+            # Add indicators to data
+            if indicators_ready:
+                # Shallow copy so attrs set below don't leak into the caller's frame
+                data = data.copy(deep=False)
+            else:
+                with profiler.stage('indicators'):
+                    data = self._add_indicators(data, profiler)
+            if self.config.COMPACT_FRAMES:
+                # float32 indicators; prices stay float64 for fills and PnL
+                data = compact_frame(data, pack_flags=False)
+        
+        # Higher timeframe context, aligned once to the base bars
+        htf_trend = None
+        if higher_timeframes or htf_trend_filter:
+            mtf_timeframes = list(higher_timeframes or [])
+            if htf_trend_filter and htf_trend_filter not in mtf_timeframes:
+                mtf_timeframes.append(htf_trend_filter)
+            with profiler.stage('higher_timeframes'), profiler.memory('higher_timeframes'):
+                mtf_view = self._build_mtf_view(symbol, start_date, end_date, data, timeframe, mtf_timeframes)
+            data.attrs['mtf_view'] = mtf_view
+            if htf_trend_filter:
+                htf_trend = mtf_view.trend(htf_trend_filter)
+        
+        # Lower timeframe candles for intrabar exit ordering
+        intrabar = None
+        if intrabar_timeframe:
+            sub_data = intrabar_data
+            if sub_data is None:
+                with profiler.memory('intrabar_fetch'):
+                    sub_data = self._fetch_historical_data(symbol, start_date, end_date, intrabar_timeframe)
+            if sub_data.empty:
+                logging.warning(f"No {intrabar_timeframe} data for intrabar exits, using bar high/low only")
+            with profiler.stage('intrabar_setup'), profiler.memory('intrabar_setup'):
+                intrabar = IntrabarResolver(data, timeframe, sub_data, intrabar_timeframe)
+        
+        # Ensembles are evaluated for every bar at once from the indicator columns
+        ensemble_signals = None
+        if parse_ensemble_name(strategy_name) is not None:
+            with profiler.stage('ensemble_setup'), profiler.memory('ensemble_setup'):
+                ensemble_signals = SignalLookup(self, data, strategy_name, timeframe)
+        
+        # Engine state carried from bar to bar (and across checkpoints)
+        state = self._initial_state(initial_balance)
+        first_bar = 0
+        if resume_state is not None:
+            first_bar = resume_state['next_bar']
+            state.update({name: resume_state[name] for name in state})
+            if intrabar is not None and resume_state['intrabar_stats'] is not None:
+                intrabar.stats = resume_state['intrabar_stats']
+        
+        with profiler.memory('simulation'):
+            last_bar, early_stopped = self._run_bars(
+                data, first_bar, state, symbol_trading_fee_info, initial_balance, strategy_name, timeframe,
+                enable_scaling, scaling_threshold, scaling_multiplier, reward_ratio,
+                htf_trend=htf_trend, intrabar=intrabar, ensemble_signals=ensemble_signals,
+                early_stop=early_stop, checkpoint=checkpoint, profiler=profiler
+            )
+        
+        with profiler.stage('finish'), profiler.memory('finish'):
+            self.results = self._finish_backtest(data, last_bar, state, initial_balance, symbol_trading_fee_info,
+                                                 early_stopped)
+        
+        if intrabar is not None:
+            self.results['intrabar_stats'] = intrabar.stats
+        if profiler.enabled:
+            self.results['profile'] = profiler.summary()
+        
+        if self.results['account_blown']:
+            logging.warning(f"Backtest completed with ACCOUNT BLOWN! Final balance: {self.results['final_balance']:.2f}, Return: {self.results['total_return']:.2f}%")
+        else:
+            logging.info(f"Backtest completed. Final balance: {self.results['final_balance']:.2f}, Return: {self.results['total_return']:.2f}%")
+        
+        if checkpoint is not None:
+            checkpoint.finish()
+        
+        return self.results
+    
+    def resume_backtest(self, checkpoint, data=None, **kwargs):
+        """
+        Continue an interrupted run_backtest from its last checkpoint
+        
+        Args:
+            checkpoint: utils.checkpoint.BacktestCheckpoint (or its directory)
+            data: The run's candles when they were passed to run_backtest
+                  (otherwise they are fetched again)
+            kwargs: Other run_backtest arguments that were not saved
+                    (intrabar_data, indicators_ready)
+        
+        Returns:
+            dict: Backtest results (None without a checkpoint)
+        """
+        from utils.checkpoint import BacktestCheckpoint
+        
+        if isinstance(checkpoint, str):
+            checkpoint = BacktestCheckpoint(checkpoint)
+        state = checkpoint.read_state()
+        if state is None:
+            logging.error(f"No checkpoint in {checkpoint.path}")
+            return None
+        return self.run_backtest(data=data, checkpoint=checkpoint, **state['run'], **kwargs)
+
+    def run_backtest_streaming(self, symbol, timeframe, store=None, start_date=None, end_date=None, initial_balance=10000, strategy_name='all', enable_scaling=False, scaling_threshold=1.0, scaling_multiplier=2.0, no_fees=False, reward_ratio=3.0, chunk_size=None, warmup=None, early_stop=None, on_trade=None, profiler=None):
+        """
+        run_backtest over a CandleStore history, one chunk of candles at a time
+
+        Only one chunk plus its warmup candles and indicators is in memory;
+        the engine state (balance, open position, counters) and the running
+        vwap/obv totals carry over from chunk to chunk. Trades and metrics
+        equal run_backtest on the same candles; higher timeframes, intrabar
+        exits and checkpoints are not available in this mode.
+
+        Args:
+            store: utils.candle_store.CandleStore holding the candles (default: cache/candles)
+            start_date / end_date: Candle range (default: everything stored)
+            chunk_size: Candles per chunk (default: TradingConfig.STREAM_CHUNK_BARS)
+            warmup: Candles re-read before each chunk (default: TradingConfig.STREAM_WARMUP_BARS)
+            early_stop: As in run_backtest
+            on_trade: Called with each closed trade as soon as its chunk is done
+            profiler: As in run_backtest
+
+        Returns:
+            dict: Backtest results; 'equity_curve' is a utils.streaming.EquityColumns
+        """
+        from utils.candle_store import CandleStore
+        from utils.streaming import stream_frames, EquityColumns
+
+        store = store or CandleStore()
+        profiler = profiler or NULL_PROFILER
+        chunk_size = chunk_size or self.config.STREAM_CHUNK_BARS
+        warmup = self.config.STREAM_WARMUP_BARS if warmup is None else warmup
+        if warmup < 50:
+            raise ValueError(f"warmup must cover the 50-bar signal lookback (got {warmup})")
+
+        logging.info(f"Starting streaming backtest for {symbol} {timeframe} in chunks of {chunk_size} bars")
+
+        symbol_trading_fee_info = self.config.get_trading_fee_info(symbol, no_fees)
+        state = self._initial_state(initial_balance)
+        equity_curve = EquityColumns()
+        frame = None
+        last_bar = None
+        early_stopped = None
+
+        def add_indicators(frame):
+            with profiler.stage('indicators'), profiler.memory('indicators'):
+                return self._add_indicators(frame, profiler)
+        
+        for frame, first_bar in stream_frames(store, symbol, timeframe, add_indicators, chunk_size, warmup,
+                                              start_date, end_date):
+            if self.config.COMPACT_FRAMES:
+                frame = compact_frame(frame, pack_flags=False)
+            ensemble_signals = None
+            if parse_ensemble_name(strategy_name) is not None:
+                with profiler.stage('ensemble_setup'), profiler.memory('ensemble_setup'):
+                    ensemble_signals = SignalLookup(self, frame, strategy_name, timeframe)
+
+            trades_before = len(state['trades'])
+            with profiler.memory('simulation'):
+                last_bar, early_stopped = self._run_bars(
+                    frame, first_bar, state, symbol_trading_fee_info, initial_balance, strategy_name, timeframe,
+                    enable_scaling, scaling_threshold, scaling_multiplier, reward_ratio,
+                    ensemble_signals=ensemble_signals, early_stop=early_stop, profiler=profiler
+                )
+
+                # Only the compact equity columns outlive the chunk
+                equity_curve.extend(state['equity_curve'])
+                state['equity_curve'] = []
+            if on_trade is not None:
+                for trade in state['trades'][trades_before:]:
+                    on_trade(trade)
+
+            if early_stopped or state['balance'] <= 0:
+                break
+
+        if frame is None:
+            logging.error(f"No stored candles for {symbol} {timeframe}")
+            return None
+
+        state['equity_curve'] = equity_curve
+        trades_before = len(state['trades'])
+        with profiler.stage('finish'), profiler.memory('finish'):
+            self.results = self._finish_backtest(frame, last_bar, state, initial_balance, symbol_trading_fee_info,
+                                                 early_stopped)
+        if profiler.enabled:
+            self.results['profile'] = profiler.summary()
+        if on_trade is not None:
+            for trade in state['trades'][trades_before:]:
+                on_trade(trade)
+
+        logging.info(f"Streaming backtest completed. Final balance: {self.results['final_balance']:.2f}, Return: {self.results['total_return']:.2f}%")
+        return self.results
+
+    def _initial_state(self, initial_balance):
+        """Engine state at the start of a backtest"""
+        return {
+            'balance': initial_balance,
+            'savings_account': 0.0,  # Initialize savings account
+            'position': None,
+            'trades': [],
+            'equity_curve': [],
+            'current_scaling_multiplier': 1.0,  # Start with normal risk
+            # Initialize exit counters
+            'exit_counters': {
+                'stop_loss': 0,
+                'stop_loss_at_entry': 0,  # Trailing stop moved to entry
+                'take_profit': 0
+            },
+            'peak_balance': initial_balance
+        }
+    
+    def _run_bars(self, data, first_bar, state, symbol_trading_fee_info, initial_balance, strategy_name, timeframe,
+                  enable_scaling, scaling_threshold, scaling_multiplier, reward_ratio, htf_trend=None, intrabar=None,
+                  ensemble_signals=None, early_stop=None, checkpoint=None, profiler=None):
+        """
+        Simulate bars first_bar..len(data)-1 of an indicator frame
+        
+        Args:
+            state: Engine state (see _initial_state), updated in place
+            profiler: utils.profiler.BacktestProfiler timing the per-bar stages
+        
+        Returns:
+            tuple: (bar the run ended on, early stop info or None); the account
+                   is blown when state['balance'] <= 0
+        """
+        balance = state['balance']
+        savings_account = state['savings_account']
+        position = state['position']
+        trades = state['trades']
+        equity_curve = state['equity_curve']
+        exit_counters = state['exit_counters']
+        current_scaling_multiplier = state['current_scaling_multiplier']
+        peak_balance = state['peak_balance']
         
         # Position scaling variables
         scaling_enabled = enable_scaling
         scaling_threshold_rr = scaling_threshold
         scaling_risk_multiplier = scaling_multiplier
-        current_scaling_multiplier = 1.0  # Start with normal risk
         
-        # Initialize exit counters
-        exit_counters = {
-            'stop_loss': 0,
-            'stop_loss_at_entry': 0,  # Trailing stop moved to entry
-            'take_profit': 0
-        }
+        # Bar the backtest ends on (earlier than the last one after an early stop)
+        last_bar = len(data) - 1
+        early_stopped = None
         
-        # Add indicators to data
-        data = self._add_indicators(data)
+        profiler = profiler or NULL_PROFILER
+        timing = profiler.timing
+        profiler.begin_bars()
         
-        # Run backtest
-        for i in range(len(data)):
-            current_data = data.iloc[:i+1]
-            current_price = data.iloc[i]['close']
-            current_time = data.index[i]
+        # Skip bars without enough data for indicators (50 candles up to bar i)
+        for i in range(max(first_bar, 49), len(data)):
+            if timing:
+                bar_start = perf_counter()
             
-            # Skip if not enough data for indicators
-            if len(current_data) < 50:
-                continue
+            with profiler.stage('slice'):
+                current_data = data.iloc[:i+1]
+                current_price = data.iloc[i]['close']
+                current_time = data.index[i]
             
             # Check if we have an open position
             if position is not None:
                 # Check stop loss and take profit
-                exit_type = self._should_close_position(position, current_price, current_data)
+                with profiler.stage('exit_check'):
+                    if intrabar is not None:
+                        exit_type = intrabar.resolve(position, i)
+                    else:
+                        exit_type = self._should_close_position(position, current_price, current_data)
                 
 
                 
@@ -108,7 +403,8 @@ class Backtester:
                         exit_price = current_price  # fallback
                     
                     # Close position with exact exit price
-                    pnl = self._calculate_pnl(position, exit_price, symbol_trading_fee_info)
+                    with profiler.stage('pnl'):
+                        pnl = self._calculate_pnl(position, exit_price, symbol_trading_fee_info)
                     balance += pnl
                     
                     # Check if account is blown (balance <= 0)
@@ -191,11 +487,21 @@ class Backtester:
                     print(f"📊 Total trades before blow: {len(trades)}")
                     break
                 
-                signal = self._get_signal(current_data, strategy_name, timeframe)
+                with profiler.stage('signal', strategy_name):
+                    if ensemble_signals is not None:
+                        signal = ensemble_signals.signal(i)
+                    else:
+                        signal = self._get_signal(current_data, strategy_name, timeframe)
+                
+                # Only trade in the direction of the higher timeframe trend
+                if htf_trend is not None and signal['signal'] in ['long', 'short']:
+                    if htf_trend[i] != (1 if signal['signal'] == 'long' else -1):
+                        signal = {'signal': 'no_signal'}
                 
                 if signal['signal'] in ['long', 'short']:
                     # Calculate position size
-                    position_size = self._calculate_position_size(balance, signal, initial_balance)
+                    with profiler.stage('sizing'):
+                        position_size = self._calculate_position_size(balance, signal, initial_balance)
                     
                     if position_size > 0:
                         # Apply position scaling if enabled
@@ -233,9 +539,10 @@ class Backtester:
                         
                         # Calculate take profit that compensates for trading fees
                         # Use provided reward_ratio parameter instead of hardcoded value
-                        adjusted_take_profit = self._calculate_take_profit_with_fees(
-                            current_price, signal['stop_loss'], reward_ratio, scaled_position_size, symbol_trading_fee_info
-                        )
+                        with profiler.stage('sizing'):
+                            adjusted_take_profit = self._calculate_take_profit_with_fees(
+                                current_price, signal['stop_loss'], reward_ratio, scaled_position_size, symbol_trading_fee_info
+                            )
                         
                         # Override strategy's take profit with calculated one based on reward_ratio
                         position = {
@@ -254,16 +561,56 @@ class Backtester:
                             position['trailing_trigger'] = signal['trailing_trigger']
             
             # Record equity
-            equity_curve.append({
-                'time': current_time,
-                'balance': balance,
-                'position_value': self._get_position_value(position, current_price) if position else 0
-            })
+            with profiler.stage('equity'):
+                equity_curve.append({
+                    'time': current_time,
+                    'balance': balance,
+                    'position_value': self._get_position_value(position, current_price) if position else 0
+                })
+            
+            if early_stop is not None:
+                peak_balance = max(peak_balance, balance)
+                with profiler.stage('early_stop'):
+                    early_stop_reason = early_stop(current_time, balance, peak_balance, initial_balance)
+                if early_stop_reason:
+                    early_stopped = {'time': current_time, 'reason': early_stop_reason}
+                    last_bar = i
+                    break
+            
+            if checkpoint is not None and checkpoint.due(i + 1):
+                with profiler.stage('checkpoint'):
+                    checkpoint.save(i + 1, {
+                        'balance': balance,
+                        'savings_account': savings_account,
+                        'position': position,
+                        'exit_counters': exit_counters,
+                        'current_scaling_multiplier': current_scaling_multiplier,
+                        'peak_balance': peak_balance,
+                        'intrabar_stats': intrabar.stats if intrabar is not None else None
+                    }, trades, equity_curve)
+            
+            if timing:
+                profiler.bar(i, current_time, perf_counter() - bar_start)
+        
+        state.update(
+            balance=balance, savings_account=savings_account, position=position,
+            current_scaling_multiplier=current_scaling_multiplier, peak_balance=peak_balance
+        )
+        return last_bar, early_stopped
+    
+    def _finish_backtest(self, data, last_bar, state, initial_balance, symbol_trading_fee_info, early_stopped=None):
+        """Close the open position on data's last_bar and build the results"""
+        balance = state['balance']
+        savings_account = state['savings_account']
+        position = state['position']
+        trades = state['trades']
+        equity_curve = state['equity_curve']
+        exit_counters = state['exit_counters']
         
         # Close any remaining position
         # Close any remaining position at the end (only if account not blown)
         if position is not None and balance > 0:
-            final_price = data.iloc[-1]['close']
+            final_price = data.iloc[last_bar]['close']
             pnl = self._calculate_pnl(position, final_price, symbol_trading_fee_info)
             balance += pnl
             
@@ -272,7 +619,7 @@ class Backtester:
             
             trade = {
                 'entry_time': position['entry_time'],
-                'exit_time': data.index[-1],
+                'exit_time': data.index[last_bar],
                 'entry_price': position['entry_price'],
                 'exit_price': final_price,
                 'side': position['side'],
@@ -320,7 +667,7 @@ class Backtester:
         # Check if account was blown
         account_blown = balance <= 0
         
-        self.results = {
+        return {
             'trades': trades,
             'equity_curve': equity_curve,
             'metrics': metrics,
@@ -330,16 +677,10 @@ class Backtester:
             'total_wealth': balance + savings_account,
             'total_return': ((balance - initial_balance) / initial_balance) * 100,
             'balance_history': balance_history,
-            'account_blown': account_blown
+            'account_blown': account_blown,
+            'early_stopped': early_stopped
         }
-        
-        if account_blown:
-            logging.warning(f"Backtest completed with ACCOUNT BLOWN! Final balance: {balance:.2f}, Return: {self.results['total_return']:.2f}%")
-        else:
-            logging.info(f"Backtest completed. Final balance: {balance:.2f}, Return: {self.results['total_return']:.2f}%")
-        
-        return self.results
-    
+
     def _fetch_historical_data(self, symbol, start_date, end_date, timeframe='1h'):
         """Fetch historical OHLCV data with caching"""
         try:
@@ -358,72 +699,104 @@ class Backtester:
             logging.error(f"Error fetching historical data: {e}")
             return pd.DataFrame()
     
-    def _add_indicators(self, data):
-        """Add technical indicators to data"""
+    def _build_mtf_view(self, symbol, start_date, end_date, data, timeframe, higher_timeframes):
+        """Build the multi-timeframe view, deriving from `data` where possible and fetching otherwise"""
+        frames = {}
+        for higher_timeframe in higher_timeframes:
+            if not can_resample(higher_timeframe, timeframe):
+                higher_data = self._fetch_historical_data(symbol, start_date, end_date, higher_timeframe)
+                frames[higher_timeframe] = self._add_indicators(higher_data.copy())
+        
+        return MultiTimeframeView.from_base(
+            data, timeframe, higher_timeframes, add_indicators=self._add_indicators, frames=frames
+        )
+    
+    def _add_indicators(self, data, profiler=None):
+        """
+        Add technical indicators to data
+        
+        profiler: utils.profiler.BacktestProfiler timing each indicator group
+                  (stages 'indicators.<group>')
+        """
         if data.empty:
             return data
+        profiler = profiler or NULL_PROFILER
         
         # Calculate all indicators
-        data['atr'] = self.indicators.calculate_atr(data['high'], data['low'], data['close'])
-        data['ema_20'] = self.indicators.calculate_ema(data['close'], 20)
-        data['ema_50'] = self.indicators.calculate_ema(data['close'], 50)
-        data['rsi'] = self.indicators.calculate_rsi(data['close'])
-        
-        bb = self.indicators.calculate_bollinger_bands(data['close'])
-        data['bb_upper'] = bb['upper']
-        data['bb_middle'] = bb['middle']
-        data['bb_lower'] = bb['lower']
-        
-        stoch = self.indicators.calculate_stochastic(data['high'], data['low'], data['close'])
-        data['stoch_k'] = stoch['k']
-        data['stoch_d'] = stoch['d']
-        
-        macd = self.indicators.calculate_macd(data['close'])
-        data['macd'] = macd['macd']
-        data['macd_signal'] = macd['signal']
-        data['macd_histogram'] = macd['histogram']
-        
-        data['vwap'] = self.indicators.calculate_vwap(data['high'], data['low'], data['close'], data['volume'])
-        
-        ichimoku = self.indicators.calculate_ichimoku(data['high'], data['low'], data['close'])
-        data['tenkan_sen'] = ichimoku['tenkan_sen']
-        data['kijun_sen'] = ichimoku['kijun_sen']
-        data['senkou_span_a'] = ichimoku['senkou_span_a']
-        data['senkou_span_b'] = ichimoku['senkou_span_b']
-        data['chikou_span'] = ichimoku['chikou_span']
-        
-        data['obv'] = self.indicators.calculate_obv(data['close'], data['volume'])
-        
-        vsa_signals = self.indicators.calculate_vsa_signals(
-            data['open'], data['high'], data['low'], data['close'], data['volume']
-        )
-        data = pd.concat([data, vsa_signals], axis=1)
+        with profiler.stage('indicators.atr'):
+            data['atr'] = self.indicators.calculate_atr(data['high'], data['low'], data['close'])
+        with profiler.stage('indicators.ema'):
+            data['ema_20'] = self.indicators.calculate_ema(data['close'], 20)
+            data['ema_50'] = self.indicators.calculate_ema(data['close'], 50)
+        with profiler.stage('indicators.rsi'):
+            data['rsi'] = self.indicators.calculate_rsi(data['close'])
+        
+        with profiler.stage('indicators.bollinger'):
+            bb = self.indicators.calculate_bollinger_bands(data['close'])
+            data['bb_upper'] = bb['upper']
+            data['bb_middle'] = bb['middle']
+            data['bb_lower'] = bb['lower']
+        
+        with profiler.stage('indicators.stochastic'):
+            stoch = self.indicators.calculate_stochastic(data['high'], data['low'], data['close'])
+            data['stoch_k'] = stoch['k']
+            data['stoch_d'] = stoch['d']
+        
+        with profiler.stage('indicators.macd'):
+            macd = self.indicators.calculate_macd(data['close'])
+            data['macd'] = macd['macd']
+            data['macd_signal'] = macd['signal']
+            data['macd_histogram'] = macd['histogram']
+        
+        with profiler.stage('indicators.vwap'):
+            data['vwap'] = self.indicators.calculate_vwap(data['high'], data['low'], data['close'], data['volume'])
+        
+        with profiler.stage('indicators.ichimoku'):
+            ichimoku = self.indicators.calculate_ichimoku(data['high'], data['low'], data['close'])
+            data['tenkan_sen'] = ichimoku['tenkan_sen']
+            data['kijun_sen'] = ichimoku['kijun_sen']
+            data['senkou_span_a'] = ichimoku['senkou_span_a']
+            data['senkou_span_b'] = ichimoku['senkou_span_b']
+            data['chikou_span'] = ichimoku['chikou_span']
+        
+        with profiler.stage('indicators.obv'):
+            data['obv'] = self.indicators.calculate_obv(data['close'], data['volume'])
+        
+        with profiler.stage('indicators.vsa'):
+            vsa_signals = self.indicators.calculate_vsa_signals(
+                data['open'], data['high'], data['low'], data['close'], data['volume']
+            )
+            data = pd.concat([data, vsa_signals], axis=1)
         
         # Add candlestick patterns
-        candlestick_patterns = self.indicators.calculate_candlestick_patterns(
-            data['open'], data['high'], data['low'], data['close']
-        )
-        data = pd.concat([data, candlestick_patterns], axis=1)
+        with profiler.stage('indicators.candlesticks'):
+            candlestick_patterns = self.indicators.calculate_candlestick_patterns(
+                data['open'], data['high'], data['low'], data['close']
+            )
+            data = pd.concat([data, candlestick_patterns], axis=1)
         
         # Add divergence indicators
-        rsi = self.indicators.calculate_rsi(data['close'], 14)
-        macd = self.indicators.calculate_macd(data['close'], 12, 26, 9)
-        
-        # Calculate divergence signals (optimized with shorter period)
-        rsi_divergence = self.indicators.calculate_divergence(data['close'], rsi, 10)
-        volume_divergence = self.indicators.calculate_volume_divergence(data['close'], data['volume'], 10)
-        macd_divergence = self.indicators.calculate_macd_divergence(data['close'], macd['macd'], 10)
-        
-        # Combine all divergence signals
-        divergence_signals = pd.concat([rsi_divergence, volume_divergence, macd_divergence], axis=1)
-        data = pd.concat([data, divergence_signals], axis=1)
+        with profiler.stage('indicators.divergence'):
+            rsi = self.indicators.calculate_rsi(data['close'], 14)
+            macd = self.indicators.calculate_macd(data['close'], 12, 26, 9)
+            
+            # Calculate divergence signals (optimized with shorter period)
+            rsi_divergence = self.indicators.calculate_divergence(data['close'], rsi, 10)
+            volume_divergence = self.indicators.calculate_volume_divergence(data['close'], data['volume'], 10)
+            macd_divergence = self.indicators.calculate_macd_divergence(data['close'], macd['macd'], 10)
+            
+            # Combine all divergence signals
+            divergence_signals = pd.concat([rsi_divergence, volume_divergence, macd_divergence], axis=1)
+            data = pd.concat([data, divergence_signals], axis=1)
         
         return data
     
     def _get_signal(self, data, strategy_name, timeframe='1h', is_reverse=False):
         """Get trading signal from specified strategy"""
-        if strategy_name == 'all':
-            return self.strategies.get_best_signal(data, timeframe)
+        ensemble_rule = parse_ensemble_name(strategy_name)
+        if ensemble_rule is not None:
+            signals = [self._get_signal(data, name, timeframe) for name in self.config.ENSEMBLE_STRATEGIES]
+            return combine_signals(signals, ensemble_rule, self.config.ENSEMBLE_MIN_VOTES)
         elif strategy_name == 'ema_rsi' or strategy_name.startswith('ema_rsi_'):
             # Parse ema_rsi parameters
             reverse_signal = False
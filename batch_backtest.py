@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Batch Backtest for ultra_simple_strategy
+Evaluates a whole grid of R:R / trailing ratios in both reverse modes in a
+single pass over the candle arrays
+"""
+
+import sys
+import argparse
+import logging
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from config import TradingConfig
+
+# Backtester.run_backtest skips bars until 50 candles are available
+WARMUP_BARS = 50
+
+def ultra_simple_strategy_name(reward_ratio, trailing_ratio, is_reverse=False):
+    """Strategy name run_strategy_with_timeframe builds for these parameters"""
+    parts = ['ultra_simple_strategy', f'rr{reward_ratio}', f'trail{trailing_ratio}']
+    if is_reverse:
+        parts.append('reverse')
+    return '_'.join(parts)
+
+def _grid(reward_ratios, trailing_ratios, reverse_modes):
+    combos = [(float(rr), float(trail), bool(reverse))
+              for reverse in reverse_modes for trail in trailing_ratios for rr in reward_ratios]
+    rr, trail, reverse = (np.array(values) for values in zip(*combos))
+    return rr, trail, reverse.astype(bool)
+
+def run_ultra_simple_grid(data, reward_ratios, trailing_ratios=(1.0,), reverse_modes=(False, True),
+                          symbol='SUIUSDT', initial_balance=10000, enable_scaling=False,
+                          scaling_threshold=1.0, scaling_multiplier=2.0, no_fees=False, config=None):
+    """
+    Simulate every parameter combination of ultra_simple_strategy at once
+
+    Entry candidates (close vs previous close) do not depend on the grid, so
+    the candles are walked once and each combination's position, balance and
+    equity are updated as NumPy arrays. Each row reproduces
+    Backtester.run_backtest(strategy_name=ultra_simple_strategy_rr{R}_trail{T}[_reverse],
+    reward_ratio=R), including its quirks: exits on the close, breakeven
+    trailing stop, 10% savings sweep, position scaling and the final close
+    counted as a stop loss.
+
+    Args:
+        data: OHLCV DataFrame (indicators are not needed)
+        reward_ratios: R:R values to test
+        trailing_ratios: Trailing trigger ratios (0 disables the trailing stop)
+        reverse_modes: Reverse settings to test (False, True or both)
+
+    Returns:
+        DataFrame: One row of results per combination
+    """
+    config = config or TradingConfig()
+    fee_info = config.get_trading_fee_info(symbol, no_fees)
+    fixed_fee = fee_info.get('fee_type', 'percentage') == 'fixed'
+    fee_rate = fee_info.get('fee_rate', 0.0)
+    fee_per_btc = fee_info.get('fee_per_btc', 0.0)
+
+    rr, trail, reverse = _grid(reward_ratios, trailing_ratios, reverse_modes)
+    k = len(rr)
+    close = data['close'].to_numpy(dtype=np.float64)
+    high = data['high'].to_numpy(dtype=np.float64)
+    low = data['low'].to_numpy(dtype=np.float64)
+    n = len(close)
+    # ultra_simple_strategy risks 1% of the initial balance per trade
+    risk_amount = initial_balance * (1.0 / 100.0)
+
+    # Position state per combination
+    in_position = np.zeros(k, dtype=bool)
+    side = np.zeros(k)  # 1 long, -1 short
+    entry = np.zeros(k)
+    stop_loss = np.zeros(k)
+    take_profit = np.zeros(k)
+    trigger = np.zeros(k)
+    has_trigger = np.zeros(k, dtype=bool)
+    size = np.zeros(k)
+
+    # Account state per combination
+    balance = np.full(k, float(initial_balance))
+    savings = np.zeros(k)
+    blown = np.zeros(k, dtype=bool)
+    equity_length = np.zeros(k, dtype=np.int64)
+    equity = np.full((k, max(n - WARMUP_BARS + 1, 0)), np.nan)
+
+    # Trade statistics per combination
+    total_trades = np.zeros(k, dtype=np.int64)
+    winning_trades = np.zeros(k, dtype=np.int64)
+    losing_trades = np.zeros(k, dtype=np.int64)
+    total_pnl = np.zeros(k)
+    gross_profit = np.zeros(k)
+    gross_loss = np.zeros(k)
+    exits = {name: np.zeros(k, dtype=np.int64) for name in ('stop_loss', 'stop_loss_at_entry', 'take_profit')}
+
+    def close_positions(mask, exit_price):
+        pnl = np.where(side == 1, (exit_price - entry) * size, (entry - exit_price) * size)
+        fee = size * fee_per_btc if fixed_fee else (entry * size) * fee_rate
+        pnl = pnl - fee
+        balance[mask] += pnl[mask]
+        total_trades[mask] += 1
+        winning_trades[mask & (pnl > 0)] += 1
+        losing_trades[mask & (pnl < 0)] += 1
+        total_pnl[mask] += pnl[mask]
+        gross_profit[mask & (pnl > 0)] += pnl[mask & (pnl > 0)]
+        gross_loss[mask & (pnl < 0)] += pnl[mask & (pnl < 0)]
+        in_position[mask] = False
+        return pnl
+
+    for i in range(WARMUP_BARS - 1, n):
+        price = close[i]
+        active = ~blown
+
+        # Exits, same order as Backtester._should_close_position
+        open_ = active & in_position
+        if open_.any():
+            long_ = side == 1
+            triggered = open_ & has_trigger & np.where(long_, price >= trigger, price <= trigger)
+            stop_loss[triggered] = entry[triggered]
+            has_trigger[triggered] = False
+
+            check = open_ & ~triggered
+            stop_hit = check & np.where(long_, price <= stop_loss, price >= stop_loss)
+            tp_hit = check & ~stop_hit & np.where(long_, price >= take_profit, price <= take_profit)
+            at_entry = stop_hit & (np.abs(stop_loss - entry) < 0.01)
+            exiting = stop_hit | tp_hit
+
+            if exiting.any():
+                exit_price = np.where(tp_hit, take_profit, np.where(at_entry, entry, stop_loss))
+                pnl = close_positions(exiting, exit_price)
+                exits['take_profit'] += tp_hit
+                exits['stop_loss_at_entry'] += at_entry
+                exits['stop_loss'] += stop_hit & ~at_entry
+
+                # Account blown: trading stops before this bar's equity point
+                newly_blown = exiting & (balance <= 0)
+                blown |= newly_blown
+                active = ~blown
+
+                # Save 10% of the profit above the initial balance
+                saving = exiting & active & (pnl > 0) & (balance > initial_balance)
+                save_amount = (balance - initial_balance) * 0.10
+                savings[saving] += save_amount[saving]
+                balance[saving] -= save_amount[saving]
+
+        # Entries
+        direction = np.sign(price - close[i - 1])
+        can_enter = active & ~in_position
+        if direction != 0 and can_enter.any():
+            if direction > 0:
+                base_stop = low[i - 1]
+                risk_per_share = price - base_stop
+                strategy_tp = price + (risk_per_share * rr)
+                new_trigger = price + (risk_per_share * trail)
+            else:
+                base_stop = high[i - 1]
+                risk_per_share = base_stop - price
+                strategy_tp = price - (risk_per_share * rr)
+                new_trigger = price - (risk_per_share * trail)
+
+            # Reverse swaps direction and SL/TP but keeps the trailing trigger
+            new_stop = np.where(reverse, strategy_tp, base_stop)
+            price_diff = np.abs(price - new_stop)
+            enter = can_enter & (price_diff > 0)
+            new_size = np.divide(risk_amount, price_diff, out=np.zeros(k), where=price_diff > 0)
+
+            if enable_scaling:
+                current_rr = (balance - initial_balance) / (initial_balance * 0.01)
+                new_size = np.where(current_rr >= scaling_threshold, new_size * scaling_multiplier, new_size)
+
+            # Backtester._calculate_take_profit_with_fees
+            new_tp = np.where(price > new_stop, price + (price_diff * rr), price - (price_diff * rr))
+
+            side[enter] = np.where(reverse, -direction, direction)[enter]
+            entry[enter] = price
+            stop_loss[enter] = new_stop[enter]
+            take_profit[enter] = new_tp[enter]
+            trigger[enter] = new_trigger[enter]
+            has_trigger[enter] = trail[enter] > 0
+            size[enter] = new_size[enter]
+            in_position[enter] = True
+
+        # Equity curve (balance + position value)
+        position_value = np.where(in_position, size * price, 0)
+        equity[active, i - WARMUP_BARS + 1] = (balance + position_value)[active]
+        equity_length[active] += 1
+
+    # Remaining positions close at the last price and count as stop losses
+    closing = in_position & ~blown & (balance > 0)
+    if n and closing.any():
+        close_positions(closing, np.full(k, close[-1]))
+        exits['stop_loss'] += closing
+
+    rows = []
+    for j in range(k):
+        curve = equity[j, :equity_length[j]]
+        max_drawdown = 0.0
+        sharpe_ratio = 0
+        if len(curve):
+            peak = np.maximum.accumulate(curve)
+            max_drawdown = float(np.max((peak - curve) / peak)) * 100
+        if len(curve) > 1:
+            returns = (curve[1:] - curve[:-1]) / curve[:-1]
+            std_return = np.std(returns)
+            sharpe_ratio = np.mean(returns) / std_return if std_return > 0 else 0
+
+        trades = int(total_trades[j])
+        rows.append({
+            'strategy_name': ultra_simple_strategy_name(rr[j], trail[j], reverse[j]),
+            'reward_ratio': rr[j],
+            'trailing_ratio': trail[j],
+            'is_reverse': bool(reverse[j]),
+            'total_trades': trades,
+            'winning_trades': int(winning_trades[j]),
+            'losing_trades': int(losing_trades[j]),
+            'win_rate': winning_trades[j] / trades * 100 if trades else 0,
+            'total_pnl': total_pnl[j],
+            'avg_trade': total_pnl[j] / trades if trades else 0,
+            'profit_factor': (gross_profit[j] / abs(gross_loss[j]) if gross_loss[j] < 0 else float('inf')) if trades else 0,
+            'max_drawdown': max_drawdown,
+            'sharpe_ratio': sharpe_ratio,
+            'stop_loss': int(exits['stop_loss'][j]),
+            'stop_loss_at_entry': int(exits['stop_loss_at_entry'][j]),
+            'take_profit': int(exits['take_profit'][j]),
+            'final_balance': balance[j],
+            'savings_account': savings[j],
+            'total_wealth': balance[j] + savings[j],
+            'total_return': ((balance[j] - initial_balance) / initial_balance) * 100,
+            'account_blown': bool(balance[j] <= 0)
+        })
+
+    return pd.DataFrame(rows)
+
+def _parse_ratios(value):
+    """'1,2,3' -> [1.0, 2.0, 3.0]; 'start:stop:count' -> evenly spaced grid"""
+    if ':' in value:
+        start, stop, count = value.split(':')
+        return list(np.round(np.linspace(float(start), float(stop), int(count)), 6))
+    return [float(v) for v in value.split(',') if v]
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Evaluate an ultra_simple_strategy parameter grid in one pass')
+    parser.add_argument('timeframe', help='Timeframe (5m, 15m, 30m, 1h, 2h, 4h)')
+    parser.add_argument('--symbol', default='SUIUSDT', help='Trading symbol (BTCUSDT, SUIUSDT)')
+    parser.add_argument('--start_date', default='2025-08-15', help='Start date (YYYY-MM-DD)')
+    parser.add_argument('--end_date', default='2025-08-22', help='End date (YYYY-MM-DD)')
+    parser.add_argument('--balance', type=float, default=10000, help='Initial balance')
+    parser.add_argument('--reward_ratios', default='0.5:5:10', help="R:R grid ('1,2,3' or 'start:stop:count')")
+    parser.add_argument('--trailing_ratios', default='0,1.0', help="Trailing ratio grid (0 disables trailing)")
+    parser.add_argument('--reverse', choices=['both', 'normal', 'reverse'], default='both', help='Reverse modes to test')
+    parser.add_argument('--enable_scaling', type=int, choices=[0, 1], default=0, help='Enable position scaling when profitable (0=no, 1=yes)')
+    parser.add_argument('--scaling_threshold', type=float, default=1.0, help='R:R threshold to start scaling')
+    parser.add_argument('--scaling_multiplier', type=float, default=2.0, help='Risk multiplier when scaling')
+    parser.add_argument('--no_fees', type=int, choices=[0, 1], default=0, help='Disable trading fees (0=normal fees, 1=no fees)')
+    parser.add_argument('--base_timeframe', default=None, help='Derive the timeframe from cached candles of this timeframe (e.g., 5m)')
+    parser.add_argument('--top', type=int, default=10, help='Number of best combinations to print')
+    parser.add_argument('--output', default=None, help='CSV file for the full results table')
+
+    if len(sys.argv) < 2:
+        parser.print_help()
+        print("\n📝 Examples:")
+        print("   python batch_backtest.py 5m --symbol SUIUSDT --reward_ratios 0.5:5:100")
+        print("   python batch_backtest.py 15m --reward_ratios 1,2,3 --trailing_ratios 0,0.5,1 --reverse reverse --no_fees 1")
+        return
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    from backtest import Backtester
+    backtester = Backtester(base_timeframe=args.base_timeframe)
+    start_date = datetime.strptime(args.start_date, '%Y-%m-%d')
+    end_date = datetime.strptime(args.end_date, '%Y-%m-%d')
+    data = backtester._fetch_historical_data(args.symbol, start_date, end_date, args.timeframe)
+    if data.empty:
+        print("❌ No historical data available")
+        return
+
+    reverse_modes = {'both': (False, True), 'normal': (False,), 'reverse': (True,)}[args.reverse]
+    reward_ratios = _parse_ratios(args.reward_ratios)
+    trailing_ratios = _parse_ratios(args.trailing_ratios)
+
+    started = datetime.now()
+    results = run_ultra_simple_grid(
+        data, reward_ratios, trailing_ratios, reverse_modes,
+        symbol=args.symbol,
+        initial_balance=args.balance,
+        enable_scaling=bool(args.enable_scaling),
+        scaling_threshold=args.scaling_threshold,
+        scaling_multiplier=args.scaling_multiplier,
+        no_fees=bool(args.no_fees)
+    )
+    elapsed = (datetime.now() - started).total_seconds()
+
+    print(f"🚀 ULTRA_SIMPLE_STRATEGY GRID: {args.symbol} {args.timeframe} {args.start_date} → {args.end_date}")
+    print(f"📊 {len(results)} combinations over {len(data)} candles in {elapsed:.2f}s")
+    print("=" * 80)
+    columns = ['reward_ratio', 'trailing_ratio', 'is_reverse', 'total_trades', 'win_rate',
+               'total_return', 'max_drawdown', 'profit_factor', 'total_wealth']
+    best = results.sort_values('total_wealth', ascending=False).head(args.top)
+    print(best[columns].to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+
+    if args.output:
+        results.to_csv(args.output, index=False)
+        print(f"\n💾 Results saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -39,6 +39,19 @@ class TradingConfig:
         '1d': '1d'
     }
     
+    # Candle length of each timeframe in minutes
+    TIMEFRAME_MINUTES = {
+        '1m': 1,
+        '3m': 3,
+        '5m': 5,
+        '15m': 15,
+        '30m': 30,
+        '1h': 60,
+        '2h': 120,
+        '4h': 240,
+        '1d': 1440
+    }
+    
     # Risk Management
     MAX_RISK_PER_TRADE = 0.01  # 1% per trade (1R = 1% of initial balance)
     MAX_DAILY_RISK = 0.05      # 5% per day
@@ -114,6 +127,10 @@ class TradingConfig:
         }
     }
     
+    # Members of the 'all' (most confident signal) and 'all_vote' (majority vote) ensembles
+    ENSEMBLE_STRATEGIES = ['ema_rsi', 'bollinger_stochastic', 'macd_vwap', 'ichimoku', 'vsa_obv']
+    ENSEMBLE_MIN_VOTES = 2
+    
     # Backtest Time Range (can be overridden by environment variables)
     BACKTEST_START_DATE = os.getenv('BACKTEST_START_DATE', '2024-01-01')
     BACKTEST_END_DATE = os.getenv('BACKTEST_END_DATE', '2025-08-22')
@@ -122,6 +139,17 @@ class TradingConfig:
     TRADING_MODE = os.getenv('TRADING_MODE', 'conservative')  # 'conservative' or 'aggressive'
     DEFAULT_TIMEFRAME = os.getenv('DEFAULT_TIMEFRAME', '1h')  # '5m', '15m', '30m', '1h', '4h', '1d'
     
+    # Derive higher timeframes from this stored timeframe instead of downloading each one (e.g. '5m')
+    RESAMPLE_BASE_TIMEFRAME = os.getenv('RESAMPLE_BASE_TIMEFRAME') or None
+    
+    # float32 indicators and bit-packed signal flags in fetched/cached frames (about half the memory)
+    COMPACT_FRAMES = os.getenv('COMPACT_FRAMES', 'false').lower() in ('1', 'true', 'yes')
+    
+    # Streaming backtests: candles simulated per chunk, and earlier candles re-read before each
+    # chunk so recursive indicators (EMA, RSI, ATR, MACD) reach the same values as a full-history run
+    STREAM_CHUNK_BARS = int(os.getenv('STREAM_CHUNK_BARS', '20000'))
+    STREAM_WARMUP_BARS = int(os.getenv('STREAM_WARMUP_BARS', '1000'))
+    
     # Timeframe-specific parameters
     TIMEFRAME_PARAMS = {
         '5m': {
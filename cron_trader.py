@@ -11,6 +11,10 @@ import schedule
 import logging
 from datetime import datetime
 from real_time_trader import RealTimeTrader
+from utils import CycleMetrics
+
+# Shared across jobs so counters and histograms accumulate between cycles
+metrics = CycleMetrics('SUIUSDT')
 
 def setup_logging():
     """Setup logging for cron system"""
@@ -36,7 +40,8 @@ def run_trading_job():
             symbol='SUIUSDT',
             initial_balance=1000,
             strategy_name='ultra_simple_strategy',
-            no_fees=True
+            no_fees=True,
+            metrics=metrics
         )
         
         # Run trading cycle
@@ -103,6 +108,12 @@ def main():
     print("📅 Trading will run at minute 0, 5, 10, 15... (M5 candle close)")
     print("🛑 Press Ctrl+C to stop")
     
+    # Optional Prometheus endpoint (metrics are always written to real_time_data/metrics_SUIUSDT.prom)
+    metrics_port = os.getenv('METRICS_PORT')
+    if metrics_port:
+        metrics.start_http_server(int(metrics_port))
+        print(f"📈 Metrics: http://127.0.0.1:{metrics_port}/metrics")
+    
     # Schedule trading job at specific minutes (0, 5, 10, 15, 20, 25, 30, 35, 40, 45, 50, 55)
     schedule.every().hour.at(":00").do(run_trading_job)
     schedule.every().hour.at(":05").do(run_trading_job)
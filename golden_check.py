@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Golden-Output Regression Check
+Runs a fixed matrix of strategies and parameter sets on frozen candle
+fixtures from cache/ and diffs the trades, exit counters and metrics against
+the canonical outputs in golden/, so engine and indicator rewrites can prove
+they behave identically
+
+Usage:
+    python golden_check.py                   # check the current code (quick tier)
+    python golden_check.py --tier full       # also the 15m fixture, before merging engine changes
+    python golden_check.py --record 1        # (re)write the golden outputs (always the full tier)
+    python golden_check.py --engine streaming
+    python golden_check.py --engine my_engine:run_backtest --rel_tol 1e-9
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import pickle
+import argparse
+import importlib
+import tempfile
+import multiprocessing
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from backtest import Backtester
+from analyze_all_strategies import get_all_strategies
+from run_strategy_timeframe import strategy_job
+from utils.data_cache import DataCache
+from utils.result_store import data_fingerprint
+
+GOLDEN_DIR = 'golden'
+
+# Frozen candles (committed cache files): symbol, timeframe, start, end, tier.
+# The quick tier runs on every change (about 100s). The full tier adds a 15m
+# window long enough for every strategy that can trade to do so.
+FIXTURES = [
+    ('SUIUSDT', '1h', '2025-08-01', '2025-08-22', 'quick'),
+    ('BTCUSDT', '5m', '2025-01-03', '2025-01-05', 'quick'),
+    ('SUIUSDT', '15m', '2025-08-01', '2025-08-22', 'full'),
+]
+TIERS = ['quick', 'full']
+
+# run_strategy_with_timeframe arguments of each parameter set
+PARAMETER_SETS = {
+    'rr1_reverse_scaled': {
+        'initial_balance': 1000, 'reward_ratio': 1.0, 'is_reverse': True, 'enable_scaling': True,
+        'scaling_threshold': 1.0, 'scaling_multiplier': 1.0, 'no_fees': True
+    },
+    'rr2_fees': {
+        'initial_balance': 10000, 'reward_ratio': 2.0, 'is_reverse': False, 'enable_scaling': False,
+        'no_fees': False
+    },
+}
+
+# Strategies that cannot trade in run_backtest today. Their (empty) outputs
+# are still checked on the quick fixtures and skipped on the full-tier ones
+# (divergence_strategy alone takes minutes there). Every other strategy must
+# trade in some recorded case.
+KNOWN_IDLE_STRATEGIES = {
+    'divergence_strategy': 'its divergence detectors confirm pivots bars later, never on the bar being traded',
+    'simple_divergence_strategy': "Backtester._get_signal routes it to simple_strategy (the 'simple_' prefix branch comes first)",
+    'wyckoff_vsa': 'stub that always returns no_signal',
+    'practical_wyckoff_vsa': 'stub that always returns no_signal',
+}
+
+# Result fields compared besides the trades (equity curve: length and last point)
+RESULT_FIELDS = ['exit_counters', 'metrics', 'final_balance', 'savings_account', 'total_wealth',
+                 'total_return', 'account_blown']
+
+def build_cases(strategies: Optional[List[str]] = None, tier: str = 'full') -> List[Dict]:
+    """The matrix: every fixture of the tier x parameter set x strategy"""
+    cases = []
+    for symbol, timeframe, start_date, end_date, fixture_tier in FIXTURES:
+        if TIERS.index(fixture_tier) > TIERS.index(tier):
+            continue
+        for params_name, params in PARAMETER_SETS.items():
+            for strategy in strategies or get_all_strategies():
+                if fixture_tier != 'quick' and strategy in KNOWN_IDLE_STRATEGIES:
+                    continue
+                job = strategy_job(strategy, timeframe, symbol, start_date, end_date, **params)
+                cases.append({
+                    'id': f"{symbol}_{timeframe}_{params_name}_{strategy}",
+                    'strategy': strategy,
+                    'fixture': (symbol, timeframe, start_date, end_date),
+                    'job': job
+                })
+    return cases
+
+def load_fixture(symbol: str, timeframe: str, start_date: str, end_date: str, cache_dir: str = 'cache') -> pd.DataFrame:
+    """OHLCV candles of a cached fetch, regardless of the cache's age"""
+    cache = DataCache(cache_dir)
+    cache_key = cache.get_cache_key(symbol, timeframe, datetime.strptime(start_date, '%Y-%m-%d'),
+                                    datetime.strptime(end_date, '%Y-%m-%d'))
+    with open(cache.get_cache_path(cache_key), 'rb') as f:
+        data = pickle.load(f)['data']
+    # Cached frames may hold indicators of the code that fetched them
+    return data[['open', 'high', 'low', 'close', 'volume']].copy()
+
+def to_plain(value):
+    """JSON-safe copy of a results value (timestamps as ISO strings, numpy scalars as numbers)"""
+    if isinstance(value, dict):
+        return {str(key): to_plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_plain(item) for item in value]
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return value.isoformat()
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        value = float(value)
+        # JSON has no NaN/inf literals
+        return value if math.isfinite(value) else repr(value)
+    return value
+
+def golden_output(results: Optional[Dict]) -> Dict:
+    """The parts of run_backtest results that are compared"""
+    if not results:
+        return {'results': None}
+    equity_curve = results.get('equity_curve', [])
+    output = {field: to_plain(results.get(field)) for field in RESULT_FIELDS}
+    output['trades'] = to_plain(list(results.get('trades', [])))
+    output['equity_points'] = len(equity_curve)
+    output['last_equity'] = to_plain(equity_curve[-1]) if len(equity_curve) else None
+    return output
+
+def compare(expected, actual, rel_tol: float, abs_tol: float, path: str = '') -> List[str]:
+    """Differences between two golden_output values; floats match within the tolerances"""
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        differences = []
+        for key in sorted(set(expected) | set(actual)):
+            if key not in actual:
+                differences.append(f"{path}.{key}: missing")
+            elif key not in expected:
+                differences.append(f"{path}.{key}: unexpected {actual[key]!r}")
+            else:
+                differences += compare(expected[key], actual[key], rel_tol, abs_tol, f"{path}.{key}")
+        return differences
+    if isinstance(expected, list) and isinstance(actual, list):
+        differences = []
+        if len(expected) != len(actual):
+            differences.append(f"{path}: {len(expected)} items expected, got {len(actual)}")
+        for i, (expected_item, actual_item) in enumerate(zip(expected, actual)):
+            differences += compare(expected_item, actual_item, rel_tol, abs_tol, f"{path}[{i}]")
+        return differences
+    numbers = (int, float)
+    if (isinstance(expected, numbers) and isinstance(actual, numbers)
+            and not isinstance(expected, bool) and not isinstance(actual, bool)):
+        if math.isclose(expected, actual, rel_tol=rel_tol, abs_tol=abs_tol):
+            return []
+        return [f"{path}: expected {expected!r}, got {actual!r}"]
+    return [] if expected == actual else [f"{path}: expected {expected!r}, got {actual!r}"]
+
+def backtest_engine(backtester: Backtester, indicator_frames: Dict) -> Callable:
+    """run_backtest on indicator frames built once per fixture"""
+    def run(data, fixture, **kwargs):
+        if fixture not in indicator_frames:
+            indicator_frames[fixture] = backtester._add_indicators(data.copy())
+        return backtester.run_backtest(data=indicator_frames[fixture], indicators_ready=True, **kwargs)
+    return run
+
+def streaming_engine(backtester: Backtester, store_dir: str) -> Callable:
+    """run_backtest_streaming over a CandleStore of the fixture in small chunks"""
+    from utils.candle_store import CandleStore
+
+    store = CandleStore(store_dir)
+
+    def run(data, fixture, symbol, timeframe, start_date, end_date, **kwargs):
+        if store.rows(symbol, timeframe) == 0:
+            store.append(symbol, timeframe, data)
+        return backtester.run_backtest_streaming(symbol, timeframe, store=store, start_date=start_date,
+                                                 end_date=end_date, chunk_size=128, **kwargs)
+    return run
+
+def external_engine(spec: str) -> Callable:
+    """'module:function' called like run_backtest (data=OHLCV frame, symbol=..., ...)"""
+    module_name, function_name = spec.split(':')
+    function = getattr(importlib.import_module(module_name), function_name)
+
+    def run(data, fixture, **kwargs):
+        return function(data=data.copy(), **kwargs)
+    return run
+
+def run_case(engine: Callable, case: Dict, data: pd.DataFrame) -> Dict:
+    job = case['job']
+    symbol, timeframe, start_date, end_date = case['fixture']
+    results = engine(
+        data, case['fixture'],
+        symbol=symbol,
+        timeframe=timeframe,
+        start_date=data.index[0],
+        end_date=data.index[-1],
+        strategy_name=job['strategy_name'],
+        **job['backtest']
+    )
+    return golden_output(results)
+
+def make_engine(spec: str, store_dir: str) -> Callable:
+    """Engine for --engine: 'backtest', 'streaming' or 'module:function'"""
+    backtester = Backtester()
+    if spec == 'backtest':
+        return backtest_engine(backtester, {})
+    if spec == 'streaming':
+        # One store per process, so parallel workers never append to the same file
+        return streaming_engine(backtester, os.path.join(store_dir, str(os.getpid())))
+    return external_engine(spec)
+
+# Engine and loaded fixtures of this (worker) process
+_worker = {}
+
+def _init_worker(engine_spec: str, store_dir: str):
+    _worker['engine'] = make_engine(engine_spec, store_dir)
+    _worker['fixtures'] = {}
+
+def _run_case(case: Dict) -> Tuple[Dict, str, float]:
+    """(golden output, fixture fingerprint, seconds) of one case in this process"""
+    fixtures = _worker['fixtures']
+    if case['fixture'] not in fixtures:
+        data = load_fixture(*case['fixture'])
+        fixtures[case['fixture']] = (data, data_fingerprint(data))
+    data, fingerprint = fixtures[case['fixture']]
+    started = time.time()
+    output = run_case(_worker['engine'], case, data)
+    return output, fingerprint, time.time() - started
+
+def golden_path(golden_dir: str, case: Dict) -> str:
+    return os.path.join(golden_dir, f"{case['id']}.json")
+
+def check_golden(cases: List[Dict], engine: str = 'backtest', golden_dir: str = GOLDEN_DIR, record: bool = False,
+                 rel_tol: float = 1e-9, abs_tol: float = 1e-9, processes: int = 1, max_differences: int = 5) -> int:
+    """
+    Run the cases and diff them against (or with record=True, write) their golden outputs
+
+    Args:
+        engine: 'backtest', 'streaming' or 'module:function' called like run_backtest
+        processes: Worker processes running cases in parallel
+
+    Returns:
+        int: Cases that differ or have no golden output (recording: strategies
+             outside KNOWN_IDLE_STRATEGIES that trade in none of the cases)
+    """
+    failures = 0
+    started = time.time()
+    strategy_trades = {}
+    with tempfile.TemporaryDirectory() as store_dir:
+        pool = None
+        if processes > 1:
+            pool = multiprocessing.Pool(processes, _init_worker, (engine, store_dir))
+            outputs = pool.imap(_run_case, cases)
+        else:
+            _init_worker(engine, store_dir)
+            outputs = map(_run_case, cases)
+
+        try:
+            for i, (case, (output, fingerprint, seconds)) in enumerate(zip(cases, outputs), 1):
+                label = f"[{i}/{len(cases)}] {case['id']} ({seconds:.1f}s)"
+                path = golden_path(golden_dir, case)
+
+                if record:
+                    os.makedirs(golden_dir, exist_ok=True)
+                    with open(path, 'w') as f:
+                        json.dump({'case': case['id'], 'fixture': list(case['fixture']), 'fingerprint': fingerprint,
+                                   'job': case['job'], 'output': output}, f, indent=1, sort_keys=True)
+                    trades = len(output.get('trades') or [])
+                    # The job's name may carry a mode suffix (e.g. '_reverse')
+                    strategy = case['strategy']
+                    strategy_trades[strategy] = strategy_trades.get(strategy, 0) + trades
+                    if trades:
+                        print(f"📝 {label}: {trades} trades recorded")
+                    else:
+                        print(f"⚠️  {label}: 0 trades recorded (only checks that it stays idle)")
+                    continue
+
+                if not os.path.exists(path):
+                    failures += 1
+                    print(f"❓ {label}: no golden output (run with --record 1)")
+                    continue
+                with open(path) as f:
+                    golden = json.load(f)
+                if golden['fingerprint'] != fingerprint:
+                    failures += 1
+                    print(f"❌ {label}: fixture candles changed since the golden output was recorded")
+                    continue
+
+                differences = compare(golden['output'], output, rel_tol, abs_tol)
+                if differences:
+                    failures += 1
+                    print(f"❌ {label}: {len(differences)} differences")
+                    for difference in differences[:max_differences]:
+                        print(f"     {difference}")
+                else:
+                    print(f"✅ {label}")
+        finally:
+            if pool is not None:
+                pool.terminate()
+
+    for strategy, trades in strategy_trades.items():
+        if trades:
+            continue
+        if strategy in KNOWN_IDLE_STRATEGIES:
+            print(f"⚠️  {strategy} trades in no case: {KNOWN_IDLE_STRATEGIES[strategy]}")
+        else:
+            failures += 1
+            print(f"❌ {strategy} trades in no recorded case, so nothing protects it; "
+                  f"add a fixture or parameter set where it trades")
+
+    print("=" * 60)
+    verb = 'recorded' if record else 'checked'
+    print(f"{len(cases)} cases {verb} in {time.time() - started:.1f}s, {failures} failing")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description='Diff backtest outputs against golden outputs on frozen fixtures')
+    parser.add_argument('--record', type=int, choices=[0, 1], default=0, help='Write the golden outputs instead of checking them')
+    parser.add_argument('--engine', default='backtest', help="backtest, streaming or module:function called like run_backtest")
+    parser.add_argument('--tier', choices=TIERS, default='quick', help='quick: short fixtures only; full: every fixture')
+    parser.add_argument('--strategies', default=None, help='Comma-separated subset of strategies (default: all)')
+    parser.add_argument('--cases', default=None, help='Only cases whose id contains this text (e.g., SUIUSDT_1h)')
+    parser.add_argument('--golden_dir', default=GOLDEN_DIR, help='Directory of the golden outputs')
+    parser.add_argument('--rel_tol', type=float, default=1e-9, help='Relative tolerance for numbers')
+    parser.add_argument('--abs_tol', type=float, default=1e-9, help='Absolute tolerance for numbers')
+    parser.add_argument('--processes', type=int, default=1, help='Run cases in this many processes')
+    args = parser.parse_args()
+
+    # Recording covers every fixture, so strategies that never trade are caught
+    tier = 'full' if args.record else args.tier
+    cases = build_cases(args.strategies.split(',') if args.strategies else None, tier)
+    if args.cases:
+        cases = [case for case in cases if args.cases in case['id']]
+    if args.record and args.engine != 'backtest':
+        print("❌ Golden outputs are recorded with the backtest engine")
+        return 2
+
+    failures = check_golden(cases, args.engine, args.golden_dir, bool(args.record), args.rel_tol, args.abs_tol,
+                            args.processes)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Backtest Job Worker
+Drains a job queue filled by a sweep's --enqueue mode; start it on every
+machine that sees the queue and result store files
+"""
+
+import sys
+import logging
+import argparse
+import multiprocessing
+from datetime import datetime
+from utils.job_queue import JobQueue, LEASE_SECONDS, default_worker_id, work
+
+def _work(queue_path, store_path, lease_seconds, poll_seconds, exit_when_idle, journal_mode):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+    return work(queue_path, store_path, lease_seconds=lease_seconds, poll_seconds=poll_seconds,
+                exit_when_idle=exit_when_idle, store_journal_mode=journal_mode)
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Run queued backtest jobs')
+    parser.add_argument('--queue', default='cache/jobs.sqlite', help='Job queue file (shared between machines)')
+    parser.add_argument('--result_store', default='cache/results.sqlite', help='Result store the jobs write to')
+    parser.add_argument('--processes', type=int, default=1, help='Worker processes on this machine')
+    parser.add_argument('--lease', type=float, default=LEASE_SECONDS, help='Seconds before a silent worker loses its job')
+    parser.add_argument('--poll', type=float, default=5.0, help='Seconds between claims while the queue is empty')
+    parser.add_argument('--forever', action='store_true', help='Keep polling when the queue is empty')
+    parser.add_argument('--journal_mode', default='DELETE', choices=['DELETE', 'WAL'],
+                        help='Result store journal mode (WAL only when every worker runs on this machine)')
+    parser.add_argument('--status', action='store_true', help='Print job counts and exit')
+    parser.add_argument('--retry_failed', action='store_true', help='Return failed jobs to the queue first')
+
+    args = parser.parse_args()
+
+    with JobQueue(args.queue) as queue:
+        if args.retry_failed:
+            print(f"🔁 Requeued {queue.requeue_failed()} failed jobs")
+        stats = queue.stats()
+    print(f"📋 {args.queue}: " + ', '.join(f"{count} {status}" for status, count in stats.items()))
+    if args.status:
+        return
+
+    print(f"👷 {default_worker_id()}: {args.processes} worker process(es) → {args.result_store}")
+    start = datetime.now()
+    worker_args = (args.queue, args.result_store, args.lease, args.poll, not args.forever, args.journal_mode)
+    if args.processes > 1:
+        with multiprocessing.Pool(args.processes) as pool:
+            completed = sum(pool.starmap(_work, [worker_args] * args.processes))
+    else:
+        completed = _work(*worker_args)
+
+    with JobQueue(args.queue) as queue:
+        stats = queue.stats()
+    print(f"✅ {completed} jobs completed in {(datetime.now() - start).total_seconds():.0f}s; queue: "
+          + ', '.join(f"{count} {status}" for status, count in stats.items()))
+    if stats['failed']:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Multi-Strategy Real-time Trading
+One executing strategy plus shadow strategies traded on paper accounts,
+all evaluated on the same candle window with indicators computed once
+"""
+
+import os
+import json
+import logging
+import argparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from real_time_trader import RealTimeTrader
+from utils import EquityHistory, CycleMetrics
+from utils.shared_frames import publish_frame, attach_frame
+
+# Backtester reused by every shadow strategy evaluated in a pool worker
+_WORKER_BACKTESTER = None
+
+def _shadow_signal(handle, strategy_name, timeframe):
+    """
+    Worker side: one shadow strategy's signal on the published cycle window
+
+    Returns:
+        tuple: (signal, None) or (None, error message)
+    """
+    global _WORKER_BACKTESTER
+    from backtest import Backtester
+
+    if _WORKER_BACKTESTER is None:
+        _WORKER_BACKTESTER = Backtester()
+    backtester = _WORKER_BACKTESTER
+    try:
+        # Strategies may add columns; the attached frame itself is read-only
+        data = attach_frame(handle).copy(deep=False)
+        # Same routing as the executing strategy and the Backtester
+        signal = backtester._get_signal(data, strategy_name, timeframe)
+    except Exception as e:
+        return None, str(e)
+    if signal:
+        signal.setdefault('strategy', strategy_name)
+    return signal, None
+
+class PaperAccount:
+    """Paper-traded account for one shadow strategy"""
+
+    def __init__(self, strategy_name, symbol='SUIUSDT', initial_balance=1000, no_fees=False, clock=None):
+        self.strategy_name = strategy_name
+        self.symbol = symbol
+        self.initial_balance = initial_balance
+        self.no_fees = no_fees
+        self.clock = clock or datetime.now
+        self.metrics = CycleMetrics(symbol)  # Kept apart from the executing strategy's registry
+
+        self.current_balance = initial_balance
+        self.savings_account = 0.0
+        self.open_position = None
+        self.trade_history = []
+        self.equity_history = EquityHistory()
+        self.last_signal = None
+
+        self.scaling_enabled = True
+        self.scaling_threshold = 1.0
+        self.scaling_multiplier = 2.0
+        self.current_scaling_multiplier = 1.0
+
+    # Same position rules as the executing strategy
+    check_position_exit = RealTimeTrader.check_position_exit
+    close_position = RealTimeTrader.close_position
+    open_new_position = RealTimeTrader.open_new_position
+    update_equity_curve = RealTimeTrader.update_equity_curve
+    get_trading_summary = RealTimeTrader.get_trading_summary
+
+    def on_candle(self, signal, current_price):
+        """Manage the open position and act on this candle's signal"""
+        self.last_signal = signal.get('signal') if signal else None
+
+        if self.open_position:
+            exit_type, exit_price = self.check_position_exit(current_price)
+            if exit_type:
+                self.close_position(exit_type, exit_price)
+
+        if not self.open_position and signal and signal['signal'] in ['long', 'short']:
+            self.open_new_position(signal, current_price)
+
+        self.update_equity_curve()
+
+    def to_dict(self):
+        """State for the paper accounts file"""
+        return {
+            'balance': self.current_balance,
+            'savings_account': self.savings_account,
+            'scaling_multiplier': self.current_scaling_multiplier,
+            'open_position': self.open_position,
+            'trades': self.trade_history,
+            'equity': self.equity_history.points()
+        }
+
+    def load(self, data):
+        """Restore state saved by to_dict"""
+        self.current_balance = data.get('balance', self.initial_balance)
+        self.savings_account = data.get('savings_account', 0.0)
+        self.current_scaling_multiplier = data.get('scaling_multiplier', 1.0)
+        self.open_position = data.get('open_position')
+        self.trade_history = data.get('trades', [])
+        self.equity_history.load(data.get('equity', []))
+
+class MultiStrategyTrader(RealTimeTrader):
+    """RealTimeTrader that shadow-runs extra strategies on paper accounts"""
+
+    def __init__(self, shadow_strategies=None, max_workers=None, backend='shm', **kwargs):
+        """
+        Args:
+            shadow_strategies: Strategies traded on paper (default: every strategy
+                               from TradingStrategies.get_all_strategies())
+            max_workers: Worker processes evaluating the shadow strategies (default: CPU count)
+            backend: How the cycle's window is shared with the workers ('shm' or 'mmap')
+            **kwargs: Passed through to RealTimeTrader
+        """
+        super().__init__(**kwargs)
+
+        self.registered_strategies = set(self.backtester.strategies.get_all_strategies())
+        if shadow_strategies is None:
+            shadow_strategies = sorted(self.registered_strategies)
+        self.shadow_strategies = [s for s in shadow_strategies if s != self.strategy_name]
+
+        self.paper_accounts = {
+            name: PaperAccount(name, self.symbol, self.initial_balance, self.no_fees, self.clock)
+            for name in self.shadow_strategies
+        }
+        self.paper_file = f"{self.data_dir}/paper_{self.symbol}.json"
+        # Strategies are CPU-bound Python, so threads would serialise on the GIL
+        self.backend = backend
+        self.executor = ProcessPoolExecutor(max_workers=max_workers) if self.shadow_strategies else None
+        self.cycle_signals = None
+        self.shadow_data = None  # Full indicator set of the cycle's window
+
+        if self.persist:
+            self.load_paper_accounts()
+
+    def close(self):
+        """Shut down the worker pool"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    def load_paper_accounts(self):
+        """Load paper account state"""
+        try:
+            if os.path.exists(self.paper_file):
+                with open(self.paper_file, 'r') as f:
+                    saved = json.load(f)
+                for name, account in self.paper_accounts.items():
+                    if name in saved:
+                        account.load(saved[name])
+                logging.info(f"Loaded {len(saved)} paper accounts")
+        except Exception as e:
+            logging.error(f"Error loading paper accounts: {e}")
+            self.metrics.increment('trading_errors_total', stage='load')
+
+    def save_paper_accounts(self):
+        """Save paper account state"""
+        if not self.persist:
+            return
+
+        try:
+            with open(self.paper_file, 'w') as f:
+                json.dump({name: account.to_dict() for name, account in self.paper_accounts.items()}, f)
+        except Exception as e:
+            logging.error(f"Error saving paper accounts: {e}")
+            self.metrics.increment('trading_errors_total', stage='persist')
+
+    def add_market_indicators(self, data):
+        """
+        Live indicators for the executing strategy, plus the full indicator set
+        for the shadow strategies computed once per cycle
+
+        The returned frame is exactly what RealTimeTrader trades on; the full
+        set is kept in shadow_data.
+        """
+        self.shadow_data = None
+        if self.shadow_strategies and not data.empty:
+            try:
+                with self.metrics.stage('shadow_indicators'):
+                    self.shadow_data = self.backtester._add_indicators(data.copy())
+            except Exception as e:
+                logging.error(f"Error adding shadow indicators: {e}")
+                self.metrics.increment('trading_errors_total', stage='shadow_indicators')
+        return super().add_market_indicators(data.copy())
+
+    def _executing_signal(self, data):
+        """The executing strategy goes through _get_signal on the live indicators, like RealTimeTrader"""
+        signal = self.backtester._get_signal(data, self.strategy_name, self.timeframe)
+        if signal:
+            signal.setdefault('strategy', self.strategy_name)
+        return signal
+
+    def evaluate_strategies(self, data):
+        """
+        Evaluate the executing strategy and every shadow strategy
+
+        The shadow window is published once; shadow strategies run in the
+        worker processes while the executing strategy runs here on the live
+        indicators in data.
+
+        Returns:
+            dict: strategy name -> signal (None when the strategy failed)
+        """
+        signals = {}
+        shared = None
+        if self.shadow_data is not None:
+            shared = publish_frame(self.shadow_data, self.symbol, self.timeframe, backend=self.backend)
+        try:
+            futures = {}
+            if shared is not None:
+                futures = {
+                    name: self.executor.submit(_shadow_signal, shared.handle, name, self.timeframe)
+                    for name in self.shadow_strategies
+                }
+            try:
+                signals[self.strategy_name] = self._executing_signal(data)
+            except Exception as e:
+                logging.error(f"Error getting signal for {self.strategy_name}: {e}")
+                self.metrics.increment('trading_errors_total', stage='signal')
+                signals[self.strategy_name] = None
+
+            for name, future in futures.items():
+                try:
+                    signal, error = future.result()
+                except Exception as e:
+                    signal, error = None, str(e)
+                if error is not None:
+                    logging.error(f"Error getting signal for {name}: {error}")
+                    self.metrics.increment('trading_errors_total', stage='signal')
+                signals[name] = signal
+        finally:
+            if shared is not None:
+                shared.close()
+        return signals
+
+    def _signals_for(self, data):
+        """Signals of the current cycle, evaluated on first use"""
+        if self.cycle_signals is None:
+            self.cycle_signals = self.evaluate_strategies(data)
+        return self.cycle_signals
+
+    def get_signal(self, data):
+        """Signal of the executing strategy (evaluated together with the shadows)"""
+        if data.empty or len(data) < 2:
+            return None
+        signal = self._signals_for(data).get(self.strategy_name)
+        logging.info(f"Signal generated: {signal.get('signal', 'None')}" if signal else "No signal generated")
+        return signal
+
+    def _run_cycle_steps(self):
+        """Run the executing strategy's cycle; paper accounts step before state is saved"""
+        self.cycle_signals = None
+        super()._run_cycle_steps()
+
+    def after_decision(self, data):
+        """Step every paper account on this cycle's signals"""
+        if len(data) < 2:
+            return
+
+        with self.metrics.stage('paper'):
+            signals = self._signals_for(data)
+            current_price = data.iloc[-1]['close']
+            for name, account in self.paper_accounts.items():
+                account.on_candle(signals.get(name), current_price)
+
+    def save_trading_data(self):
+        """Save the executing strategy's state and the paper accounts (one persist stage)"""
+        super().save_trading_data()
+        self.save_paper_accounts()
+
+    def get_paper_summaries(self):
+        """Trading summary per strategy, executing strategy first"""
+        summaries = {self.strategy_name: self.get_trading_summary()}
+        for name, account in self.paper_accounts.items():
+            summaries[name] = account.get_trading_summary()
+        return summaries
+
+def print_strategy_table(trader):
+    """Print the executing strategy and paper accounts side by side"""
+    print("\n" + "="*80)
+    print("MULTI-STRATEGY SUMMARY")
+    print("="*80)
+    print(f"{'Strategy':<36} {'Wealth':>10} {'Return':>9} {'Trades':>7} {'Win%':>7} {'Open':>5}")
+    print("-" * 80)
+    for name, summary in trader.get_paper_summaries().items():
+        marker = '*' if name == trader.strategy_name else ' '
+        print(f"{marker}{name:<35} ${summary['total_wealth']:>9.2f} {summary['total_return']:>8.2f}% "
+              f"{summary['total_trades']:>7} {summary['win_rate']:>6.1f}% {'Yes' if summary['open_position'] else 'No':>5}")
+    print("="*80)
+    print("* executing strategy, others are paper accounts")
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Run one trading cycle with shadow strategies on paper')
+    parser.add_argument('--symbol', default='SUIUSDT', help='Trading symbol')
+    parser.add_argument('--strategy', default='ultra_simple_strategy', help='Executing strategy')
+    parser.add_argument('--shadow', default=None, help='Comma-separated shadow strategies (default: all)')
+    parser.add_argument('--balance', type=float, default=1000, help='Initial balance')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes for shadow strategies (default: CPU count)')
+    parser.add_argument('--no_fees', action='store_true', help='Disable trading fees')
+    args = parser.parse_args()
+
+    shadow_strategies = args.shadow.split(',') if args.shadow else None
+    trader = MultiStrategyTrader(
+        shadow_strategies=shadow_strategies,
+        max_workers=args.workers,
+        symbol=args.symbol,
+        initial_balance=args.balance,
+        strategy_name=args.strategy,
+        no_fees=args.no_fees
+    )
+    try:
+        trader.run_trading_cycle()
+        print_strategy_table(trader)
+    finally:
+        trader.close()
+
+if __name__ == "__main__":
+    main()
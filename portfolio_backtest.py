@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Portfolio Backtest
+Simulates several symbols on one shared clock with a single balance, open
+trade limit and daily risk budget
+"""
+
+import sys
+import argparse
+import logging
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, Optional
+from backtest import Backtester
+from utils import RiskManager
+from utils.signal_arrays import SignalLookup, parse_ultra_simple_name, WARMUP_BARS
+
+class PortfolioBacktester:
+    """Multi-symbol backtest sharing one account across positions"""
+
+    def __init__(self, backtester: Optional[Backtester] = None):
+        """
+        Args:
+            backtester: Backtester whose strategies, sizing, exit and PnL rules are reused
+        """
+        self.backtester = backtester or Backtester()
+        self.config = self.backtester.config
+        self.results = None
+
+    def _prepare(self, symbol: str, data: pd.DataFrame, strategy_name: str, timeframe: str,
+                 indicators_ready: bool, no_fees: bool) -> Dict:
+        """Per-symbol arrays: prices plus the strategy's signal at every bar"""
+        if not indicators_ready and parse_ultra_simple_name(strategy_name) is None:
+            data = self.backtester._add_indicators(data.copy())
+        return {
+            'index': data.index,
+            'close': data['close'].to_numpy(dtype=np.float64),
+            'signals': SignalLookup(self.backtester, data, strategy_name, timeframe),
+            'fee_info': self.config.get_trading_fee_info(symbol, no_fees)
+        }
+
+    def run_backtest(self, frames: Dict[str, pd.DataFrame], strategy_name, timeframe='1h', initial_balance=10000,
+                     reward_ratio=3.0, max_open_trades=None, enforce_daily_risk=True, enable_scaling=False,
+                     scaling_threshold=1.0, scaling_multiplier=2.0, no_fees=False, indicators_ready=False):
+        """
+        Run the portfolio backtest
+
+        Every symbol's signals are precomputed once, then the union of all
+        candle timestamps is walked with array lookups. Per symbol, entries
+        and exits follow run_backtest (close-based exits, trailing trigger,
+        reward_ratio take profit, fixed-R sizing); the account rules (savings
+        sweep, scaling, account blown) apply to the shared balance.
+
+        Args:
+            frames: symbol -> OHLCV DataFrame (same timeframe)
+            strategy_name: Backtester strategy name, or symbol -> name
+            max_open_trades: Concurrent positions (default: TradingConfig.MAX_OPEN_TRADES)
+            enforce_daily_risk: Apply RiskManager's MAX_DAILY_RISK budget to new trades
+            indicators_ready: Frames already have Backtester indicators
+
+        Returns:
+            dict: Backtest results (run_backtest keys plus per-symbol summary)
+        """
+        symbols = [symbol for symbol, data in frames.items() if data is not None and not data.empty]
+        if not symbols:
+            logging.error("No historical data available for the portfolio")
+            return None
+
+        strategy_names = strategy_name if isinstance(strategy_name, dict) else {s: strategy_name for s in symbols}
+        prepared = {
+            symbol: self._prepare(symbol, frames[symbol], strategy_names[symbol], timeframe, indicators_ready, no_fees)
+            for symbol in symbols
+        }
+
+        # Shared clock: union of all candle times; -1 where a symbol has no candle
+        clock = prepared[symbols[0]]['index']
+        for symbol in symbols[1:]:
+            clock = clock.union(prepared[symbol]['index'])
+        bar_maps = {symbol: prepared[symbol]['index'].get_indexer(clock) for symbol in symbols}
+
+        # One RiskManager holds the book: open trade limit and daily risk budget
+        risk_config = type(self.config)()
+        if max_open_trades is not None:
+            risk_config.MAX_OPEN_TRADES = max_open_trades
+        risk_manager = RiskManager(risk_config)
+
+        balance = initial_balance
+        savings_account = 0.0
+        positions = {}
+        last_prices = {}
+        trades = []
+        equity_curve = []
+        exit_counters = {'stop_loss': 0, 'stop_loss_at_entry': 0, 'take_profit': 0}
+        per_symbol = {symbol: {'trades': 0, 'pnl': 0.0, 'wins': 0, 'skipped_signals': 0} for symbol in symbols}
+        current_day = None
+        account_blown = False
+
+        for t, current_time in enumerate(clock):
+            if current_time.date() != current_day:
+                current_day = current_time.date()
+                risk_manager.reset_daily_stats()
+
+            active = []
+            for symbol in symbols:
+                i = bar_maps[symbol][t]
+                if i >= 0:
+                    last_prices[symbol] = prepared[symbol]['close'][i]
+                    if i >= WARMUP_BARS - 1:
+                        active.append((symbol, i))
+            if not active:
+                continue
+
+            # Exits first, so freed slots and balance are available to this bar's entries
+            for symbol, i in active:
+                position = positions.get(symbol)
+                if position is None:
+                    continue
+                current_price = last_prices[symbol]
+                exit_type = self.backtester._should_close_position(position, current_price, None)
+                if not exit_type:
+                    continue
+
+                if exit_type == 'take_profit':
+                    exit_price = position['take_profit']
+                elif exit_type == 'stop_loss_at_entry':
+                    exit_price = position['entry_price']
+                else:
+                    exit_price = position['stop_loss']
+
+                pnl = self.backtester._calculate_pnl(position, exit_price, prepared[symbol]['fee_info'])
+                balance += pnl
+                exit_counters[exit_type] += 1
+                trade = {
+                    'symbol': symbol,
+                    'entry_time': position['entry_time'],
+                    'exit_time': current_time,
+                    'entry_price': position['entry_price'],
+                    'exit_price': exit_price,
+                    'side': position['side'],
+                    'strategy': position['strategy'],
+                    'stop_loss': position['stop_loss'],
+                    'take_profit': position['take_profit'],
+                    'position_size': position['position_size'],
+                    'exit_type': exit_type,
+                    'pnl': pnl,
+                    'balance': balance,
+                    'scaling_info': position.get('scaling_info', None)
+                }
+                trades.append(trade)
+                per_symbol[symbol]['trades'] += 1
+                per_symbol[symbol]['pnl'] += pnl
+                per_symbol[symbol]['wins'] += pnl > 0
+                risk_manager.close_trade(symbol, pnl)
+                del positions[symbol]
+
+                if balance <= 0:
+                    account_blown = True
+                    logging.warning(f"🔥 ACCOUNT BLOWN! Balance: ${balance:.2f} at {current_time}")
+                    break
+
+                # Save 10% of the profit above the initial balance
+                if pnl > 0 and balance > initial_balance:
+                    save_amount = (balance - initial_balance) * 0.10
+                    savings_account += save_amount
+                    balance -= save_amount
+                    trade['savings_amount'] = save_amount
+                    trade['savings_account'] = savings_account
+                    trade['balance_after_savings'] = balance
+
+            if account_blown:
+                break
+
+            # Entries, in symbol order, while the shared risk budget allows
+            for symbol, i in active:
+                if symbol in positions:
+                    continue
+                signals = prepared[symbol]['signals']
+                side = signals.side(i)
+                if side == 0:
+                    continue
+
+                risk_percent = signals.value('risk_percent', i)
+                if np.isnan(risk_percent):
+                    risk_percent = self.config.MAX_RISK_PER_TRADE * 100
+                if not risk_manager.check_open_trades_limit() or (
+                        enforce_daily_risk and not risk_manager.check_daily_risk_limit(risk_percent)):
+                    per_symbol[symbol]['skipped_signals'] += 1
+                    continue
+
+                current_price = last_prices[symbol]
+                signal = {
+                    'signal': 'long' if side == 1 else 'short',
+                    'entry_price': signals.value('entry_price', i),
+                    'stop_loss': signals.value('stop_loss', i),
+                    'account_risk_percent': risk_percent
+                }
+                position_size = self.backtester._calculate_position_size(balance, signal, initial_balance)
+                if position_size <= 0:
+                    continue
+
+                scaling_info = None
+                if enable_scaling:
+                    current_rr = (balance - initial_balance) / (initial_balance * 0.01)
+                    multiplier = scaling_multiplier if current_rr >= scaling_threshold else 1.0
+                    scaling_info = {
+                        'enabled': True,
+                        'current_rr': current_rr,
+                        'threshold': scaling_threshold,
+                        'multiplier': multiplier,
+                        'original_size': position_size,
+                        'scaled_size': position_size * multiplier
+                    }
+                    position_size = position_size * multiplier
+
+                position = {
+                    'side': signal['signal'],
+                    'entry_price': current_price,
+                    'entry_time': current_time,
+                    'strategy': signals.value('strategy', i),
+                    'stop_loss': signal['stop_loss'],
+                    'take_profit': self.backtester._calculate_take_profit_with_fees(
+                        current_price, signal['stop_loss'], reward_ratio, position_size, prepared[symbol]['fee_info']
+                    ),
+                    'position_size': position_size,
+                    'scaling_info': scaling_info
+                }
+                trailing_trigger = signals.value('trailing_trigger', i)
+                if not np.isnan(trailing_trigger):
+                    position['trailing_trigger'] = trailing_trigger
+                positions[symbol] = position
+                risk_manager.add_trade({'id': symbol, 'symbol': symbol, 'risk_amount': risk_percent})
+
+            equity_curve.append({
+                'time': current_time,
+                'balance': balance,
+                'position_value': sum(
+                    self.backtester._get_position_value(position, last_prices[symbol])
+                    for symbol, position in positions.items()
+                ),
+                'open_positions': len(positions)
+            })
+
+        # Close remaining positions at each symbol's last price
+        if not account_blown:
+            for symbol, position in list(positions.items()):
+                final_price = prepared[symbol]['close'][-1]
+                pnl = self.backtester._calculate_pnl(position, final_price, prepared[symbol]['fee_info'])
+                balance += pnl
+                exit_counters['stop_loss'] += 1
+                trades.append({
+                    'symbol': symbol,
+                    'entry_time': position['entry_time'],
+                    'exit_time': prepared[symbol]['index'][-1],
+                    'entry_price': position['entry_price'],
+                    'exit_price': final_price,
+                    'side': position['side'],
+                    'strategy': position['strategy'],
+                    'stop_loss': position['stop_loss'],
+                    'take_profit': position['take_profit'],
+                    'position_size': position['position_size'],
+                    'exit_type': 'stop_loss',
+                    'pnl': pnl,
+                    'balance': balance,
+                    'scaling_info': position.get('scaling_info', None)
+                })
+                per_symbol[symbol]['trades'] += 1
+                per_symbol[symbol]['pnl'] += pnl
+                per_symbol[symbol]['wins'] += pnl > 0
+
+        account_blown = account_blown or balance <= 0
+        self.results = {
+            'symbols': symbols,
+            'trades': trades,
+            'equity_curve': equity_curve,
+            'metrics': self.backtester._calculate_metrics(trades, initial_balance, equity_curve),
+            'exit_counters': exit_counters,
+            'per_symbol': per_symbol,
+            'final_balance': balance,
+            'savings_account': savings_account,
+            'total_wealth': balance + savings_account,
+            'total_return': ((balance - initial_balance) / initial_balance) * 100,
+            'max_concurrent_positions': max((point['open_positions'] for point in equity_curve), default=0),
+            'account_blown': account_blown
+        }
+        return self.results
+
+    def print_results(self):
+        """Print portfolio results"""
+        if not self.results:
+            print("No portfolio results available")
+            return
+        results = self.results
+        metrics = results['metrics']
+        print(f"\n📊 PORTFOLIO RESULTS ({len(results['symbols'])} symbols):")
+        print("-" * 60)
+        print(f"✅ Trades: {metrics['total_trades']} | Win rate: {metrics['win_rate']:.2f}%")
+        print(f"📈 Final Balance: ${results['final_balance']:,.2f} | Savings: ${results['savings_account']:,.2f} | "
+              f"Total Wealth: ${results['total_wealth']:,.2f}")
+        print(f"📊 Total Return: {results['total_return']:.2f}% | Max Drawdown: {metrics['max_drawdown']:.2f}% | "
+              f"Max concurrent positions: {results['max_concurrent_positions']}")
+        if results['account_blown']:
+            print("🔥 ACCOUNT BLOWN! Trading stopped due to insufficient funds")
+        print(f"\n{'Symbol':<12}{'Trades':>8}{'Win%':>8}{'PnL':>14}{'Skipped':>10}")
+        for symbol, summary in results['per_symbol'].items():
+            win_rate = summary['wins'] / summary['trades'] * 100 if summary['trades'] else 0
+            print(f"{symbol:<12}{summary['trades']:>8}{win_rate:>8.1f}{summary['pnl']:>14,.2f}{summary['skipped_signals']:>10}")
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Backtest one strategy across several symbols with a shared account')
+    parser.add_argument('timeframe', help='Timeframe (5m, 15m, 30m, 1h, 2h, 4h)')
+    parser.add_argument('--symbols', default=None, help='Comma-separated symbols (default: all supported symbols)')
+    parser.add_argument('--strategy', default='ultra_simple_strategy', help='Strategy name')
+    parser.add_argument('--start_date', default='2025-08-15', help='Start date (YYYY-MM-DD)')
+    parser.add_argument('--end_date', default='2025-08-22', help='End date (YYYY-MM-DD)')
+    parser.add_argument('--balance', type=float, default=10000, help='Initial balance')
+    parser.add_argument('--reward_ratio', type=float, default=3.0, help='Risk:Reward ratio for take profit')
+    parser.add_argument('--max_open_trades', type=int, default=None, help='Concurrent positions (default: config MAX_OPEN_TRADES)')
+    parser.add_argument('--daily_risk', type=int, choices=[0, 1], default=1, help='Enforce the MAX_DAILY_RISK budget (0=no, 1=yes)')
+    parser.add_argument('--enable_scaling', type=int, choices=[0, 1], default=0, help='Enable position scaling when profitable (0=no, 1=yes)')
+    parser.add_argument('--scaling_threshold', type=float, default=1.0, help='R:R threshold to start scaling')
+    parser.add_argument('--scaling_multiplier', type=float, default=2.0, help='Risk multiplier when scaling')
+    parser.add_argument('--no_fees', type=int, choices=[0, 1], default=0, help='Disable trading fees (0=normal fees, 1=no fees)')
+    parser.add_argument('--base_timeframe', default=None, help='Derive the timeframe from cached candles of this timeframe (e.g., 5m)')
+
+    if len(sys.argv) < 2:
+        parser.print_help()
+        print("\n📝 Examples:")
+        print("   python portfolio_backtest.py 5m --symbols SUIUSDT,BTCUSDT --max_open_trades 2")
+        print("   python portfolio_backtest.py 1h --strategy ema_rsi --daily_risk 0")
+        return
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    backtester = Backtester(base_timeframe=args.base_timeframe)
+    symbols = args.symbols.split(',') if args.symbols else list(backtester.config.SUPPORTED_SYMBOLS)
+    start_date = datetime.strptime(args.start_date, '%Y-%m-%d')
+    end_date = datetime.strptime(args.end_date, '%Y-%m-%d')
+    frames = {symbol: backtester._fetch_historical_data(symbol, start_date, end_date, args.timeframe) for symbol in symbols}
+
+    portfolio = PortfolioBacktester(backtester)
+    results = portfolio.run_backtest(
+        frames, args.strategy, args.timeframe,
+        initial_balance=args.balance,
+        reward_ratio=args.reward_ratio,
+        max_open_trades=args.max_open_trades,
+        enforce_daily_risk=bool(args.daily_risk),
+        enable_scaling=bool(args.enable_scaling),
+        scaling_threshold=args.scaling_threshold,
+        scaling_multiplier=args.scaling_multiplier,
+        no_fees=bool(args.no_fees)
+    )
+    if results:
+        portfolio.print_results()
+    else:
+        print("❌ Portfolio backtest failed")
+
+if __name__ == "__main__":
+    main()
@@ -13,24 +13,45 @@ from typing import Dict, List, Optional
 import pandas as pd
 from backtest import Backtester
 from config import TradingConfig
+from utils import EquityHistory, CycleMetrics
 
 class RealTimeTrader:
-    def __init__(self, symbol='SUIUSDT', initial_balance=1000, strategy_name='ultra_simple_strategy', no_fees=False):
+    def __init__(self, symbol='SUIUSDT', initial_balance=1000, strategy_name='ultra_simple_strategy', no_fees=False,
+                 data_dir='real_time_data', persist=True, clock=None, metrics=None, timeframe='5m',
+                 exchange=None):
+        """
+        Args:
+            symbol: Trading symbol
+            initial_balance: Initial balance
+            strategy_name: Strategy to trade
+            no_fees: Disable trading fees
+            data_dir: Directory for balance/trades/equity files
+            persist: Load and save state files (False keeps all state in memory)
+            clock: Callable returning the current datetime (default: datetime.now)
+            metrics: Shared CycleMetrics registry (default: a new one per trader)
+            timeframe: Candle timeframe traded
+            exchange: ccxt-compatible exchange to fetch from (default: ccxt.binance)
+        """
         self.symbol = symbol
         self.initial_balance = initial_balance
         self.strategy_name = strategy_name
         self.no_fees = no_fees
+        self.persist = persist
+        self.clock = clock or datetime.now
+        self.timeframe = timeframe
+        self.metrics = metrics or CycleMetrics(symbol)
         self.config = TradingConfig()
         
         # Initialize backtester
-        self.backtester = Backtester(self.config)
+        self.backtester = Backtester(self.config, exchange=exchange)
         
         # Trading state
         self.current_balance = initial_balance
         self.savings_account = 0.0
         self.open_position = None
         self.trade_history = []
-        self.equity_curve = []
+        self.equity_history = EquityHistory()
+        self.journaled_trades = 0  # Trades already appended to the trade journal
         
         # Position scaling
         self.scaling_enabled = True
@@ -39,26 +60,35 @@ class RealTimeTrader:
         self.current_scaling_multiplier = 1.0
         
         # File paths
-        self.data_dir = 'real_time_data'
+        self.data_dir = data_dir
         self.balance_file = f"{self.data_dir}/balance_{symbol}.json"
         self.trades_file = f"{self.data_dir}/trades_{symbol}.json"
+        self.trades_journal_file = f"{self.data_dir}/trades_{symbol}.jsonl"
         self.equity_file = f"{self.data_dir}/equity_{symbol}.json"
+        self.equity_tiers_file = f"{self.data_dir}/equity_tiers_{symbol}.json"
+        self.metrics_file = f"{self.data_dir}/metrics_{symbol}.prom"
         
-        # Create data directory
-        os.makedirs(self.data_dir, exist_ok=True)
-        
-        # Setup logging
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(f"{self.data_dir}/trading.log"),
-                logging.StreamHandler()
-            ]
-        )
-        
-        # Load existing data
-        self.load_trading_data()
+        if self.persist:
+            # Create data directory
+            os.makedirs(self.data_dir, exist_ok=True)
+            
+            # Setup logging
+            logging.basicConfig(
+                level=logging.INFO,
+                format='%(asctime)s - %(levelname)s - %(message)s',
+                handlers=[
+                    logging.FileHandler(f"{self.data_dir}/trading.log"),
+                    logging.StreamHandler()
+                ]
+            )
+            
+            # Load existing data
+            self.load_trading_data()
+    
+    @property
+    def equity_curve(self):
+        """Recent equity points (oldest first)"""
+        return self.equity_history.points()
         
     def load_trading_data(self):
         """Load existing trading data from files"""
@@ -70,6 +100,7 @@ class RealTimeTrader:
                     self.current_balance = data.get('balance', self.initial_balance)
                     self.savings_account = data.get('savings_account', 0.0)
                     self.current_scaling_multiplier = data.get('scaling_multiplier', 1.0)
+                    self.open_position = data.get('open_position')
                     logging.info(f"Loaded balance: ${self.current_balance:.2f}, Savings: ${self.savings_account:.2f}")
             
             # Load trade history
@@ -78,24 +109,41 @@ class RealTimeTrader:
                     self.trade_history = json.load(f)
                     logging.info(f"Loaded {len(self.trade_history)} historical trades")
             
-            # Load equity curve
+            # Count trades already in the journal
+            if os.path.exists(self.trades_journal_file):
+                with open(self.trades_journal_file, 'r') as f:
+                    self.journaled_trades = sum(1 for line in f if line.strip())
+            
+            # Load equity curve and its downsampled tiers
+            equity_points = []
+            equity_tiers = None
             if os.path.exists(self.equity_file):
                 with open(self.equity_file, 'r') as f:
-                    self.equity_curve = json.load(f)
-                    logging.info(f"Loaded {len(self.equity_curve)} equity points")
+                    equity_points = json.load(f)
+            if os.path.exists(self.equity_tiers_file):
+                with open(self.equity_tiers_file, 'r') as f:
+                    equity_tiers = json.load(f)
+            if equity_points or equity_tiers:
+                self.equity_history.load(equity_points, equity_tiers)
+                logging.info(f"Loaded {len(self.equity_history)} equity points")
                     
         except Exception as e:
             logging.error(f"Error loading trading data: {e}")
+            self.metrics.increment('trading_errors_total', stage='load')
     
     def save_trading_data(self):
         """Save current trading data to files"""
+        if not self.persist:
+            return
+        
         try:
             # Save balance
             balance_data = {
                 'balance': self.current_balance,
                 'savings_account': self.savings_account,
                 'scaling_multiplier': self.current_scaling_multiplier,
-                'last_updated': datetime.now().isoformat()
+                'open_position': self.open_position,
+                'last_updated': self.clock().isoformat()
             }
             with open(self.balance_file, 'w') as f:
                 json.dump(balance_data, f, indent=2)
@@ -104,12 +152,22 @@ class RealTimeTrader:
             with open(self.trades_file, 'w') as f:
                 json.dump(self.trade_history, f, indent=2)
             
-            # Save equity curve
+            # Append new trades to the journal (read incrementally by the dashboard)
+            if len(self.trade_history) > self.journaled_trades:
+                with open(self.trades_journal_file, 'a') as f:
+                    for trade in self.trade_history[self.journaled_trades:]:
+                        f.write(json.dumps(trade) + '\n')
+                self.journaled_trades = len(self.trade_history)
+            
+            # Save equity curve (bounded) and downsampled tiers
             with open(self.equity_file, 'w') as f:
                 json.dump(self.equity_curve, f, indent=2)
+            with open(self.equity_tiers_file, 'w') as f:
+                json.dump(self.equity_history.tiers_to_dict(), f)
                 
         except Exception as e:
             logging.error(f"Error saving trading data: {e}")
+            self.metrics.increment('trading_errors_total', stage='persist')
     
     def get_current_market_data(self, timeframe='5m', limit=100):
         """Get current market data (demo version - will be replaced with real API)"""
@@ -121,9 +179,10 @@ class RealTimeTrader:
             
             logging.info(f"Demo mode: Using cached data from {start_date} to {end_date}")
             
-            data = self.backtester._fetch_historical_data(
-                self.symbol, start_date, end_date, timeframe
-            )
+            with self.metrics.stage('fetch'):
+                data = self.backtester._fetch_historical_data(
+                    self.symbol, start_date, end_date, timeframe
+                )
             
             if data.empty:
                 logging.error("No market data available")
@@ -135,10 +194,20 @@ class RealTimeTrader:
                 latest_time = latest_candle.name
                 logging.info(f"Latest candle: {latest_time} - O:{latest_candle['open']:.4f} H:{latest_candle['high']:.4f} L:{latest_candle['low']:.4f} C:{latest_candle['close']:.4f}")
             
-            # Add basic indicators only (avoid complex indicators that might cause index errors)
-            try:
-                # Add only essential indicators for ultra_simple_strategy
-                if not data.empty and len(data) >= 2:
+            return self.add_market_indicators(data)
+            
+        except Exception as e:
+            logging.error(f"Error getting market data: {e}")
+            self.metrics.increment('trading_errors_total', stage='fetch')
+            return None
+    
+    def add_market_indicators(self, data):
+        """Indicators the executing strategy needs, added to the fetched candles"""
+        # Add basic indicators only (avoid complex indicators that might cause index errors)
+        try:
+            # Add only essential indicators for ultra_simple_strategy
+            if not data.empty and len(data) >= 2:
+                with self.metrics.stage('indicators'):
                     # Basic indicators that ultra_simple_strategy needs
                     data['ema_20'] = self.backtester.indicators.calculate_ema(data['close'], 20)
                     data['ema_50'] = self.backtester.indicators.calculate_ema(data['close'], 50)
@@ -146,17 +215,14 @@ class RealTimeTrader:
                     
                     # Fill NaN values
                     data = data.ffill().bfill()
-                else:
-                    logging.warning(f"Data too short for indicators: {len(data)} candles")
-            except Exception as e:
-                logging.error(f"Error adding indicators: {e}")
-                # Continue without indicators if there's an error
-            
-            return data
-            
+            else:
+                logging.warning(f"Data too short for indicators: {len(data)} candles")
         except Exception as e:
-            logging.error(f"Error getting market data: {e}")
-            return None
+            logging.error(f"Error adding indicators: {e}")
+            self.metrics.increment('trading_errors_total', stage='indicators')
+            # Continue without indicators if there's an error
+        
+        return data
     
     def check_position_exit(self, current_price):
         """Check if current position should be closed"""
@@ -219,7 +285,7 @@ class RealTimeTrader:
         # Record trade
         trade = {
             'entry_time': position['entry_time'],
-            'exit_time': datetime.now().isoformat(),
+            'exit_time': self.clock().isoformat(),
             'entry_price': entry_price,
             'exit_price': exit_price,
             'side': position['side'],
@@ -249,6 +315,7 @@ class RealTimeTrader:
         
         # Clear position
         self.open_position = None
+        self.metrics.increment('trading_positions_closed_total', exit_type=exit_type)
         
         logging.info(f"Position closed: {exit_type} at ${exit_price:.4f}, PnL: ${pnl:.2f}, Balance: ${self.current_balance:.2f}")
         
@@ -264,7 +331,7 @@ class RealTimeTrader:
             current_data = data
             
             # Get signal from strategy
-            signal = self.backtester._get_signal(current_data, self.strategy_name, '5m')
+            signal = self.backtester._get_signal(current_data, self.strategy_name, self.timeframe)
             
             if signal:
                 logging.info(f"Signal generated: {signal.get('signal', 'None')}")
@@ -275,6 +342,7 @@ class RealTimeTrader:
             
         except Exception as e:
             logging.error(f"Error getting signal: {e}")
+            self.metrics.increment('trading_errors_total', stage='signal')
             return None
     
     def open_new_position(self, signal, current_price):
@@ -302,7 +370,7 @@ class RealTimeTrader:
             position = {
                 'side': signal['signal'],
                 'entry_price': current_price,
-                'entry_time': datetime.now().isoformat(),
+                'entry_time': self.clock().isoformat(),
                 'strategy': signal['strategy'],
                 'stop_loss': signal['stop_loss'],
                 'take_profit': take_profit,
@@ -314,6 +382,7 @@ class RealTimeTrader:
             }
             
             self.open_position = position
+            self.metrics.increment('trading_positions_opened_total', side=signal['signal'])
             
             logging.info(f"New position opened: {signal['signal'].upper()} at ${current_price:.4f}, "
                         f"SL: ${signal['stop_loss']:.4f}, TP: ${take_profit:.4f}, "
@@ -323,33 +392,59 @@ class RealTimeTrader:
             
         except Exception as e:
             logging.error(f"Error opening position: {e}")
+            self.metrics.increment('trading_errors_total', stage='open')
             return None
     
     def update_equity_curve(self):
         """Update equity curve with current balance"""
         equity_point = {
-            'time': datetime.now().isoformat(),
+            'time': self.clock().isoformat(),
             'balance': self.current_balance,
             'savings_account': self.savings_account,
             'total_wealth': self.current_balance + self.savings_account,
             'open_position': self.open_position is not None
         }
         
-        self.equity_curve.append(equity_point)
-        
-        # Keep only last 1000 points
-        if len(self.equity_curve) > 1000:
-            self.equity_curve = self.equity_curve[-1000:]
+        # Ring buffer keeps the last 1000 points; older history survives in the hourly/daily tiers
+        self.equity_history.append(equity_point)
+    
+    def record_decision_lag(self, data):
+        """Record the delay between the latest candle close and the trading decision"""
+        try:
+            minutes = self.config.TIMEFRAME_MINUTES.get(self.timeframe, 5)
+            candle_close = pd.Timestamp(data.index[-1]) + timedelta(minutes=minutes)
+            lag = (pd.Timestamp(self.clock()) - candle_close).total_seconds()
+            # Replay clocks sit at the candle open, so negative lags are clipped
+            self.metrics.observe('trading_decision_lag_seconds', max(lag, 0.0))
+        except (TypeError, ValueError):
+            # Index is not timestamp-like
+            pass
+    
+    def export_metrics(self):
+        """Write cycle metrics in the Prometheus text format"""
+        try:
+            self.metrics.write(self.metrics_file)
+        except OSError as e:
+            logging.error(f"Error writing metrics: {e}")
     
     def run_trading_cycle(self):
         """Run one complete trading cycle"""
+        with self.metrics.cycle():
+            self._run_cycle_steps()
+        
+        if self.persist:
+            self.export_metrics()
+    
+    def _run_cycle_steps(self):
+        """Fetch data, manage the open position and look for a new entry"""
         try:
-            logging.info(f"=== Trading Cycle Started at {datetime.now()} ===")
+            logging.info(f"=== Trading Cycle Started at {self.clock()} ===")
             
             # Get current market data
-            data = self.get_current_market_data()
+            data = self.get_current_market_data(self.timeframe)
             if data is None or data.empty:
                 logging.error("No market data available")
+                self.metrics.increment('trading_errors_total', stage='no_data')
                 return
             
             current_price = data.iloc[-1]['close']
@@ -358,21 +453,27 @@ class RealTimeTrader:
             # Check if we have an open position
             if self.open_position:
                 # Check for exit
-                exit_type, exit_price = self.check_position_exit(current_price)
-                if exit_type:
-                    self.close_position(exit_type, exit_price)
+                with self.metrics.stage('exit_check'):
+                    exit_type, exit_price = self.check_position_exit(current_price)
+                    if exit_type:
+                        self.close_position(exit_type, exit_price)
             
             # Look for new signal if no position
             if not self.open_position:
-                signal = self.get_signal(data)
+                with self.metrics.stage('signal'):
+                    signal = self.get_signal(data)
                 if signal and signal['signal'] in ['long', 'short']:
+                    self.metrics.increment('trading_signals_total', side=signal['signal'])
                     self.open_new_position(signal, current_price)
+            self.record_decision_lag(data)
             
             # Update equity curve
             self.update_equity_curve()
+            self.after_decision(data)
             
             # Save data
-            self.save_trading_data()
+            with self.metrics.stage('persist'):
+                self.save_trading_data()
             
             # Log summary
             total_wealth = self.current_balance + self.savings_account
@@ -388,6 +489,11 @@ class RealTimeTrader:
             
         except Exception as e:
             logging.error(f"Error in trading cycle: {e}")
+            self.metrics.increment('trading_errors_total', stage='cycle')
+    
+    def after_decision(self, data):
+        """Hook called with the cycle's candles once the executing strategy acted, before state is saved"""
+        pass
     
     def get_trading_summary(self):
         """Get trading summary"""
@@ -410,7 +516,7 @@ class RealTimeTrader:
             'losing_trades': len(losing_trades),
             'win_rate': win_rate,
             'open_position': self.open_position is not None,
-            'last_updated': datetime.now().isoformat()
+            'last_updated': self.clock().isoformat()
         }
 
 def main():
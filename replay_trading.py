@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Historical Replay for the Real-time Trading System
+Feeds stored candles through RealTimeTrader.run_trading_cycle at full speed
+and diffs the live decisions against the Backtester trade list
+"""
+
+import sys
+import logging
+import argparse
+from datetime import datetime
+import pandas as pd
+from real_time_trader import RealTimeTrader
+from backtest import Backtester
+from utils.data_cache import DataCache
+
+class SimulatedClock:
+    """Clock that only moves when the replay driver advances it"""
+
+    def __init__(self, start_time=None):
+        self.current_time = start_time or datetime(1970, 1, 1)
+
+    def __call__(self):
+        return self.current_time
+
+    def set(self, current_time):
+        """Move the clock to a new time"""
+        if isinstance(current_time, pd.Timestamp):
+            current_time = current_time.to_pydatetime()
+        self.current_time = current_time
+
+class ReplayTrader(RealTimeTrader):
+    """RealTimeTrader whose market data comes from a stored candle frame"""
+
+    def __init__(self, candles, lookback=100, backtest_indicators=False, **kwargs):
+        """
+        Args:
+            candles: OHLCV DataFrame
+            lookback: Number of candles in each market data window
+            backtest_indicators: Slice Backtester indicators computed once over the
+                whole history instead of running add_market_indicators on each
+                window (faster, but skips the live indicator path)
+            **kwargs: Passed through to RealTimeTrader
+        """
+        self.clock_source = SimulatedClock()
+        kwargs.setdefault('persist', False)
+        super().__init__(clock=self.clock_source, **kwargs)
+
+        if backtest_indicators:
+            candles = self.backtester._add_indicators(candles.copy())
+        self.candles = candles
+        self.lookback = lookback
+        self.backtest_indicators = backtest_indicators
+        self.cursor = -1
+
+    def advance(self, index):
+        """Point the trader at candle `index` and move the clock to its timestamp"""
+        self.cursor = index
+        self.clock_source.set(self.candles.index[index])
+
+    def get_current_market_data(self, timeframe='5m', limit=100):
+        """Return the replay window ending at the current cursor, with live indicators"""
+        if self.cursor < 0:
+            return None
+        start = max(0, self.cursor - self.lookback + 1)
+        window = self.candles.iloc[start:self.cursor + 1]
+        if self.backtest_indicators:
+            return window
+        return self.add_market_indicators(window.copy())
+
+def load_candles(symbol, timeframe, start_date, end_date, backtester=None):
+    """
+    Load stored candles for a replay
+
+    Stale cache files are accepted (historical candles never change); the
+    exchange is only used when no cache file exists for the range.
+
+    Returns:
+        DataFrame: OHLCV data
+    """
+    cache = DataCache()
+    data = cache.load_data(symbol, timeframe, start_date, end_date, max_age_hours=float('inf'))
+    if data is not None:
+        return data
+
+    backtester = backtester or Backtester()
+    return backtester._fetch_historical_data(symbol, start_date, end_date, timeframe)
+
+def _to_timestamp(value):
+    """Normalize trade timestamps (datetime, Timestamp or ISO string)"""
+    if value is None:
+        return None
+    return pd.Timestamp(value)
+
+def diff_trades(live_trades, backtest_trades, price_tolerance=1e-9, pnl_tolerance=1e-6):
+    """
+    Compare live-cycle trades against backtest trades
+
+    Trades are matched by entry time. A matched pair is a mismatch when side,
+    exit time, exit type, exit price or PnL differ.
+
+    Returns:
+        dict: matched count, mismatches, live_only and backtest_only trades
+    """
+    live_by_entry = {_to_timestamp(t['entry_time']): t for t in live_trades}
+    backtest_by_entry = {_to_timestamp(t['entry_time']): t for t in backtest_trades}
+
+    matched = 0
+    mismatches = []
+
+    for entry_time in sorted(set(live_by_entry) & set(backtest_by_entry)):
+        live = live_by_entry[entry_time]
+        expected = backtest_by_entry[entry_time]
+        differences = {}
+
+        if live['side'] != expected['side']:
+            differences['side'] = (live['side'], expected['side'])
+        if _to_timestamp(live['exit_time']) != _to_timestamp(expected['exit_time']):
+            differences['exit_time'] = (live['exit_time'], expected['exit_time'])
+        if live['exit_type'] != expected['exit_type']:
+            differences['exit_type'] = (live['exit_type'], expected['exit_type'])
+        if abs(live['exit_price'] - expected['exit_price']) > price_tolerance * max(1.0, abs(expected['exit_price'])):
+            differences['exit_price'] = (live['exit_price'], expected['exit_price'])
+        if abs(live['pnl'] - expected['pnl']) > pnl_tolerance * max(1.0, abs(expected['pnl'])):
+            differences['pnl'] = (live['pnl'], expected['pnl'])
+
+        if differences:
+            mismatches.append({'entry_time': entry_time, 'differences': differences})
+        else:
+            matched += 1
+
+    live_only = [live_by_entry[t] for t in sorted(set(live_by_entry) - set(backtest_by_entry))]
+    backtest_only = [backtest_by_entry[t] for t in sorted(set(backtest_by_entry) - set(live_by_entry))]
+
+    return {
+        'live_trades': len(live_trades),
+        'backtest_trades': len(backtest_trades),
+        'matched': matched,
+        'mismatches': mismatches,
+        'live_only': live_only,
+        'backtest_only': backtest_only,
+        'identical': not mismatches and not live_only and not backtest_only
+    }
+
+def run_replay(candles, symbol='SUIUSDT', strategy_name='ultra_simple_strategy', timeframe='5m',
+               initial_balance=1000, no_fees=True, lookback=100, warmup=50, reward_ratio=1.0,
+               compare=True, backtest_indicators=False):
+    """
+    Replay stored candles through the live trading cycle
+
+    Args:
+        candles: Raw OHLCV DataFrame
+        symbol: Trading symbol
+        strategy_name: Strategy used by both the live cycle and the backtest
+        timeframe: Candle timeframe
+        initial_balance: Initial balance
+        no_fees: Disable trading fees
+        lookback: Candles per live market data window
+        warmup: First candle index to trade (the backtest skips the first 50)
+        reward_ratio: Reward ratio for the comparison backtest (live uses 1:1)
+        compare: Run the backtest and diff the trade lists
+        backtest_indicators: Feed the live cycle Backtester indicators instead of
+            the live add_market_indicators path
+
+    Returns:
+        dict: Replay summary, live trades and (optionally) the trade diff
+    """
+    trader = ReplayTrader(
+        candles,
+        lookback=lookback,
+        backtest_indicators=backtest_indicators,
+        symbol=symbol,
+        initial_balance=initial_balance,
+        strategy_name=strategy_name,
+        no_fees=no_fees
+    )
+
+    # Per-cycle INFO logging dominates replay time
+    root_logger = logging.getLogger()
+    previous_level = root_logger.level
+    root_logger.setLevel(logging.WARNING)
+
+    started = datetime.now()
+    try:
+        for i in range(warmup, len(trader.candles)):
+            trader.advance(i)
+            trader.run_trading_cycle()
+    finally:
+        root_logger.setLevel(previous_level)
+    elapsed = (datetime.now() - started).total_seconds()
+
+    result = {
+        'cycles': max(0, len(trader.candles) - warmup),
+        'elapsed_seconds': elapsed,
+        'summary': trader.get_trading_summary(),
+        'trades': trader.trade_history
+    }
+
+    if compare:
+        backtest_results = trader.backtester.run_backtest(
+            symbol,
+            candles.index[0],
+            candles.index[-1],
+            initial_balance=initial_balance,
+            strategy_name=strategy_name,
+            timeframe=timeframe,
+            enable_scaling=trader.scaling_enabled,
+            scaling_threshold=trader.scaling_threshold,
+            scaling_multiplier=trader.scaling_multiplier,
+            no_fees=no_fees,
+            reward_ratio=reward_ratio,
+            data=candles.copy()
+        )
+        backtest_trades = backtest_results['trades'] if backtest_results else []
+        result['backtest'] = backtest_results
+        result['diff'] = diff_trades(trader.trade_history, backtest_trades)
+
+    return result
+
+def print_replay_report(result):
+    """Print replay summary and trade diff"""
+    summary = result['summary']
+
+    print("\n" + "="*60)
+    print("🔁 REPLAY SUMMARY")
+    print("="*60)
+    print(f"Cycles:          {result['cycles']}")
+    print(f"Elapsed:         {result['elapsed_seconds']:.2f}s")
+    if result['elapsed_seconds'] > 0:
+        print(f"Cycles/second:   {result['cycles'] / result['elapsed_seconds']:.0f}")
+    print(f"Final Balance:   ${summary['current_balance']:.2f}")
+    print(f"Savings Account: ${summary['savings_account']:.2f}")
+    print(f"Total Return:    {summary['total_return']:.2f}%")
+    print(f"Live Trades:     {summary['total_trades']}")
+    print(f"Win Rate:        {summary['win_rate']:.1f}%")
+
+    diff = result.get('diff')
+    if diff is None:
+        return
+
+    print("\n📋 LIVE vs BACKTEST")
+    print("-" * 60)
+    print(f"Backtest Trades: {diff['backtest_trades']}")
+    print(f"Matched:         {diff['matched']}")
+    print(f"Mismatched:      {len(diff['mismatches'])}")
+    print(f"Live only:       {len(diff['live_only'])}")
+    print(f"Backtest only:   {len(diff['backtest_only'])}")
+
+    for mismatch in diff['mismatches'][:10]:
+        print(f"  {mismatch['entry_time']}:")
+        for field, (live, expected) in mismatch['differences'].items():
+            print(f"     {field}: live={live} backtest={expected}")
+
+    if diff['identical']:
+        print("✅ Live cycle matches backtest")
+    else:
+        print("⚠️  Live cycle diverges from backtest")
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Replay stored candles through the live trading cycle')
+    parser.add_argument('--symbol', default='SUIUSDT', help='Trading symbol')
+    parser.add_argument('--timeframe', default='5m', help='Candle timeframe')
+    parser.add_argument('--start_date', default='2025-08-01', help='Start date (YYYY-MM-DD)')
+    parser.add_argument('--end_date', default='2025-08-22', help='End date (YYYY-MM-DD)')
+    parser.add_argument('--strategy', default='ultra_simple_strategy', help='Strategy name')
+    parser.add_argument('--balance', type=float, default=1000, help='Initial balance')
+    parser.add_argument('--reward_ratio', type=float, default=1.0, help='Reward ratio for the comparison backtest')
+    parser.add_argument('--no_fees', type=int, choices=[0, 1], default=1, help='Disable trading fees')
+    parser.add_argument('--no_compare', action='store_true', help='Skip the backtest comparison')
+    parser.add_argument('--backtest_indicators', action='store_true',
+                        help='Use Backtester indicators instead of the live indicator path')
+    args = parser.parse_args()
+
+    try:
+        start_date = datetime.strptime(args.start_date, '%Y-%m-%d')
+        end_date = datetime.strptime(args.end_date, '%Y-%m-%d')
+    except ValueError as e:
+        print(f"❌ Invalid date format: {e}")
+        return 1
+
+    candles = load_candles(args.symbol, args.timeframe, start_date, end_date)
+    if candles is None or candles.empty:
+        print("❌ No candles available for replay")
+        return 1
+
+    print(f"🔁 Replaying {len(candles)} {args.timeframe} candles for {args.symbol} ({args.strategy})")
+
+    result = run_replay(
+        candles,
+        symbol=args.symbol,
+        strategy_name=args.strategy,
+        timeframe=args.timeframe,
+        initial_balance=args.balance,
+        no_fees=bool(args.no_fees),
+        reward_ratio=args.reward_ratio,
+        compare=not args.no_compare,
+        backtest_indicators=args.backtest_indicators
+    )
+    print_replay_report(result)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
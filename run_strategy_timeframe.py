@@ -9,13 +9,15 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from backtest import Backtester
+from utils.monte_carlo import run_monte_carlo, print_monte_carlo
+from utils.result_store import ResultStore, cached_backtest
+from utils.checkpoint import BacktestCheckpoint
+from utils.profiler import BacktestProfiler, NULL_PROFILER
 from datetime import datetime
 import argparse
 
-def run_strategy_with_timeframe(strategy_name, timeframe, symbol='BTCUSDT', start_date=None, end_date=None, initial_balance=10000, atr_multiplier=None, reward_ratio=None, trailing_ratio=None, is_reverse=False, show_history_balance=False, enable_scaling=False, scaling_threshold=1.0, scaling_multiplier=2.0, no_fees=False):
-    """Run a specific strategy with specified timeframe and date range"""
-    
-    # Build strategy name with parameters if provided
+def build_strategy_name(strategy_name, atr_multiplier=None, reward_ratio=None, trailing_ratio=None, is_reverse=False):
+    """Strategy name with the parameters encoded the way Backtester._get_signal parses them"""
     if atr_multiplier is not None or reward_ratio is not None or trailing_ratio is not None or is_reverse:
         if strategy_name == 'ultra_simple_strategy':
             strategy_parts = ['ultra_simple_strategy']
@@ -113,6 +115,53 @@ def run_strategy_with_timeframe(strategy_name, timeframe, symbol='BTCUSDT', star
             if is_reverse:
                 strategy_parts.append('reverse')
             strategy_name = '_'.join(strategy_parts)
+    return strategy_name
+
+def strategy_job(strategy_name, timeframe, symbol='BTCUSDT', start_date=None, end_date=None, initial_balance=10000, atr_multiplier=None, reward_ratio=None, trailing_ratio=None, is_reverse=False, enable_scaling=False, scaling_threshold=1.0, scaling_multiplier=2.0, no_fees=False, base_timeframe=None):
+    """
+    The backtest run_strategy_with_timeframe performs for these arguments, as a
+    JSON-serialisable job (see utils.job_queue); values are normalised so the
+    same cell always gets the same result store key
+    """
+    def date_string(value, default):
+        if value is None:
+            return default
+        return value if isinstance(value, str) else value.strftime('%Y-%m-%d')
+    
+    return {
+        'symbol': symbol,
+        'timeframe': timeframe,
+        'start_date': date_string(start_date, '2025-08-15'),
+        'end_date': date_string(end_date, '2025-08-22'),
+        'strategy_name': build_strategy_name(strategy_name, atr_multiplier, reward_ratio, trailing_ratio, is_reverse),
+        'base_timeframe': base_timeframe,
+        'backtest': {
+            'initial_balance': float(initial_balance),
+            'enable_scaling': bool(enable_scaling),
+            'scaling_threshold': float(scaling_threshold),
+            'scaling_multiplier': float(scaling_multiplier),
+            'no_fees': bool(no_fees),
+            'reward_ratio': float(reward_ratio) if reward_ratio is not None else 3.0
+        }
+    }
+
+def run_strategy_with_timeframe(strategy_name, timeframe, symbol='BTCUSDT', start_date=None, end_date=None, initial_balance=10000, atr_multiplier=None, reward_ratio=None, trailing_ratio=None, is_reverse=False, show_history_balance=False, enable_scaling=False, scaling_threshold=1.0, scaling_multiplier=2.0, no_fees=False, base_timeframe=None, monte_carlo=0, result_store=None, checkpoint=None, profile=False, profile_memory=False, profiler=None):
+    """
+    Run a specific strategy with specified timeframe and date range
+    
+    result_store: ResultStore reusing results of identical earlier runs (None = always run)
+    checkpoint: Checkpoint directory; rerunning the same command after an interruption
+                continues from the last checkpoint
+    profile: Time the backtest stages and print where the time went
+    profile_memory: Track peak and retained memory of the fetch, indicators, simulation,
+                    metrics and report phases and print them
+    profiler: BacktestProfiler shared across calls (e.g. a sweep); nothing is printed
+    
+    Returns:
+        dict: run_backtest results (None on failure)
+    """
+    
+    strategy_name = build_strategy_name(strategy_name, atr_multiplier, reward_ratio, trailing_ratio, is_reverse)
     
     # Get symbol info
     from config import TradingConfig
@@ -146,7 +195,7 @@ def run_strategy_with_timeframe(strategy_name, timeframe, symbol='BTCUSDT', star
     print("=" * 60)
     
     # Create backtester
-    backtester = Backtester()
+    backtester = Backtester(base_timeframe=base_timeframe)
     
     # Use provided dates or defaults
     if start_date is None:
@@ -163,19 +212,34 @@ def run_strategy_with_timeframe(strategy_name, timeframe, symbol='BTCUSDT', star
     print(f"💰 Initial balance: ${initial_balance:,.0f} USDT")
     print("=" * 60)
     
+    if profiler is None and (profile or profile_memory):
+        profiler = BacktestProfiler(slowest_bars=5 if profile else 0, timing=profile, memory=profile_memory)
+    profiler = profiler or NULL_PROFILER
+    
+    strategy_results = None
     try:
-        strategy_results = backtester.run_backtest(
+        # The store keys results by the candles, so fetch them up front
+        data = None
+        if result_store is not None:
+            with profiler.memory('fetch'):
+                data = backtester._fetch_historical_data(symbol, start_date, end_date, timeframe)
+        
+        strategy_results = cached_backtest(
+            result_store,
+            backtester,
+            data,
             symbol=symbol,
             strategy_name=strategy_name,
             start_date=start_date,
             end_date=end_date,
-            initial_balance=initial_balance,
             timeframe=timeframe,
-            enable_scaling=enable_scaling,
-            scaling_threshold=scaling_threshold,
-            scaling_multiplier=scaling_multiplier,
-            no_fees=no_fees,
-            reward_ratio=reward_ratio if reward_ratio is not None else 3.0
+            # Same normalised arguments as queued jobs, so both share result store entries
+            **strategy_job(strategy_name, timeframe, symbol, initial_balance=initial_balance,
+                           reward_ratio=reward_ratio, enable_scaling=enable_scaling,
+                           scaling_threshold=scaling_threshold, scaling_multiplier=scaling_multiplier,
+                           no_fees=no_fees)['backtest'],
+            checkpoint=BacktestCheckpoint(checkpoint) if checkpoint else None,
+            profiler=profiler
         )
         
         if strategy_results:
@@ -243,22 +307,31 @@ def run_strategy_with_timeframe(strategy_name, timeframe, symbol='BTCUSDT', star
             else:
                 print("❌ Unprofitable strategy")
             
+            # Distribution of outcomes over resampled trade sequences
+            if monte_carlo:
+                print_monte_carlo(run_monte_carlo(
+                    strategy_results.get('trades', []), initial_balance, n_paths=monte_carlo,
+                    enable_scaling=enable_scaling, scaling_threshold=scaling_threshold,
+                    scaling_multiplier=scaling_multiplier
+                ))
+            
             # Export balance history to file if enabled
             if show_history_balance:
-                balance_history = strategy_results.get('balance_history', [])
-                if balance_history:
-                    # Generate filename with timestamp and organize by symbol/strategy
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    
-                    # Create directory structure: histories/symbol/strategy_name/
-                    import os
-                    strategy_dir = f"histories/{symbol}/{strategy_name}"
-                    os.makedirs(strategy_dir, exist_ok=True)
-                    
-                    filename = f"{strategy_dir}/{timeframe}_{timestamp}.md"
-                    
-                    # Create markdown content
-                    md_content = f"""# Balance History Report
+                with profiler.memory('report'):
+                    balance_history = strategy_results.get('balance_history', [])
+                    if balance_history:
+                        # Generate filename with timestamp and organize by symbol/strategy
+                        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                        
+                        # Create directory structure: histories/symbol/strategy_name/
+                        import os
+                        strategy_dir = f"histories/{symbol}/{strategy_name}"
+                        os.makedirs(strategy_dir, exist_ok=True)
+                        
+                        filename = f"{strategy_dir}/{timeframe}_{timestamp}.md"
+                        
+                        # Create markdown content
+                        md_content = f"""# Balance History Report
 
 ## Strategy Information
 - **Strategy**: {strategy_name}
@@ -287,24 +360,24 @@ def run_strategy_with_timeframe(strategy_name, timeframe, symbol='BTCUSDT', star
 | Trade # | Date | Type | Entry | Exit | SL | TP | Size | PnL | Balance | Return% | Scaling |
 |---------|------|------|-------|------|----|----|----|-----|---------|---------|---------|
 """
-                    
-                    for i, trade in enumerate(balance_history, 1):
-                        trade_type = trade.get('type', 'N/A')
-                        entry_price = trade.get('entry_price', 0)
-                        exit_price = trade.get('exit_price', 0)
-                        stop_loss = trade.get('stop_loss', 0)
-                        take_profit = trade.get('take_profit', 0)
-                        position_size = trade.get('position_size', 0)
-                        pnl = trade.get('pnl', 0)
-                        balance = trade.get('balance', initial_balance)
-                        return_pct = ((balance - initial_balance) / initial_balance) * 100
-                        date = trade.get('date', 'N/A')
-                        scaling_details = trade.get('scaling_details', '')
                         
-                        md_content += f"| {i} | {date} | {trade_type} | ${entry_price:.2f} | ${exit_price:.2f} | ${stop_loss:.2f} | ${take_profit:.2f} | {position_size:.4f} | ${pnl:.2f} | ${balance:.2f} | {return_pct:.2f}% | {scaling_details} |\n"
-                    
-                    # Add summary statistics
-                    md_content += f"""
+                        for i, trade in enumerate(balance_history, 1):
+                            trade_type = trade.get('type', 'N/A')
+                            entry_price = trade.get('entry_price', 0)
+                            exit_price = trade.get('exit_price', 0)
+                            stop_loss = trade.get('stop_loss', 0)
+                            take_profit = trade.get('take_profit', 0)
+                            position_size = trade.get('position_size', 0)
+                            pnl = trade.get('pnl', 0)
+                            balance = trade.get('balance', initial_balance)
+                            return_pct = ((balance - initial_balance) / initial_balance) * 100
+                            date = trade.get('date', 'N/A')
+                            scaling_details = trade.get('scaling_details', '')
+                            
+                            md_content += f"| {i} | {date} | {trade_type} | ${entry_price:.2f} | ${exit_price:.2f} | ${stop_loss:.2f} | ${take_profit:.2f} | {position_size:.4f} | ${pnl:.2f} | ${balance:.2f} | {return_pct:.2f}% | {scaling_details} |\n"
+                        
+                        # Add summary statistics
+                        md_content += f"""
 ## Summary Statistics
 
 ### Performance Metrics
@@ -331,22 +404,34 @@ def run_strategy_with_timeframe(strategy_name, timeframe, symbol='BTCUSDT', star
 ---
 *Generated by BTC Strategy Backtester*
 """
-                    
-                    # Write to file
-                    try:
-                        with open(filename, 'w', encoding='utf-8') as f:
-                            f.write(md_content)
-                        print(f"\n📊 BALANCE HISTORY: Exported to {filename}")
-                    except Exception as e:
-                        print(f"\n❌ Error exporting balance history: {e}")
+                        
+                        # Write to file
+                        try:
+                            with open(filename, 'w', encoding='utf-8') as f:
+                                f.write(md_content)
+                            print(f"\n📊 BALANCE HISTORY: Exported to {filename}")
+                        except Exception as e:
+                            print(f"\n❌ Error exporting balance history: {e}")
+                    else:
+                        print(f"\n📊 BALANCE HISTORY: No trades to export")
+            
+            if profile or profile_memory:
+                print("\n⏱️  PROFILE:")
+                print("-" * 40)
+                if 'profile' in strategy_results:
+                    # Again, now that the report phase is done
+                    strategy_results['profile'] = profiler.summary()
+                    print(BacktestProfiler.format_profile(strategy_results['profile']))
                 else:
-                    print(f"\n📊 BALANCE HISTORY: No trades to export")
+                    print("Result came from the result store, nothing was profiled")
                 
         else:
             print("❌ Strategy failed: No results")
             
     except Exception as e:
         print(f"❌ Error: {str(e)}")
+    
+    return strategy_results
 
 def main():
     """Main function"""
@@ -366,6 +451,12 @@ def main():
     parser.add_argument('--scaling_threshold', type=float, default=1.0, help='R:R threshold to start scaling (e.g., 1.0, 1.5, 2.0)')
     parser.add_argument('--scaling_multiplier', type=float, default=2.0, help='Risk multiplier when scaling (e.g., 2.0 for 2R, 3.0 for 3R)')
     parser.add_argument('--no_fees', type=int, choices=[0, 1], default=0, help='Disable trading fees (0=normal fees, 1=no fees)')
+    parser.add_argument('--base_timeframe', default=None, help='Derive the timeframe from cached candles of this timeframe (e.g., 5m)')
+    parser.add_argument('--monte_carlo', type=int, default=0, help='Monte Carlo bootstrap paths over the trades (0=off, e.g., 10000)')
+    parser.add_argument('--result_store', default=None, help='SQLite result store reused across runs (e.g., cache/results.sqlite)')
+    parser.add_argument('--profile', type=int, choices=[0, 1], default=0, help='Print per-stage backtest timings (0=no, 1=yes)')
+    parser.add_argument('--profile_memory', type=int, choices=[0, 1], default=0, help='Print peak/retained memory per pipeline phase (0=no, 1=yes)')
+    parser.add_argument('--checkpoint', default=None, help='Checkpoint directory; rerun the same command to resume (e.g., cache/checkpoints/sui_5m)')
     
     # Check if arguments provided
     if len(sys.argv) < 3:
@@ -486,7 +577,13 @@ def main():
         enable_scaling=args.enable_scaling,
         scaling_threshold=args.scaling_threshold,
         scaling_multiplier=args.scaling_multiplier,
-        no_fees=args.no_fees
+        no_fees=args.no_fees,
+        base_timeframe=args.base_timeframe,
+        monte_carlo=args.monte_carlo,
+        result_store=ResultStore(args.result_store) if args.result_store else None,
+        checkpoint=args.checkpoint,
+        profile=bool(args.profile),
+        profile_memory=bool(args.profile_memory)
     )
 
 if __name__ == "__main__":
@@ -88,7 +88,11 @@ class AdvancedStrategies:
         vsa_signals = self.indicators.calculate_vsa_signals(
             data['open'], data['high'], data['low'], data['close'], data['volume']
         )
-        obv = self.indicators.calculate_obv(data['close'], data['volume'])
+        # Cumulative from the first candle of the backtest, like the precomputed column
+        if 'obv' in data.columns:
+            obv = data['obv']
+        else:
+            obv = self.indicators.calculate_obv(data['close'], data['volume'])
         
         current_price = data['close'].iloc[-1]
         current_volume = data['volume'].iloc[-1]
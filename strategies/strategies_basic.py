@@ -345,7 +345,12 @@ class BasicStrategies:
         
         # Calculate indicators
         macd = self.indicators.calculate_macd(data['close'], 12, 26, 9)
-        vwap = self.indicators.calculate_vwap(data['high'], data['low'], data['close'], data['volume'])
+        # VWAP runs from the first candle of the backtest; the precomputed column holds those values
+        # (recomputing from `data` would restart it wherever the frame starts)
+        if 'vwap' in data.columns:
+            vwap = data['vwap']
+        else:
+            vwap = self.indicators.calculate_vwap(data['high'], data['low'], data['close'], data['volume'])
         
         # Get current values
         current_price = data['close'].iloc[-1]
@@ -8,7 +8,9 @@ import os
 import sys
 import pandas as pd
 from datetime import datetime, timedelta
-from run_strategy_timeframe import run_strategy_with_timeframe
+from run_strategy_timeframe import run_strategy_with_timeframe, strategy_job
+from utils.result_store import ResultStore
+from utils.job_queue import JobQueue
 
 def create_time_periods():
     """Create different time periods for testing"""
@@ -99,8 +101,26 @@ def create_time_periods():
     
     return periods
 
-def test_time_periods():
-    """Test strategy with different time periods"""
+def test_time_periods(result_store_path='cache/results.sqlite', enqueue_path=None):
+    """
+    Test strategy with different time periods
+    
+    result_store_path: SQLite store of finished periods; a rerun only computes periods whose
+                       candles or backtest code changed (None = recompute all)
+    enqueue_path: Only add the periods to this job queue for job_worker.py processes
+    """
+    
+    if enqueue_path:
+        jobs = [
+            strategy_job('ultra_simple_strategy', '5m', 'SUIUSDT', period['start'], period['end'], 100,
+                         reward_ratio=1.0, trailing_ratio=0, is_reverse=True, enable_scaling=True,
+                         scaling_threshold=1.0, scaling_multiplier=2.0, no_fees=True)
+            for period in create_time_periods()
+        ]
+        with JobQueue(enqueue_path) as queue:
+            added = queue.enqueue(jobs)
+        print(f"📥 Queued {added} new of {len(jobs)} periods in {enqueue_path}")
+        return None
     
     # Create reports directory
     reports_dir = 'reports'
@@ -113,6 +133,7 @@ def test_time_periods():
     
     # Get time periods
     periods = create_time_periods()
+    result_store = ResultStore(result_store_path) if result_store_path else None
     
     print(f"🔍 TESTING ULTRA_SIMPLE_STRATEGY WITH DIFFERENT TIME PERIODS")
     print(f"🪙 SYMBOL: SUIUSDT")
@@ -148,7 +169,8 @@ def test_time_periods():
                 scaling_threshold=1.0,
                 scaling_multiplier=2.0,
                 no_fees=True,
-                trailing_ratio=0
+                trailing_ratio=0,
+                result_store=result_store
             )
             
             if result and 'metrics' in result:
@@ -192,6 +214,9 @@ def test_time_periods():
             print(f"  ❌ Error: {str(e)}")
             continue
     
+    if result_store is not None:
+        result_store.close()
+    
     # Sort results by total return
     all_results.sort(key=lambda x: x['total_return'], reverse=True)
     
@@ -315,8 +340,11 @@ def generate_report(results, filename):
         f.write("*Generated by BTC Strategy Backtester*\n")
 
 if __name__ == "__main__":
-    # Run analysis
-    results = test_time_periods()
+    # Run analysis (--enqueue <queue file> only queues the periods for job_worker.py)
+    enqueue_path = sys.argv[sys.argv.index('--enqueue') + 1] if '--enqueue' in sys.argv else None
+    results = test_time_periods(enqueue_path=enqueue_path)
+    if enqueue_path:
+        sys.exit(0)
     
     print(f"\n✅ Time period analysis completed!")
     print(f"📊 Check the reports folder for detailed results.")
@@ -8,18 +8,21 @@ import os
 import json
 import sys
 from datetime import datetime
-from real_time_trader import RealTimeTrader
+from trading_state import TradingStateReader
 
-def print_dashboard():
+def get_reader(reader=None):
+    """Return the given reader or a freshly loaded one"""
+    if reader is None:
+        reader = TradingStateReader(symbol='SUIUSDT', initial_balance=1000)
+        reader.refresh()
+    return reader
+
+def print_dashboard(reader=None):
     """Print trading dashboard"""
     try:
-        trader = RealTimeTrader(
-            symbol='SUIUSDT',
-            initial_balance=1000,
-            strategy_name='ultra_simple_strategy'
-        )
+        reader = get_reader(reader)
         
-        summary = trader.get_trading_summary()
+        summary = reader.get_trading_summary()
         
         print("\n" + "="*80)
         print("🤖 REAL-TIME TRADING DASHBOARD")
@@ -52,7 +55,7 @@ def print_dashboard():
         print("📋 CURRENT POSITION")
         print("-" * 40)
         if summary['open_position']:
-            position = trader.open_position
+            position = reader.open_position
             print(f"Status:              {'OPEN':>10}")
             print(f"Side:                {position['side'].upper():>10}")
             print(f"Entry Price:         ${position['entry_price']:>10,.4f}")
@@ -67,11 +70,11 @@ def print_dashboard():
         # Recent trades
         print("📈 RECENT TRADES (Last 10)")
         print("-" * 80)
-        if trader.trade_history:
+        if reader.recent_trades:
             print(f"{'Time':<20} {'Side':<6} {'Entry':<10} {'Exit':<10} {'PnL':<10} {'Type':<12}")
             print("-" * 80)
             
-            for trade in trader.trade_history[-10:]:
+            for trade in list(reader.recent_trades)[-10:]:
                 time_str = datetime.fromisoformat(trade['exit_time']).strftime('%Y-%m-%d %H:%M')
                 side = trade['side'].upper()
                 entry = f"${trade['entry_price']:.4f}"
@@ -89,16 +92,31 @@ def print_dashboard():
     except Exception as e:
         print(f"❌ Error loading dashboard: {e}")
 
-def print_equity_chart():
-    """Print simple equity chart"""
+def print_equity_chart(reader=None, tier=None):
+    """Print simple equity chart (recent points, or a 'hourly'/'daily' OHLC tier)"""
     try:
-        trader = RealTimeTrader(
-            symbol='SUIUSDT',
-            initial_balance=1000,
-            strategy_name='ultra_simple_strategy'
-        )
+        reader = get_reader(reader)
+        
+        if tier:
+            rows = reader.equity_tiers.get(tier, [])
+            if not rows:
+                print(f"No {tier} equity data available")
+                return
+            
+            print(f"\n📈 EQUITY CURVE ({tier.upper()} OHLC, Last 20)")
+            print("-" * 70)
+            print(f"{'Time':<20} {'Open':<10} {'High':<10} {'Low':<10} {'Close':<10} {'Return':<10}")
+            print("-" * 70)
+            
+            for time_str, open_, high, low, close in rows[-20:]:
+                time_str = datetime.fromisoformat(time_str).strftime('%Y-%m-%d %H:%M')
+                return_pct = ((close - reader.initial_balance) / reader.initial_balance) * 100
+                print(f"{time_str:<20} {f'${open_:.0f}':<10} {f'${high:.0f}':<10} {f'${low:.0f}':<10} {f'${close:.0f}':<10} {f'{return_pct:.1f}%':<10}")
+            
+            print("-" * 70)
+            return
         
-        if not trader.equity_curve:
+        if not reader.equity_curve:
             print("No equity data available")
             return
         
@@ -107,7 +125,7 @@ def print_equity_chart():
         print(f"{'Time':<20} {'Balance':<10} {'Savings':<10} {'Total':<10} {'Return':<10}")
         print("-" * 60)
         
-        for point in trader.equity_curve[-20:]:
+        for point in reader.equity_curve[-20:]:
             time_str = datetime.fromisoformat(point['time']).strftime('%m-%d %H:%M')
             balance = f"${point['balance']:.0f}"
             savings = f"${point['savings_account']:.0f}"
@@ -122,24 +140,21 @@ def print_equity_chart():
     except Exception as e:
         print(f"❌ Error loading equity chart: {e}")
 
-def print_trade_details():
+def print_trade_details(reader=None):
     """Print detailed trade information"""
     try:
-        trader = RealTimeTrader(
-            symbol='SUIUSDT',
-            initial_balance=1000,
-            strategy_name='ultra_simple_strategy'
-        )
+        reader = get_reader(reader)
         
-        if not trader.trade_history:
+        if not reader.recent_trades:
             print("No trades available")
             return
         
         print("\n📋 DETAILED TRADE HISTORY")
         print("="*120)
         
-        for i, trade in enumerate(trader.trade_history[-20:], 1):
-            print(f"\nTrade #{len(trader.trade_history) - 20 + i}")
+        recent_trades = list(reader.recent_trades)[-20:]
+        for i, trade in enumerate(recent_trades, 1):
+            print(f"\nTrade #{reader.total_trades - len(recent_trades) + i}")
             print("-" * 50)
             print(f"Entry Time:    {trade['entry_time']}")
             print(f"Exit Time:     {trade['exit_time']}")
@@ -170,8 +185,10 @@ def main():
         print("Usage:")
         print("  python trading_dashboard.py dashboard    - Show main dashboard")
         print("  python trading_dashboard.py equity       - Show equity chart")
+        print("  python trading_dashboard.py equity daily - Show hourly/daily equity OHLC")
         print("  python trading_dashboard.py trades       - Show detailed trades")
         print("  python trading_dashboard.py all          - Show everything")
+        print("  python trading_dashboard.py watch [sec]  - Refresh dashboard when data changes")
         return
     
     command = sys.argv[1].lower()
@@ -179,13 +196,27 @@ def main():
     if command == "dashboard":
         print_dashboard()
     elif command == "equity":
-        print_equity_chart()
+        print_equity_chart(tier=sys.argv[2].lower() if len(sys.argv) > 2 else None)
     elif command == "trades":
         print_trade_details()
     elif command == "all":
-        print_dashboard()
-        print_equity_chart()
-        print_trade_details()
+        reader = get_reader()
+        print_dashboard(reader)
+        print_equity_chart(reader)
+        print_trade_details(reader)
+    elif command == "watch":
+        interval = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+        reader = TradingStateReader(symbol='SUIUSDT', initial_balance=1000)
+        
+        def redraw(reader):
+            os.system('cls' if os.name == 'nt' else 'clear')
+            print_dashboard(reader)
+            print_equity_chart(reader)
+        
+        try:
+            reader.watch(redraw, interval=interval)
+        except KeyboardInterrupt:
+            print("\n👋 Stopped watching")
     else:
         print(f"Unknown command: {command}")
 
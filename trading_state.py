@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Read-only view of the real-time trading state
+Reads the persisted balance, trades and equity files without constructing
+RealTimeTrader (no Backtester, exchange client or logging setup)
+"""
+
+import os
+import json
+import time
+from collections import deque
+from datetime import datetime
+
+class TradingStateReader:
+    """Incremental reader over the files written by RealTimeTrader"""
+
+    def __init__(self, symbol='SUIUSDT', initial_balance=1000, data_dir='real_time_data',
+                 max_recent_trades=100, max_equity_points=1000):
+        self.symbol = symbol
+        self.initial_balance = initial_balance
+        self.data_dir = data_dir
+        self.max_equity_points = max_equity_points
+
+        self.balance_file = f"{data_dir}/balance_{symbol}.json"
+        self.trades_file = f"{data_dir}/trades_{symbol}.json"
+        self.trades_journal_file = f"{data_dir}/trades_{symbol}.jsonl"
+        self.equity_file = f"{data_dir}/equity_{symbol}.json"
+        self.equity_tiers_file = f"{data_dir}/equity_tiers_{symbol}.json"
+
+        # Latest state
+        self.balance = {}
+        self.open_position = None
+        self.recent_trades = deque(maxlen=max_recent_trades)
+        self.equity_curve = []
+        self.equity_tiers = {}  # 'hourly'/'daily' -> [[time, open, high, low, close], ...]
+
+        # Running aggregates over every trade seen so far
+        self.total_trades = 0
+        self.winning_trades = 0
+        self.losing_trades = 0
+        self.total_pnl = 0.0
+        self.gross_profit = 0.0
+        self.gross_loss = 0.0
+
+        # File bookkeeping
+        self._file_signatures = {}
+        self._journal_offset = 0
+        self._journal_buffer = ''
+        self.last_refresh = None
+
+    def _file_changed(self, path):
+        """Return True when a file's (mtime, size) changed since the last read"""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return self._file_signatures.pop(path, None) is not None
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if self._file_signatures.get(path) == signature:
+            return False
+        self._file_signatures[path] = signature
+        return True
+
+    def _read_json(self, path, default):
+        """Load a JSON file, tolerating files that are missing or mid-write"""
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return default
+
+    def _reset_trades(self):
+        """Drop trade aggregates before re-reading the trade history"""
+        self.recent_trades.clear()
+        self.total_trades = 0
+        self.winning_trades = 0
+        self.losing_trades = 0
+        self.total_pnl = 0.0
+        self.gross_profit = 0.0
+        self.gross_loss = 0.0
+        self._journal_offset = 0
+        self._journal_buffer = ''
+
+    def _add_trade(self, trade):
+        """Fold one closed trade into the aggregates"""
+        pnl = trade.get('pnl', 0.0)
+        self.recent_trades.append(trade)
+        self.total_trades += 1
+        self.total_pnl += pnl
+        if pnl > 0:
+            self.winning_trades += 1
+            self.gross_profit += pnl
+        else:
+            self.losing_trades += 1
+            self.gross_loss += abs(pnl)
+
+    def _refresh_trades_from_journal(self):
+        """Read only the bytes appended to the trade journal since the last refresh"""
+        size = os.path.getsize(self.trades_journal_file)
+        if size < self._journal_offset:
+            # Journal was truncated or replaced
+            self._reset_trades()
+        if size == self._journal_offset:
+            return False
+
+        with open(self.trades_journal_file, 'rb') as f:
+            f.seek(self._journal_offset)
+            chunk = f.read().decode('utf-8')
+            self._journal_offset = f.tell()
+
+        lines = (self._journal_buffer + chunk).split('\n')
+        # Keep a partially written last line for the next refresh
+        self._journal_buffer = lines.pop()
+        for line in lines:
+            if line.strip():
+                self._add_trade(json.loads(line))
+        return True
+
+    def _refresh_trades_from_history(self):
+        """Fold records past the ones already counted from the JSON trade history"""
+        if not self._file_changed(self.trades_file):
+            return False
+
+        trades = self._read_json(self.trades_file, [])
+        if len(trades) < self.total_trades:
+            self._reset_trades()
+        for trade in trades[self.total_trades:]:
+            self._add_trade(trade)
+        return True
+
+    def refresh(self):
+        """
+        Re-read whatever changed on disk
+
+        Returns:
+            bool: True if any state changed
+        """
+        changed = False
+
+        if self._file_changed(self.balance_file):
+            self.balance = self._read_json(self.balance_file, {})
+            self.open_position = self.balance.get('open_position')
+            changed = True
+
+        if os.path.exists(self.trades_journal_file):
+            changed = self._refresh_trades_from_journal() or changed
+        else:
+            changed = self._refresh_trades_from_history() or changed
+
+        if self._file_changed(self.equity_file):
+            self.equity_curve = self._read_json(self.equity_file, [])[-self.max_equity_points:]
+            changed = True
+
+        if self._file_changed(self.equity_tiers_file):
+            self.equity_tiers = self._read_json(self.equity_tiers_file, {})
+            changed = True
+
+        self.last_refresh = datetime.now()
+        return changed
+
+    def get_trading_summary(self):
+        """Get trading summary (same keys as RealTimeTrader.get_trading_summary)"""
+        current_balance = self.balance.get('balance', self.initial_balance)
+        savings_account = self.balance.get('savings_account', 0.0)
+        total_wealth = current_balance + savings_account
+        total_return = ((total_wealth - self.initial_balance) / self.initial_balance) * 100
+        win_rate = self.winning_trades / self.total_trades * 100 if self.total_trades else 0
+        profit_factor = self.gross_profit / self.gross_loss if self.gross_loss > 0 else float('inf')
+
+        return {
+            'initial_balance': self.initial_balance,
+            'current_balance': current_balance,
+            'savings_account': savings_account,
+            'total_wealth': total_wealth,
+            'total_return': total_return,
+            'total_trades': self.total_trades,
+            'winning_trades': self.winning_trades,
+            'losing_trades': self.losing_trades,
+            'win_rate': win_rate,
+            'total_pnl': self.total_pnl,
+            'profit_factor': profit_factor,
+            'open_position': self.open_position is not None,
+            'last_updated': self.balance.get('last_updated', 'N/A')
+        }
+
+    def watch(self, callback, interval=5.0, max_iterations=None):
+        """
+        Refresh in a loop and call `callback(reader)` whenever the state changes
+
+        Args:
+            callback: Function called with this reader after each change
+            interval: Seconds between refreshes
+            max_iterations: Stop after this many refreshes (None = run forever)
+        """
+        iteration = 0
+        while max_iterations is None or iteration < max_iterations:
+            if self.refresh() or iteration == 0:
+                callback(self)
+            iteration += 1
+            if max_iterations is None or iteration < max_iterations:
+                time.sleep(interval)
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Successive-Halving Parameter Tuner
+Scores every parameter set on a short prefix of the history, promotes the
+best 1/eta to a prefix eta times longer and repeats up to the full range,
+with early stopping of runs that hit drawdown or ruin thresholds
+"""
+
+import sys
+import math
+import argparse
+import logging
+import pandas as pd
+from datetime import datetime
+from typing import Dict, List, Optional
+from utils.early_stop import EarlyStop
+from utils.shared_frames import SharedBacktestPool, run_shared_backtest
+from walk_forward import expand_grid, _score, WARMUP_BARS
+
+def halving_rungs(index: pd.DatetimeIndex, eta: float = 3, min_period: str = '3D',
+                  warmup_bars: int = WARMUP_BARS) -> List[pd.Timestamp]:
+    """
+    Prefix end labels, shortest first, each rung eta times longer than the
+    previous one and the last one covering the whole index
+
+    Args:
+        index: Candle open times
+        eta: Growth factor between rungs (and inverse of the share promoted)
+        min_period: Shortest prefix (pandas offset); rungs below it are dropped
+        warmup_bars: Candles run_backtest skips before trading
+    """
+    if len(index) == 0:
+        return []
+    start = index[0]
+    length = index[-1] - start
+    min_length = pd.Timedelta(min_period)
+
+    ends = []
+    while True:
+        position = int(index.searchsorted(start + length, side='right')) - 1
+        if position < warmup_bars or (ends and length < min_length):
+            break
+        if not ends or index[position] != ends[-1]:
+            ends.append(index[position])
+        length = length / eta
+    return ends[::-1]
+
+def _rung_job(symbol: str, timeframe: str, job: Dict, objective) -> Dict:
+    """Worker side: score one prefix run without shipping trades/equity back"""
+    results = run_shared_backtest(symbol, timeframe, job)
+    early_stopped = results.get('early_stopped') if results else None
+    return {
+        'score': float('-inf') if early_stopped else _score(results, objective),
+        'total_trades': results['metrics']['total_trades'] if results else 0,
+        'total_return': results['total_return'] if results else 0.0,
+        'max_drawdown': results['metrics']['max_drawdown'] if results else 0.0,
+        'early_stopped': early_stopped
+    }
+
+class SuccessiveHalving:
+    """Successive-halving search over run_backtest parameters"""
+
+    def __init__(self, backtester=None, max_workers: Optional[int] = None, backend: str = 'shm'):
+        """
+        Args:
+            backtester: Backtester used for fetching data
+            max_workers: Process pool size (default: CPU count)
+            backend: Shared frame backend ('shm' or 'mmap')
+        """
+        if backtester is None:
+            from backtest import Backtester
+            backtester = Backtester()
+        self.backtester = backtester
+        self.max_workers = max_workers
+        self.backend = backend
+
+    def run(self, symbol: str, timeframe: str, param_grid, eta: float = 3, min_period: str = '3D',
+            objective='total_return', min_trades: int = 1, max_drawdown: Optional[float] = None,
+            ruin_fraction: Optional[float] = None, initial_balance: float = 10000,
+            data: Optional[pd.DataFrame] = None, start_date: Optional[datetime] = None,
+            end_date: Optional[datetime] = None, **backtest_kwargs) -> Optional[Dict]:
+        """
+        Tune parameters for one symbol
+
+        Every rung reruns its survivors from the first candle up to the rung
+        end, so results on the final rung are ordinary full-range backtests.
+        Runs stopped by the drawdown/ruin thresholds are eliminated.
+
+        Args:
+            symbol: Trading symbol
+            timeframe: Candle timeframe
+            param_grid: See walk_forward.expand_grid
+            eta / min_period: See halving_rungs
+            objective: results or metrics key to maximise, or a picklable
+                       function of run_backtest results
+            min_trades: Runs with fewer trades rank below all others
+            max_drawdown / ruin_fraction: utils.early_stop.EarlyStop thresholds
+            initial_balance: Balance every run starts with
+            data: Pre-loaded OHLCV DataFrame (optional, skips fetching)
+            start_date / end_date: History to fetch when `data` is not given
+            **backtest_kwargs: Fixed run_backtest arguments (e.g. no_fees=True)
+
+        Returns:
+            dict: best params/score, a leaderboard of every candidate with the
+                  last rung it reached, the rungs, and the bars simulated as a
+                  fraction of an exhaustive full-range sweep
+        """
+        if data is None:
+            data = self.backtester._fetch_historical_data(symbol, start_date, end_date, timeframe)
+        if data is None or data.empty:
+            logging.error(f"No historical data available for {symbol} {timeframe}")
+            return None
+
+        rungs = halving_rungs(data.index, eta, min_period)
+        if not rungs:
+            logging.error(f"Not enough {symbol} {timeframe} history to tune")
+            return None
+        combinations = expand_grid(param_grid)
+        base_job = dict(backtest_kwargs, initial_balance=initial_balance)
+        if max_drawdown is not None or ruin_fraction is not None:
+            base_job['early_stop'] = EarlyStop(max_drawdown, ruin_fraction)
+        logging.info(f"Successive halving {symbol} {timeframe}: {len(combinations)} combinations, {len(rungs)} rungs")
+
+        candidates = [{'params': params, 'rung': 0, 'score': None} for params in combinations]
+        survivors = list(range(len(candidates)))
+        rung_summaries = []
+        simulated_bars = 0
+
+        with SharedBacktestPool(data, symbol, timeframe, self.max_workers, self.backend) as pool:
+            for rung, end in enumerate(rungs, 1):
+                futures = [pool.submit(dict(base_job, **candidates[j]['params'], end_date=end), _rung_job, objective)
+                           for j in survivors]
+                for j, future in zip(survivors, futures):
+                    candidates[j].update(future.result(), rung=rung)
+
+                bars = int(data.index.searchsorted(end, side='right'))
+                simulated_bars += bars * len(survivors)
+                rung_summaries.append({'rung': rung, 'end': end, 'bars': bars, 'candidates': len(survivors)})
+
+                ranked = sorted(
+                    (j for j in survivors if not candidates[j]['early_stopped']),
+                    key=lambda j: (candidates[j]['total_trades'] >= min_trades, candidates[j]['score']),
+                    reverse=True
+                )
+                if rung < len(rungs):
+                    survivors = ranked[:max(1, math.ceil(len(survivors) / eta))]
+                if not survivors:
+                    break
+
+        # Survivors of the last rung, best first; empty when every run was stopped early
+        finalists = [j for j in ranked if candidates[j]['total_trades'] >= min_trades] if survivors else []
+        best = candidates[finalists[0]] if finalists else None
+        leaderboard = sorted(candidates, key=lambda c: (c['rung'], c['score'] if c['score'] is not None else float('-inf')),
+                             reverse=True)
+        return {
+            'best_params': best['params'] if best else None,
+            'best_score': best['score'] if best else None,
+            'leaderboard': leaderboard,
+            'rungs': rung_summaries,
+            'early_stopped': sum(1 for c in candidates if c.get('early_stopped')),
+            # Share of the candle evaluations an exhaustive full-range sweep would need
+            'cost_fraction': simulated_bars / (len(combinations) * len(data))
+        }
+
+def print_tuning(symbol: str, timeframe: str, results: Dict, top: int = 10):
+    """Print rungs, the top of the leaderboard and the search cost"""
+    print(f"\n✂️  SUCCESSIVE HALVING: {symbol} {timeframe}")
+    print("=" * 100)
+    for rung in results['rungs']:
+        print(f"Rung {rung['rung']}: {rung['candidates']:>5} candidates up to {rung['end']:%Y-%m-%d %H:%M} ({rung['bars']} bars)")
+    print("-" * 100)
+    print(f"{'Rung':<6}{'Score':>10}{'Return':>10}{'Trades':>8}{'MaxDD':>8}  Params")
+    for candidate in results['leaderboard'][:top]:
+        score = f"{candidate['score']:.2f}" if candidate['score'] not in (None, float('-inf')) else 'n/a'
+        print(f"{candidate['rung']:<6}{score:>10}{candidate.get('total_return', 0):>9.2f}%{candidate.get('total_trades', 0):>8}"
+              f"{candidate.get('max_drawdown', 0):>7.1f}%  {candidate['params']}")
+    print("-" * 100)
+    print(f"🏆 Best: {results['best_params']} (score {results['best_score']})")
+    print(f"🛑 Early stopped: {results['early_stopped']} runs")
+    print(f"⚡ Cost: {results['cost_fraction'] * 100:.1f}% of an exhaustive sweep")
+
+def ultra_simple_param_grid(reward_ratios, trailing_ratios, reverse_modes, scaling_multipliers) -> List[Dict]:
+    """run_backtest arguments for an ultra_simple_strategy R:R x trailing x scaling grid"""
+    from batch_backtest import ultra_simple_strategy_name
+    return [
+        {
+            'strategy_name': ultra_simple_strategy_name(reward_ratio, trailing_ratio, is_reverse),
+            'reward_ratio': reward_ratio,
+            'enable_scaling': scaling_multiplier != 1.0,
+            'scaling_multiplier': scaling_multiplier
+        }
+        for is_reverse in reverse_modes
+        for trailing_ratio in trailing_ratios
+        for reward_ratio in reward_ratios
+        for scaling_multiplier in scaling_multipliers
+    ]
+
+def main():
+    """Main function"""
+    from batch_backtest import _parse_ratios
+
+    parser = argparse.ArgumentParser(description='Successive-halving search over ultra_simple_strategy parameters')
+    parser.add_argument('timeframe', help='Timeframe (5m, 15m, 30m, 1h, 2h, 4h)')
+    parser.add_argument('--symbol', default='SUIUSDT', help='Trading symbol (BTCUSDT, SUIUSDT)')
+    parser.add_argument('--start_date', default='2025-06-01', help='Start date (YYYY-MM-DD)')
+    parser.add_argument('--end_date', default='2025-08-22', help='End date (YYYY-MM-DD)')
+    parser.add_argument('--balance', type=float, default=10000, help='Initial balance')
+    parser.add_argument('--reward_ratios', default='0.5:5:10', help="R:R grid ('1,2,3' or 'start:stop:count')")
+    parser.add_argument('--trailing_ratios', default='0,1.0', help='Trailing ratio grid (0 disables trailing)')
+    parser.add_argument('--reverse', choices=['both', 'normal', 'reverse'], default='both', help='Reverse modes to test')
+    parser.add_argument('--scaling_multipliers', default='1,2', help='Scaling multipliers (1 disables scaling)')
+    parser.add_argument('--eta', type=float, default=3, help='Keep the best 1/eta per rung; rungs grow eta times')
+    parser.add_argument('--min_period', default='3D', help='Shortest prefix (e.g., 2D, 7D)')
+    parser.add_argument('--objective', default='total_return', help='Metric to maximise (total_return, sharpe_ratio, profit_factor, ...)')
+    parser.add_argument('--min_trades', type=int, default=5, help='Minimum trades for a run to rank normally')
+    parser.add_argument('--max_drawdown', type=float, default=None, help='Stop a run at this balance drawdown in %% (e.g., 30)')
+    parser.add_argument('--ruin_fraction', type=float, default=None, help='Stop a run when balance falls to this fraction of initial (e.g., 0.5)')
+    parser.add_argument('--no_fees', type=int, choices=[0, 1], default=0, help='Disable trading fees (0=normal fees, 1=no fees)')
+    parser.add_argument('--workers', type=int, default=None, help='Process pool size (default: CPU count)')
+    parser.add_argument('--base_timeframe', default=None, help='Derive the timeframe from cached candles of this timeframe (e.g., 5m)')
+
+    if len(sys.argv) < 2:
+        parser.print_help()
+        print("\n📝 Examples:")
+        print("   python tuner.py 5m --symbol SUIUSDT --max_drawdown 30")
+        print("   python tuner.py 15m --reward_ratios 0.5:6:12 --trailing_ratios 0,0.5,1 --scaling_multipliers 1,2,3 --eta 4")
+        return
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    reverse_modes = {'both': (False, True), 'normal': (False,), 'reverse': (True,)}[args.reverse]
+    param_grid = ultra_simple_param_grid(_parse_ratios(args.reward_ratios), _parse_ratios(args.trailing_ratios),
+                                         reverse_modes, _parse_ratios(args.scaling_multipliers))
+
+    from backtest import Backtester
+    tuner = SuccessiveHalving(Backtester(base_timeframe=args.base_timeframe), max_workers=args.workers)
+    results = tuner.run(
+        args.symbol, args.timeframe, param_grid,
+        eta=args.eta,
+        min_period=args.min_period,
+        objective=args.objective,
+        min_trades=args.min_trades,
+        max_drawdown=args.max_drawdown,
+        ruin_fraction=args.ruin_fraction,
+        initial_balance=args.balance,
+        start_date=datetime.strptime(args.start_date, '%Y-%m-%d'),
+        end_date=datetime.strptime(args.end_date, '%Y-%m-%d'),
+        no_fees=bool(args.no_fees)
+    )
+    if results is None:
+        print(f"❌ {args.symbol}: tuning failed")
+        return
+    print_tuning(args.symbol, args.timeframe, results)
+
+if __name__ == "__main__":
+    main()
@@ -6,5 +6,8 @@ Utility functions for trading bot
 from .data_fetcher import DataFetcher
 from .data_cache import CachedDataFetcher, get_cached_fetcher
 from .risk_manager import RiskManager
+from .equity_history import EquityHistory
+from .cycle_metrics import CycleMetrics
+from .multi_timeframe import MultiTimeframeView
 
-__all__ = ['DataFetcher', 'CachedDataFetcher', 'RiskManager', 'get_cached_fetcher']
+__all__ = ['DataFetcher', 'CachedDataFetcher', 'RiskManager', 'get_cached_fetcher', 'EquityHistory', 'CycleMetrics', 'MultiTimeframeView']
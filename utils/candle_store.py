@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+On-disk Candle Store
+Append-only OHLCV files (one fixed-width binary record per candle) that are
+memory-mapped for reading, so any row range of a multi-year history is read
+without loading the rest
+"""
+
+import os
+import json
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Iterator, Optional, Tuple
+
+RECORD = np.dtype([
+    ('time', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'), ('close', '<f8'), ('volume', '<f8')
+])
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+class CandleStore:
+    """Candles by symbol and timeframe under one directory"""
+
+    def __init__(self, root: str = 'cache/candles'):
+        self.root = root
+
+    def _path(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.root, symbol, f"{timeframe}.bin")
+
+    def _meta_path(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.root, symbol, f"{timeframe}.json")
+
+    def _tz(self, symbol: str, timeframe: str) -> Optional[str]:
+        meta_path = self._meta_path(symbol, timeframe)
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            return json.load(f).get('tz')
+
+    def records(self, symbol: str, timeframe: str) -> np.ndarray:
+        """All candles as a read-only memory-mapped record array"""
+        path = self._path(symbol, timeframe)
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return np.empty(0, dtype=RECORD)
+        return np.memmap(path, dtype=RECORD, mode='r')
+
+    def rows(self, symbol: str, timeframe: str) -> int:
+        path = self._path(symbol, timeframe)
+        return os.path.getsize(path) // RECORD.itemsize if os.path.exists(path) else 0
+
+    def append(self, symbol: str, timeframe: str, data: pd.DataFrame) -> int:
+        """
+        Add candles newer than the last stored one
+
+        Args:
+            data: OHLCV frame with a DatetimeIndex (e.g. a fetched or cached frame)
+
+        Returns:
+            int: Rows written
+        """
+        path = self._path(symbol, timeframe)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        index = pd.DatetimeIndex(data.index)
+        tz = str(index.tz) if index.tz is not None else None
+        if self.rows(symbol, timeframe) and tz != self._tz(symbol, timeframe):
+            raise ValueError(f"{symbol} {timeframe}: stored candles are in {self._tz(symbol, timeframe)}, not {tz}")
+
+        stored = self.records(symbol, timeframe)
+        times = index.as_unit('ns').asi8
+        new = np.ones(len(data), dtype=bool) if len(stored) == 0 else times > stored['time'][-1]
+        # Duplicate timestamps within the frame would break the row order
+        new &= np.concatenate([[True], np.diff(times) > 0])
+
+        records = np.empty(int(new.sum()), dtype=RECORD)
+        records['time'] = times[new]
+        for column in OHLCV_COLUMNS:
+            records[column] = data[column].to_numpy(dtype=np.float64)[new]
+        with open(path, 'ab') as f:
+            f.write(records.tobytes())
+        with open(self._meta_path(symbol, timeframe), 'w') as f:
+            json.dump({'tz': tz, 'rows': self.rows(symbol, timeframe)}, f)
+        return len(records)
+
+    def locate(self, symbol: str, timeframe: str, start_date: Optional[datetime] = None,
+               end_date: Optional[datetime] = None) -> Tuple[int, int]:
+        """Row range [first, stop) of the candles from start_date up to and including end_date"""
+        times = self.records(symbol, timeframe)['time']
+        tz = self._tz(symbol, timeframe)
+
+        def ns(value):
+            timestamp = pd.Timestamp(value)
+            if tz and timestamp.tzinfo is None:
+                timestamp = timestamp.tz_localize(tz)
+            return timestamp.value
+
+        first = 0 if start_date is None else int(np.searchsorted(times, ns(start_date), side='left'))
+        stop = len(times) if end_date is None else int(np.searchsorted(times, ns(end_date), side='right'))
+        return first, max(first, stop)
+
+    def read(self, symbol: str, timeframe: str, first: int, stop: int) -> pd.DataFrame:
+        """Rows [first, stop) as an OHLCV frame"""
+        records = np.array(self.records(symbol, timeframe)[first:stop])
+        index = pd.to_datetime(records['time'])
+        tz = self._tz(symbol, timeframe)
+        if tz:
+            index = index.tz_localize('UTC').tz_convert(tz)
+        index.name = 'timestamp'
+        return pd.DataFrame({column: records[column] for column in OHLCV_COLUMNS}, index=index)
+
+    def iter_chunks(self, symbol: str, timeframe: str, chunk_size: int, start_date: Optional[datetime] = None,
+                    end_date: Optional[datetime] = None) -> Iterator[Tuple[int, int]]:
+        """Row ranges of consecutive chunk_size candles between the dates"""
+        first, stop = self.locate(symbol, timeframe, start_date, end_date)
+        for chunk_start in range(first, stop, chunk_size):
+            yield chunk_start, min(chunk_start + chunk_size, stop)
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Backtest Checkpoints
+Periodic snapshots of run_backtest's engine state so a long run that is
+killed (preempted machine, crash, Ctrl+C) continues from its last
+checkpoint instead of from the first bar
+"""
+
+import os
+import glob
+import time
+import zlib
+import pickle
+import logging
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .result_store import data_fingerprint, result_key
+
+STATE_FILE = 'state.pkl'
+CHECKPOINT_VERSION = 1
+
+def _write_atomic(path: str, payload: bytes):
+    """Replace path with payload; a crash leaves either the old or the new file"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def _encode_equity(equity_curve: List[Dict]) -> Dict:
+    """Equity rows as three numpy columns"""
+    times = pd.DatetimeIndex([row['time'] for row in equity_curve])
+    return {
+        'time': times.as_unit('ns').asi8,
+        'tz': str(times.tz) if times.tz is not None else None,
+        'balance': np.array([row['balance'] for row in equity_curve], dtype=np.float64),
+        'position_value': np.array([row['position_value'] for row in equity_curve], dtype=np.float64)
+    }
+
+def _decode_equity(columns: Dict) -> List[Dict]:
+    times = pd.to_datetime(columns['time'])
+    if columns['tz']:
+        times = times.tz_localize('UTC').tz_convert(columns['tz'])
+    return [
+        {'time': time, 'balance': balance, 'position_value': position_value}
+        for time, balance, position_value in zip(times, columns['balance'].tolist(),
+                                                 columns['position_value'].tolist())
+    ]
+
+class BacktestCheckpoint:
+    """
+    run_backtest checkpoint hook backed by a directory
+
+    The small engine state (balance, savings, open position, counters) is
+    rewritten on every save; trades and equity rows are appended as
+    compressed segments holding only what was added since the previous
+    save, so a checkpoint costs the same late in a year-long run as early on.
+    """
+
+    def __init__(self, path: str, every_seconds: float = 60.0, every_bars: Optional[int] = None,
+                 keep_on_finish: bool = False):
+        """
+        Args:
+            path: Checkpoint directory (one per run)
+            every_seconds: Save at most this often (wall clock)
+            every_bars: Also save after this many bars (None = time only)
+            keep_on_finish: Keep the files after the run completes
+        """
+        self.path = path
+        self.every_seconds = every_seconds
+        self.every_bars = every_bars
+        self.keep_on_finish = keep_on_finish
+        self.key = None
+        self.run = None
+        self.segments = 0
+        self.trades_saved = 0
+        self.equity_saved = 0
+        self.last_bar = 0
+        self.last_time = time.monotonic()
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def state_path(self) -> str:
+        return os.path.join(self.path, STATE_FILE)
+
+    def _segment_path(self, index: int) -> str:
+        return os.path.join(self.path, f"segment_{index:05d}.bin")
+
+    def read_state(self) -> Optional[Dict]:
+        """Last saved state, or None"""
+        if not os.path.exists(self.state_path):
+            return None
+        try:
+            with open(self.state_path, 'rb') as f:
+                state = pickle.load(f)
+        except Exception as e:
+            self.logger.warning(f"Unreadable checkpoint {self.state_path}: {e}")
+            return None
+        if state.get('version') != CHECKPOINT_VERSION:
+            return None
+        return state
+
+    def bind(self, data: pd.DataFrame, run: Dict) -> Optional[Dict]:
+        """
+        Attach to one run
+
+        Args:
+            data: The run's OHLCV candles
+            run: run_backtest arguments (symbol, dates, strategy, parameters)
+
+        Returns:
+            dict: Saved engine state with its trades and equity curve when the
+                  checkpoint belongs to this exact run (same candles, arguments
+                  and backtest code), otherwise None and the run starts over
+        """
+        self.run = run
+        self.key = result_key(data_fingerprint(data), run['symbol'], run['timeframe'], run['strategy_name'], run)
+        self.last_time = time.monotonic()
+
+        state = self.read_state()
+        if state is None:
+            self._reset()
+            return None
+        if state['key'] != self.key:
+            self.logger.warning(f"Checkpoint {self.path} is from a different run or code version, starting over")
+            self._reset()
+            return None
+
+        trades, equity_curve = [], []
+        for index in range(state['segments']):
+            with open(self._segment_path(index), 'rb') as f:
+                segment = pickle.loads(zlib.decompress(f.read()))
+            trades.extend(segment['trades'])
+            equity_curve.extend(_decode_equity(segment['equity']))
+
+        self.segments = state['segments']
+        self.trades_saved = len(trades)
+        self.equity_saved = len(equity_curve)
+        self.last_bar = state['next_bar']
+        self.logger.info(f"Resuming from checkpoint at bar {state['next_bar']} "
+                         f"({len(trades)} trades, saved {state['saved_at']})")
+        return dict(state, trades=trades, equity_curve=equity_curve)
+
+    def _remove_files(self):
+        """Delete the files this class writes (and leftovers of interrupted writes), nothing else"""
+        patterns = ['segment_*.bin', 'segment_*.bin.tmp', STATE_FILE, f"{STATE_FILE}.tmp"]
+        for pattern in patterns:
+            for path in glob.glob(os.path.join(glob.escape(self.path), pattern)):
+                os.remove(path)
+
+    def _reset(self):
+        """Drop the files of another run"""
+        if os.path.isdir(self.path):
+            self._remove_files()
+        os.makedirs(self.path, exist_ok=True)
+        self.segments = 0
+        self.trades_saved = 0
+        self.equity_saved = 0
+        self.last_bar = 0
+
+    def due(self, next_bar: int) -> bool:
+        """Whether a save is due after next_bar bars"""
+        if self.every_bars is not None and next_bar - self.last_bar >= self.every_bars:
+            return True
+        return time.monotonic() - self.last_time >= self.every_seconds
+
+    def save(self, next_bar: int, state: Dict, trades: List[Dict], equity_curve: List[Dict]):
+        """
+        Write a checkpoint
+
+        Args:
+            next_bar: First bar a resumed run processes
+            state: Engine variables (balance, savings_account, position, ...)
+            trades / equity_curve: The run's full lists; only the new tail is written
+        """
+        # Segment first: a crash before the state is replaced leaves an
+        # unreferenced segment that the next save overwrites
+        segment = {
+            'trades': trades[self.trades_saved:],
+            'equity': _encode_equity(equity_curve[self.equity_saved:])
+        }
+        _write_atomic(self._segment_path(self.segments),
+                      zlib.compress(pickle.dumps(segment, protocol=pickle.HIGHEST_PROTOCOL)))
+
+        payload = dict(state, version=CHECKPOINT_VERSION, key=self.key, run=self.run, next_bar=next_bar,
+                       segments=self.segments + 1, saved_at=datetime.now().isoformat())
+        _write_atomic(self.state_path, pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+
+        self.segments += 1
+        self.trades_saved = len(trades)
+        self.equity_saved = len(equity_curve)
+        self.last_bar = next_bar
+        self.last_time = time.monotonic()
+
+    def finish(self):
+        """The run completed; its checkpoint is no longer needed"""
+        if self.keep_on_finish or not os.path.isdir(self.path):
+            return
+        self._remove_files()
+        # The directory may be shared (e.g. --checkpoint cache); only drop it once empty
+        if not os.listdir(self.path):
+            os.rmdir(self.path)
+
+    def __repr__(self):
+        return f"BacktestCheckpoint({self.path!r})"
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Compact Candle Frames
+Opt-in float32 indicators and bit-packed boolean signal columns
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+
+FLAGS_COLUMN = 'signal_flags'
+
+# Fixed bit positions for the known signal columns (VSA, candlestick patterns, divergences)
+SIGNAL_FLAG_COLUMNS = [
+    'accumulation', 'distribution', 'no_demand', 'no_supply',
+    'doji', 'hammer', 'shooting_star', 'pinbar_bullish', 'pinbar_bearish',
+    'bullish_engulfing', 'bearish_engulfing', 'morning_star', 'evening_star',
+    'three_white_soldiers', 'three_black_crows', 'tweezer_top', 'tweezer_bottom',
+    'bullish_divergence', 'bearish_divergence', 'hidden_bullish_divergence', 'hidden_bearish_divergence',
+    'bullish_volume_divergence', 'bearish_volume_divergence',
+    'macd_bullish_divergence', 'macd_bearish_divergence'
+]
+
+# Columns kept in float64: volumes and cumulative volume exceed float32's 7 significant digits,
+# and strategies read the running VWAP/OBV columns instead of recomputing them
+FLOAT64_COLUMNS = frozenset({'volume', 'obv', 'vwap'})
+
+# Prices used for fills and PnL; keep these in float64 too so accounting stays exact
+PRICE_COLUMNS = frozenset({'open', 'high', 'low', 'close'})
+
+# Not downcast by default: once cached as float32 the price precision cannot be recovered
+KEEP_FLOAT64_COLUMNS = FLOAT64_COLUMNS | PRICE_COLUMNS
+
+def is_compact(df: pd.DataFrame) -> bool:
+    """True when the frame carries packed signal flags"""
+    return FLAGS_COLUMN in df.columns
+
+def flag_columns(df: pd.DataFrame) -> List[str]:
+    """Names of the packed flags, in bit order"""
+    return list(df.attrs.get(FLAGS_COLUMN, []))
+
+def compact_frame(df: pd.DataFrame, pack_flags: bool = True, float64_columns=KEEP_FLOAT64_COLUMNS) -> pd.DataFrame:
+    """
+    Return a compact copy of a candle/indicator frame
+
+    Args:
+        df: Frame from DataFetcher.get_ohlcv or Backtester._add_indicators
+        pack_flags: Pack boolean columns into one integer column (accessed
+                    with get_flag); False keeps them as named bool columns
+        float64_columns: Float columns that are not downcast (default: prices and volumes)
+
+    Returns:
+        DataFrame: float32 indicators, float64 prices and volumes, and either a
+        `signal_flags` bitmask or the original bool columns
+    """
+    if is_compact(df):
+        return df
+
+    # Duplicate column names (indicators added twice) would make packing ambiguous
+    df = df.loc[:, ~df.columns.duplicated()]
+    columns = {}
+    flags = []
+
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_bool_dtype(series.dtype):
+            if pack_flags:
+                flags.append(column)
+                continue
+            columns[column] = series.to_numpy()
+        elif pd.api.types.is_float_dtype(series.dtype) and column not in float64_columns:
+            columns[column] = series.to_numpy(dtype=np.float32)
+        else:
+            columns[column] = series.to_numpy()
+
+    if flags:
+        # Known flags keep their fixed bit; others follow in column order
+        flags = [c for c in SIGNAL_FLAG_COLUMNS if c in flags] + [c for c in flags if c not in SIGNAL_FLAG_COLUMNS]
+        if len(flags) > 64:
+            raise ValueError(f"Cannot pack {len(flags)} flags into one 64-bit column")
+        dtype = np.uint32 if len(flags) <= 32 else np.uint64
+        packed = np.zeros(len(df), dtype=dtype)
+        for bit, column in enumerate(flags):
+            packed |= df[column].to_numpy(dtype=bool).astype(dtype) << dtype(bit)
+        columns[FLAGS_COLUMN] = packed
+
+    compact = pd.DataFrame(columns, index=df.index, copy=False)
+    compact.attrs.update(df.attrs)
+    if flags:
+        compact.attrs[FLAGS_COLUMN] = flags
+    return compact
+
+def get_flag(df: pd.DataFrame, name: str) -> pd.Series:
+    """Boolean signal column from a compact or regular frame"""
+    if name in df.columns:
+        return df[name]
+    flags = flag_columns(df)
+    if name not in flags:
+        raise KeyError(name)
+    packed = df[FLAGS_COLUMN].to_numpy()
+    bit = packed.dtype.type(flags.index(name))
+    return pd.Series((packed >> bit) & 1 == 1, index=df.index, name=name)
+
+def expand_frame(df: pd.DataFrame, float64: bool = True) -> pd.DataFrame:
+    """
+    Undo compact_frame
+
+    Args:
+        df: Compact frame
+        float64: Upcast float32 columns back to float64 (False only unpacks flags)
+
+    Returns:
+        DataFrame: Frame with named bool signal columns
+    """
+    columns = {}
+    for column in df.columns:
+        if column == FLAGS_COLUMN:
+            continue
+        series = df[column]
+        if float64 and series.dtype == np.float32:
+            columns[column] = series.to_numpy(dtype=np.float64)
+        else:
+            columns[column] = series.to_numpy()
+
+    for name in flag_columns(df):
+        columns[name] = get_flag(df, name).to_numpy()
+
+    expanded = pd.DataFrame(columns, index=df.index, copy=False)
+    expanded.attrs.update({k: v for k, v in df.attrs.items() if k != FLAGS_COLUMN})
+    return expanded
+
+def frame_memory_mb(df: pd.DataFrame) -> float:
+    """Memory used by a frame (including the index) in MB"""
+    return float(df.memory_usage(deep=True, index=True).sum()) / (1024 * 1024)
+
+def check_parity(original: pd.DataFrame, compact: pd.DataFrame, tolerance: float = 1e-6) -> Dict:
+    """
+    Bound the numeric drift introduced by compact_frame
+
+    Float errors are measured relative to each column's largest magnitude, so
+    columns that cross zero (MACD, histograms) are not penalised near zero.
+    Flags and non-float columns must match exactly.
+
+    Returns:
+        dict: ok flag, worst column/error, per-column errors and flag mismatches
+    """
+    original = original.loc[:, ~original.columns.duplicated()]
+    errors = {}
+    mismatched = []
+
+    for column in original.columns:
+        expected = original[column]
+        if pd.api.types.is_bool_dtype(expected.dtype):
+            actual = get_flag(compact, column)
+            if not np.array_equal(expected.to_numpy(dtype=bool), actual.to_numpy(dtype=bool)):
+                mismatched.append(column)
+            continue
+
+        actual = compact[column]
+        if not pd.api.types.is_float_dtype(expected.dtype):
+            if not expected.equals(actual):
+                mismatched.append(column)
+            continue
+
+        a = expected.to_numpy(dtype=np.float64)
+        b = actual.to_numpy(dtype=np.float64)
+        if not np.array_equal(np.isnan(a), np.isnan(b)):
+            mismatched.append(column)
+            continue
+        valid = ~np.isnan(a)
+        if not valid.any():
+            errors[column] = 0.0
+            continue
+        scale = np.abs(a[valid]).max() or 1.0
+        errors[column] = float(np.abs(a[valid] - b[valid]).max() / scale)
+
+    worst_column = max(errors, key=errors.get) if errors else None
+    worst_error = errors[worst_column] if worst_column else 0.0
+    return {
+        'ok': not mismatched and worst_error <= tolerance,
+        'worst_column': worst_column,
+        'max_relative_error': worst_error,
+        'column_errors': errors,
+        'mismatched_columns': mismatched,
+        'original_mb': frame_memory_mb(original),
+        'compact_mb': frame_memory_mb(compact)
+    }
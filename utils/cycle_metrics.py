@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Trading Cycle Metrics
+Stage timers, counters and histograms for the real-time trading loop,
+exported in the Prometheus text format (file or local HTTP endpoint)
+"""
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+# Bucket upper bounds in seconds, up to the 5-minute cycle budget
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 240.0, 300.0)
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    """Render label pairs as {key="value",...}"""
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+
+class Histogram:
+    """Fixed-bucket histogram"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        """Record one observation"""
+        self.count += 1
+        self.total += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+class CycleMetrics:
+    """Metrics registry for the trading cycle"""
+
+    def __init__(self, symbol: str, cycle_budget_seconds: float = 300.0, buckets=DEFAULT_BUCKETS):
+        self.symbol = symbol
+        self.cycle_budget_seconds = cycle_budget_seconds
+        self.buckets = buckets
+
+        self.counters: Dict[Tuple[str, Tuple], float] = {}
+        self.gauges: Dict[Tuple[str, Tuple], float] = {}
+        self.histograms: Dict[Tuple[str, Tuple], Histogram] = {}
+        self.help = {
+            'trading_cycle_duration_seconds': 'Wall time of one full trading cycle',
+            'trading_cycle_stage_seconds': 'Wall time of each trading cycle stage',
+            'trading_decision_lag_seconds': 'Delay between candle close and the trading decision',
+            'trading_cycles_total': 'Trading cycles run',
+            'trading_signals_total': 'Entry signals generated',
+            'trading_positions_opened_total': 'Positions opened',
+            'trading_positions_closed_total': 'Positions closed',
+            'trading_errors_total': 'Errors raised inside the trading cycle',
+            'trading_cycle_last_duration_seconds': 'Duration of the most recent cycle',
+            'trading_cycle_budget_seconds': 'Time budget of one cycle',
+            'trading_cycle_budget_used_ratio': 'Most recent cycle duration divided by the budget',
+            'trading_cycle_last_run_timestamp_seconds': 'Unix time the most recent cycle finished'
+        }
+
+        self._lock = threading.Lock()
+        self._server = None
+        self.set_gauge('trading_cycle_budget_seconds', cycle_budget_seconds)
+
+    def _key(self, name: str, labels: Optional[Dict] = None) -> Tuple[str, Tuple]:
+        merged = {'symbol': self.symbol}
+        if labels:
+            merged.update(labels)
+        return name, tuple(sorted((k, str(v)) for k, v in merged.items()))
+
+    def increment(self, name: str, amount: float = 1, **labels):
+        """Increase a counter"""
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def set_gauge(self, name: str, value: float, **labels):
+        """Set a gauge"""
+        key = self._key(name, labels)
+        with self._lock:
+            self.gauges[key] = value
+
+    def observe(self, name: str, value: float, **labels):
+        """Add an observation to a histogram"""
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time one stage of the cycle"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe('trading_cycle_stage_seconds', time.perf_counter() - started, stage=name)
+
+    @contextmanager
+    def cycle(self):
+        """Time a full cycle and update the budget gauges"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - started
+            self.observe('trading_cycle_duration_seconds', duration)
+            self.increment('trading_cycles_total')
+            self.set_gauge('trading_cycle_last_duration_seconds', duration)
+            self.set_gauge('trading_cycle_budget_used_ratio', duration / self.cycle_budget_seconds)
+            self.set_gauge('trading_cycle_last_run_timestamp_seconds', time.time())
+
+    def to_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            sections = [
+                ('counter', self.counters),
+                ('gauge', self.gauges),
+                ('histogram', self.histograms)
+            ]
+            for metric_type, metrics in sections:
+                names = sorted({name for name, _ in metrics})
+                for name in names:
+                    if name in self.help:
+                        lines.append(f"# HELP {name} {self.help[name]}")
+                    lines.append(f"# TYPE {name} {metric_type}")
+                    for (metric_name, labels), value in sorted(metrics.items()):
+                        if metric_name != name:
+                            continue
+                        if metric_type != 'histogram':
+                            lines.append(f"{name}{_format_labels(labels)} {value}")
+                            continue
+
+                        cumulative = 0
+                        for bound, count in zip(value.buckets, value.counts):
+                            cumulative += count
+                            bucket_labels = labels + (('le', str(bound)),)
+                            lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+                        lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {value.count}")
+                        lines.append(f"{name}_sum{_format_labels(labels)} {value.total}")
+                        lines.append(f"{name}_count{_format_labels(labels)} {value.count}")
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path: str):
+        """Write the exposition atomically (for node_exporter's textfile collector)"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+    def start_http_server(self, port: int = 9108, host: str = '127.0.0.1'):
+        """Serve /metrics from a background thread"""
+        if self._server is not None:
+            return self._server
+
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = metrics.to_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        thread.start()
+        return self._server
+
+    def stop_http_server(self):
+        """Stop the HTTP endpoint if running"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
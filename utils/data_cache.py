@@ -10,6 +10,7 @@ import pandas as pd
 from datetime import datetime, timedelta
 from typing import Dict, Optional, Tuple
 import logging
+from .resampler import can_resample, get_resampled_ohlcv
 
 class DataCache:
     """Cache system for storing and retrieving candle data"""
@@ -147,16 +148,21 @@ class DataCache:
 class CachedDataFetcher:
     """Data fetcher with caching capabilities"""
     
-    def __init__(self, data_fetcher, cache_dir: str = "cache"):
+    def __init__(self, data_fetcher, cache_dir: str = "cache", base_timeframe: Optional[str] = None):
         self.data_fetcher = data_fetcher
         self.cache = DataCache(cache_dir)
+        self.base_timeframe = base_timeframe  # Derive higher timeframes from this one instead of fetching
         self.logger = logging.getLogger(__name__)
     
     def get_ohlcv_cached(self, symbol: str, timeframe: str, 
                         start_date: datetime, end_date: datetime,
-                        max_age_hours: int = 24) -> pd.DataFrame:
+                        max_age_hours: int = 24, resample: bool = True) -> pd.DataFrame:
         """Get OHLCV data with caching"""
         
+        # Derive from the base timeframe when one is configured
+        if resample and self.base_timeframe and can_resample(timeframe, self.base_timeframe):
+            return get_resampled_ohlcv(self, symbol, timeframe, start_date, end_date, max_age_hours)
+        
         # Try to load from cache first
         cached_data = self.cache.load_data(symbol, timeframe, start_date, end_date, max_age_hours)
         
@@ -237,6 +243,7 @@ def get_global_cache(cache_dir: str = "cache") -> DataCache:
         _global_cache = DataCache(cache_dir)
     return _global_cache
 
-def get_cached_fetcher(data_fetcher, cache_dir: str = "cache") -> CachedDataFetcher:
+def get_cached_fetcher(data_fetcher, cache_dir: str = "cache",
+                       base_timeframe: Optional[str] = None) -> CachedDataFetcher:
     """Get cached data fetcher instance"""
-    return CachedDataFetcher(data_fetcher, cache_dir)
+    return CachedDataFetcher(data_fetcher, cache_dir, base_timeframe)
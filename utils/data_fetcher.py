@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 import time
 from indicators import TechnicalIndicators
 from config import TradingConfig
+from .compact_frame import compact_frame
 
 class DataFetcher:
     def __init__(self, exchange=None, config=None):
@@ -48,6 +49,10 @@ class DataFetcher:
             # Calculate additional indicators
             df = self._add_indicators(df)
             
+            # Opt-in compact representation (also what gets cached)
+            if self.config.COMPACT_FRAMES:
+                df = compact_frame(df)
+            
             return df
             
         except Exception as e:
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Backtest Early Stopping
+Drawdown and ruin thresholds that end a run_backtest as soon as a
+parameter set is clearly failing
+"""
+
+from typing import Optional
+
+class EarlyStop:
+    """run_backtest early_stop hook on the realised balance (picklable for pool jobs)"""
+
+    def __init__(self, max_drawdown: Optional[float] = None, ruin_fraction: Optional[float] = None):
+        """
+        Args:
+            max_drawdown: Stop when the balance is this many percent below its peak
+            ruin_fraction: Stop when the balance falls to this fraction of the
+                           initial balance (e.g. 0.5 = half the account lost)
+        """
+        self.max_drawdown = max_drawdown
+        self.ruin_fraction = ruin_fraction
+
+    def __call__(self, time, balance: float, peak_balance: float, initial_balance: float) -> Optional[str]:
+        if self.ruin_fraction is not None and balance <= initial_balance * self.ruin_fraction:
+            return f"balance ${balance:.2f} at or below {self.ruin_fraction:.0%} of initial"
+        if self.max_drawdown is not None and peak_balance > 0:
+            drawdown = (peak_balance - balance) / peak_balance * 100
+            if drawdown >= self.max_drawdown:
+                return f"drawdown {drawdown:.1f}% >= {self.max_drawdown}%"
+        return None
+
+    def __repr__(self):
+        # Stable across processes (part of result store keys)
+        return f"EarlyStop(max_drawdown={self.max_drawdown}, ruin_fraction={self.ruin_fraction})"
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Strategy Ensemble
+Combines the signals of several strategies into one: the most confident
+signal ('all') or a majority vote ('all_vote')
+"""
+
+import numpy as np
+from typing import Dict, List, Optional
+
+ENSEMBLE_RULES = ('confidence', 'vote')
+
+def parse_ensemble_name(strategy_name: str) -> Optional[str]:
+    """Combination rule of an ensemble strategy name ('all', 'all_vote', ...); None otherwise"""
+    if strategy_name == 'all':
+        return 'confidence'
+    if strategy_name.startswith('all_') and strategy_name[4:] in ENSEMBLE_RULES:
+        return strategy_name[4:]
+    return None
+
+def combine_signals(signals: List[Dict], rule: str = 'confidence', min_votes: int = 2) -> Dict:
+    """
+    One bar's ensemble signal
+
+    Args:
+        signals: Member signal dicts, in ENSEMBLE_STRATEGIES order
+        rule: 'confidence' (highest confidence wins, first member on ties) or
+              'vote' (the side with more members wins if it has at least
+              min_votes; its most confident member supplies the levels)
+    """
+    active = [signal for signal in signals if signal.get('signal') in ('long', 'short')]
+
+    if rule == 'vote':
+        longs = [signal for signal in active if signal['signal'] == 'long']
+        shorts = [signal for signal in active if signal['signal'] == 'short']
+        if len(longs) > len(shorts) and len(longs) >= min_votes:
+            active = longs
+        elif len(shorts) > len(longs) and len(shorts) >= min_votes:
+            active = shorts
+        else:
+            active = []
+    elif rule != 'confidence':
+        raise ValueError(f"Unknown ensemble rule: {rule} (use one of {ENSEMBLE_RULES})")
+
+    if not active:
+        return {'signal': 'no_signal', 'reason': 'No ensemble signal'}
+    return max(active, key=lambda signal: signal.get('confidence', 0.0))
+
+def combine_signal_matrix(matrix: Dict[str, np.ndarray], rule: str = 'confidence',
+                          min_votes: int = 2) -> Dict[str, np.ndarray]:
+    """
+    combine_signals for every bar at once
+
+    Args:
+        matrix: Signal arrays stacked to (members x bars)
+        rule / min_votes: As in combine_signals
+
+    Returns:
+        dict: Per-bar signal arrays of the ensemble
+    """
+    side = matrix['side']
+    bars = np.arange(side.shape[1])
+
+    if rule == 'vote':
+        long_votes = (side == 1).sum(axis=0)
+        short_votes = (side == -1).sum(axis=0)
+        direction = np.where((long_votes > short_votes) & (long_votes >= min_votes), 1,
+                             np.where((short_votes > long_votes) & (short_votes >= min_votes), -1, 0))
+        eligible = (side == direction) & (direction != 0)
+    elif rule == 'confidence':
+        eligible = side != 0
+    else:
+        raise ValueError(f"Unknown ensemble rule: {rule} (use one of {ENSEMBLE_RULES})")
+
+    # argmax keeps the first member on ties, like max() in combine_signals
+    winner = np.argmax(np.where(eligible, matrix['confidence'], -np.inf), axis=0)
+    signal = eligible.any(axis=0)
+
+    arrays = {key: values[winner, bars] for key, values in matrix.items()}
+    arrays['side'] = np.where(signal, arrays['side'], 0).astype(np.int8)
+    arrays['confidence'] = np.where(signal, arrays['confidence'], 0.0)
+    arrays['strategy'] = np.where(signal, arrays['strategy'], None)
+    return arrays
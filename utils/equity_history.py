@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Bounded Equity History
+Fixed-size ring buffer for recent equity points plus downsampled OHLC tiers
+"""
+
+import numpy as np
+from datetime import datetime
+from typing import Dict, List, Optional
+
+def _to_datetime64(value) -> np.datetime64:
+    """Convert datetime / ISO string / datetime64 to datetime64[us]"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return np.datetime64(value, 'us')
+
+def _to_iso(value: np.datetime64) -> str:
+    """Convert datetime64 back to the ISO format used in the JSON files"""
+    return value.astype('datetime64[us]').item().isoformat()
+
+class EquityRingBuffer:
+    """Array-backed ring buffer of the most recent equity points"""
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self.times = np.zeros(capacity, dtype='datetime64[us]')
+        self.balance = np.zeros(capacity, dtype=np.float64)
+        self.savings_account = np.zeros(capacity, dtype=np.float64)
+        self.open_position = np.zeros(capacity, dtype=bool)
+        self.head = 0   # Next slot to write
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, time, balance: float, savings_account: float, open_position: bool):
+        """Write one point, overwriting the oldest when full"""
+        self.times[self.head] = _to_datetime64(time)
+        self.balance[self.head] = balance
+        self.savings_account[self.head] = savings_account
+        self.open_position[self.head] = open_position
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def _order(self) -> np.ndarray:
+        """Slot indices in chronological order"""
+        start = (self.head - self.count) % self.capacity
+        return (start + np.arange(self.count)) % self.capacity
+
+    def to_records(self) -> List[Dict]:
+        """Points in chronological order, in the equity file format"""
+        records = []
+        for i in self._order():
+            balance = float(self.balance[i])
+            savings = float(self.savings_account[i])
+            records.append({
+                'time': _to_iso(self.times[i]),
+                'balance': balance,
+                'savings_account': savings,
+                'total_wealth': balance + savings,
+                'open_position': bool(self.open_position[i])
+            })
+        return records
+
+class EquityOHLCTier:
+    """Bounded OHLC series of total wealth at a fixed bucket size"""
+
+    def __init__(self, unit: str, capacity: int):
+        """
+        Args:
+            unit: numpy datetime unit of one bucket ('h' = hourly, 'D' = daily)
+            capacity: Maximum number of buckets kept
+        """
+        self.unit = unit
+        self.capacity = capacity
+        self.starts = np.zeros(capacity, dtype='datetime64[us]')
+        self.ohlc = np.zeros((capacity, 4), dtype=np.float64)
+        self.head = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def update(self, time, value: float):
+        """Fold a value into its bucket, opening a new bucket when needed"""
+        bucket = _to_datetime64(time).astype(f'datetime64[{self.unit}]').astype('datetime64[us]')
+        last = (self.head - 1) % self.capacity
+
+        if self.count and self.starts[last] == bucket:
+            row = self.ohlc[last]
+            row[1] = max(row[1], value)
+            row[2] = min(row[2], value)
+            row[3] = value
+            return
+
+        self.starts[self.head] = bucket
+        self.ohlc[self.head] = (value, value, value, value)
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def to_rows(self) -> List[List]:
+        """Buckets in chronological order as [time, open, high, low, close]"""
+        start = (self.head - self.count) % self.capacity
+        order = (start + np.arange(self.count)) % self.capacity
+        return [[_to_iso(self.starts[i])] + [float(v) for v in self.ohlc[i]] for i in order]
+
+    def load_rows(self, rows: List[List]):
+        """Restore buckets saved by to_rows"""
+        for row in rows[-self.capacity:]:
+            self.starts[self.head] = _to_datetime64(row[0])
+            self.ohlc[self.head] = row[1:5]
+            self.head = (self.head + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+
+class EquityHistory:
+    """Recent equity points plus hourly and daily OHLC tiers of total wealth"""
+
+    def __init__(self, capacity: int = 1000, hourly_capacity: int = 24 * 90, daily_capacity: int = 365 * 5):
+        self.recent = EquityRingBuffer(capacity)
+        self.tiers = {
+            'hourly': EquityOHLCTier('h', hourly_capacity),
+            'daily': EquityOHLCTier('D', daily_capacity)
+        }
+
+    def __len__(self):
+        return len(self.recent)
+
+    def append(self, point: Dict):
+        """Add an equity point (same dict the trader writes to the equity file)"""
+        balance = point['balance']
+        savings = point.get('savings_account', 0.0)
+        self.recent.append(point['time'], balance, savings, point.get('open_position', False))
+        for tier in self.tiers.values():
+            tier.update(point['time'], balance + savings)
+
+    def points(self) -> List[Dict]:
+        """Recent points in chronological order"""
+        return self.recent.to_records()
+
+    def load(self, points: Optional[List[Dict]] = None, tiers: Optional[Dict] = None):
+        """
+        Restore persisted state
+
+        Args:
+            points: Recent points from the equity file
+            tiers: Tier rows from the tiers file; when missing the tiers are
+                   rebuilt from the recent points
+        """
+        points = points or []
+        for point in points[-self.recent.capacity:]:
+            self.recent.append(point['time'], point['balance'], point.get('savings_account', 0.0),
+                               point.get('open_position', False))
+
+        if tiers:
+            for name, rows in tiers.items():
+                if name in self.tiers:
+                    self.tiers[name].load_rows(rows)
+        else:
+            for point in points:
+                for tier in self.tiers.values():
+                    tier.update(point['time'], point['balance'] + point.get('savings_account', 0.0))
+
+    def tiers_to_dict(self) -> Dict:
+        """Tier rows for persisting"""
+        return {name: tier.to_rows() for name, tier in self.tiers.items()}
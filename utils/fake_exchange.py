@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Fake Exchange
+In-process stand-in for ccxt.binance that serves candles from a CandleStore,
+with configurable latency, rate limiting and injected errors, so fetching
+and live-cycle code can be benchmarked and failure-tested offline
+"""
+
+import os
+import zlib
+import time
+import random
+import threading
+import numpy as np
+import pandas as pd
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+import ccxt
+from config import TradingConfig
+from .candle_store import CandleStore
+
+BINANCE_MAX_LIMIT = 1000
+
+class FakeExchange:
+    """
+    The fetch_ohlcv / fetch_ticker / fetch_order_book / fetch_trades /
+    fetch_balance surface of a ccxt exchange (same arguments, same result
+    structures, ccxt exception types), e.g. DataFetcher(exchange=FakeExchange())
+    or Backtester(exchange=...)
+
+    Candles come from the store; tickers, order books and trades are derived
+    deterministically from the latest candle at the clock's current time.
+    Every request first waits `latency` (+ up to `jitter`) seconds, takes a
+    rate limit token and may fail. Thread-safe, so concurrent fetchers share
+    the limits like they would share an exchange's.
+    """
+
+    id = 'fake'
+    timeframes = {timeframe: timeframe for timeframe in TradingConfig.TIMEFRAME_MINUTES}
+
+    def __init__(self, store: Optional[CandleStore] = None, latency: float = 0.0, jitter: float = 0.0,
+                 rate_limit: Optional[float] = None, burst: Optional[int] = None, enable_rate_limit: bool = True,
+                 error_rate: float = 0.0, timeout_rate: float = 0.0, balance: Optional[Dict[str, float]] = None,
+                 spread_bps: float = 1.0, clock: Optional[Callable[[], datetime]] = None, seed: int = 0,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Args:
+            store: Candles served (default: cache/candles)
+            latency: Seconds every request takes
+            jitter: Extra uniformly random latency, up to this many seconds
+            rate_limit: Requests per second allowed (None = unlimited)
+            burst: Requests allowed at once before the rate applies (default: one second's worth)
+            enable_rate_limit: Like ccxt's enableRateLimit: wait for a token instead of
+                               failing with ccxt.RateLimitExceeded (HTTP 429)
+            error_rate: Share of requests failing with ccxt.NetworkError
+            timeout_rate: Share of requests failing with ccxt.RequestTimeout
+            balance: fetch_balance totals by currency (default: 10000 USDT)
+            spread_bps: Bid/ask spread around the last price, in basis points
+            clock: Current time for "latest" data (default: the last stored candle)
+            seed: Seed of injected errors, jitter, order books and trades
+            sleep: Called to wait (e.g. a no-op to count latency without waiting)
+        """
+        self.store = store or CandleStore()
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.burst = burst or max(int(rate_limit or 1), 1)
+        self.enableRateLimit = enable_rate_limit
+        self.rateLimit = 1000 / rate_limit if rate_limit else 0
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.balance = dict(balance or {'USDT': 10000.0})
+        self.spread_bps = spread_bps
+        self.clock = clock
+        self.seed = seed
+        self._sleep = sleep
+
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._scripted = []
+        self.calls = Counter()
+        self.errors = Counter()
+        self.throttled_seconds = 0.0
+        self.latency_seconds = 0.0
+
+    def fail_next(self, count: int = 1, error=ccxt.NetworkError):
+        """Make the next `count` requests fail with `error` (an exception class or instance)"""
+        with self._lock:
+            self._scripted.extend([error] * count)
+
+    def stats(self) -> Dict:
+        """Requests and failures by endpoint, time spent throttled and in latency"""
+        with self._lock:
+            return {
+                'calls': dict(self.calls),
+                'errors': dict(self.errors),
+                'throttled_seconds': self.throttled_seconds,
+                'latency_seconds': self.latency_seconds
+            }
+
+    def _take_token(self) -> float:
+        """Seconds to wait for a rate limit token (raises without enableRateLimit); caller holds the lock"""
+        if not self.rate_limit:
+            return 0.0
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate_limit)
+        self._refilled_at = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        if not self.enableRateLimit:
+            raise ccxt.RateLimitExceeded(f"{self.id} 429 Too Many Requests")
+        # Reserve the next token; later callers queue up behind it
+        wait = (1 - self._tokens) / self.rate_limit
+        self._tokens -= 1
+        return wait
+
+    def _request(self, endpoint: str):
+        """Latency, rate limit and injected failures of one request"""
+        with self._lock:
+            self.calls[endpoint] += 1
+            try:
+                wait = self._take_token()
+            except ccxt.RateLimitExceeded:
+                self.errors['rate_limited'] += 1
+                raise
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            scripted = self._scripted.pop(0) if self._scripted else None
+            draw = self._rng.random()
+            self.throttled_seconds += wait
+            self.latency_seconds += delay
+
+        if wait + delay > 0:
+            self._sleep(wait + delay)
+        if scripted is not None:
+            error = scripted(f"{self.id} injected failure") if isinstance(scripted, type) else scripted
+            self._count_error(type(error).__name__)
+            raise error
+        if draw < self.timeout_rate:
+            self._count_error('RequestTimeout')
+            raise ccxt.RequestTimeout(f"{self.id} {endpoint} timed out")
+        if draw < self.timeout_rate + self.error_rate:
+            self._count_error('NetworkError')
+            raise ccxt.NetworkError(f"{self.id} {endpoint} connection reset")
+
+    def _count_error(self, name: str):
+        with self._lock:
+            self.errors[name] += 1
+
+    @staticmethod
+    def _market_id(symbol: str) -> str:
+        """'SUI/USDT', 'SUI/USDT:USDT' and 'SUIUSDT' are the same stored market"""
+        return symbol.split(':')[0].replace('/', '')
+
+    def _market_dir(self, symbol: str) -> str:
+        path = os.path.join(self.store.root, self._market_id(symbol))
+        if not os.path.isdir(path):
+            raise ccxt.BadSymbol(f"{self.id} does not have market symbol {symbol}")
+        return path
+
+    def _times(self, symbol: str, timeframe: str) -> np.ndarray:
+        self._market_dir(symbol)
+        return self.store.records(self._market_id(symbol), timeframe)['time']
+
+    def _now_stop(self, times: np.ndarray) -> int:
+        """Rows of candles open at the clock's current time"""
+        if self.clock is None:
+            return len(times)
+        return int(np.searchsorted(times, pd.Timestamp(self.clock()).value, side='right'))
+
+    def _latest(self, symbol: str):
+        """(timeframe, row) of the newest candle at the current time, on the finest stored timeframe"""
+        stored = [
+            name[:-len('.bin')] for name in os.listdir(self._market_dir(symbol))
+            if name.endswith('.bin') and name[:-len('.bin')] in TradingConfig.TIMEFRAME_MINUTES
+        ]
+        if not stored:
+            raise ccxt.ExchangeError(f"{self.id} has no candles for {symbol}")
+        timeframe = min(stored, key=TradingConfig.TIMEFRAME_MINUTES.get)
+        row = self._now_stop(self._times(symbol, timeframe)) - 1
+        if row < 0:
+            raise ccxt.ExchangeError(f"{self.id} has no {symbol} candles before the current time")
+        return timeframe, row
+
+    def fetch_ohlcv(self, symbol: str, timeframe: str = '1m', since: Optional[int] = None,
+                    limit: Optional[int] = None, params: Optional[Dict] = None) -> List[list]:
+        """[[ms, open, high, low, close, volume], ...]: `limit` candles from `since` (ms) or the latest ones"""
+        self._request('fetch_ohlcv')
+        if timeframe not in self.timeframes:
+            raise ccxt.BadRequest(f"{self.id} invalid interval {timeframe}")
+        limit = min(limit or 500, BINANCE_MAX_LIMIT)
+        times = self._times(symbol, timeframe)
+        stop = self._now_stop(times)
+        if since is None:
+            first = max(stop - limit, 0)
+        else:
+            first = int(np.searchsorted(times, int(since) * 1_000_000, side='left'))
+            stop = min(first + limit, stop)
+        rows = self.store.records(self._market_id(symbol), timeframe)[first:max(first, stop)]
+        return [
+            [time_ns // 1_000_000, open_, high, low, close, volume]
+            for time_ns, open_, high, low, close, volume in rows.tolist()
+        ]
+
+    def fetch_ticker(self, symbol: str, params: Optional[Dict] = None) -> Dict:
+        """24h ticker ending with the latest candle"""
+        self._request('fetch_ticker')
+        timeframe, row = self._latest(symbol)
+        records = self.store.records(self._market_id(symbol), timeframe)
+        minutes = TradingConfig.TIMEFRAME_MINUTES[timeframe]
+        close_ns = int(records['time'][row]) + minutes * 60_000_000_000
+        first = int(np.searchsorted(records['time'], close_ns - 86_400_000_000_000, side='left'))
+        window = records[first:row + 1]
+
+        last = float(window['close'][-1])
+        open_ = float(window['open'][0])
+        base_volume = float(window['volume'].sum())
+        quote_volume = float((window['volume'] * (window['high'] + window['low'] + window['close']) / 3).sum())
+        half_spread = last * self.spread_bps / 20000
+        timestamp = close_ns // 1_000_000
+        return {
+            'symbol': symbol,
+            'timestamp': timestamp,
+            'datetime': pd.Timestamp(timestamp, unit='ms').isoformat(timespec='milliseconds') + 'Z',
+            'high': float(window['high'].max()),
+            'low': float(window['low'].min()),
+            'bid': last - half_spread,
+            'bidVolume': None,
+            'ask': last + half_spread,
+            'askVolume': None,
+            'vwap': quote_volume / base_volume if base_volume else None,
+            'open': open_,
+            'close': last,
+            'last': last,
+            'previousClose': None,
+            'change': last - open_,
+            'percentage': (last - open_) / open_ * 100 if open_ else None,
+            'average': (open_ + last) / 2,
+            'baseVolume': base_volume,
+            'quoteVolume': quote_volume,
+            'info': {}
+        }
+
+    def _candle_rng(self, symbol: str, timeframe: str, row: int, salt: int) -> np.random.Generator:
+        """Same draws for the same candle on every call"""
+        market = zlib.crc32(self._market_id(symbol).encode())
+        minutes = TradingConfig.TIMEFRAME_MINUTES[timeframe]
+        return np.random.default_rng([self.seed, market, minutes, row, salt])
+
+    def fetch_order_book(self, symbol: str, limit: Optional[int] = None, params: Optional[Dict] = None) -> Dict:
+        """Bids and asks stepped away from the latest close, sized from its candle's volume"""
+        self._request('fetch_order_book')
+        timeframe, row = self._latest(symbol)
+        candle = self.store.records(self._market_id(symbol), timeframe)[row]
+        levels = min(limit or 100, 5000)
+        rng = self._candle_rng(symbol, timeframe, row, 0)
+
+        last = float(candle['close'])
+        half_spread = last * self.spread_bps / 20000
+        step = max(last * self.spread_bps / 10000, 1e-12)
+        depth = max(float(candle['volume']), 1.0) / 20
+        steps = (np.arange(levels) * step).tolist()
+        bids = [[last - half_spread - offset, amount]
+                for offset, amount in zip(steps, rng.exponential(depth, levels).tolist())]
+        asks = [[last + half_spread + offset, amount]
+                for offset, amount in zip(steps, rng.exponential(depth, levels).tolist())]
+        timestamp = (int(candle['time']) + TradingConfig.TIMEFRAME_MINUTES[timeframe] * 60_000_000_000) // 1_000_000
+        return {
+            'symbol': symbol,
+            'bids': bids,
+            'asks': asks,
+            'timestamp': timestamp,
+            'datetime': pd.Timestamp(timestamp, unit='ms').isoformat(timespec='milliseconds') + 'Z',
+            'nonce': None
+        }
+
+    def fetch_trades(self, symbol: str, since: Optional[int] = None, limit: Optional[int] = None,
+                     params: Optional[Dict] = None) -> List[Dict]:
+        """Trades inside the latest candle (at or after `since`), prices within its range"""
+        self._request('fetch_trades')
+        timeframe, row = self._latest(symbol)
+        candle = self.store.records(self._market_id(symbol), timeframe)[row]
+        count = min(limit or 500, BINANCE_MAX_LIMIT)
+        rng = self._candle_rng(symbol, timeframe, row, 1)
+
+        open_ms = int(candle['time']) // 1_000_000
+        length_ms = TradingConfig.TIMEFRAME_MINUTES[timeframe] * 60_000
+        offsets = np.sort(rng.integers(0, length_ms, count))
+        # Drift from open to close with noise, kept inside the candle's range
+        path = candle['open'] + (candle['close'] - candle['open']) * offsets / length_ms
+        prices = np.clip(path + rng.normal(0, (candle['high'] - candle['low']) / 6, count),
+                         candle['low'], candle['high'])
+        amounts = rng.exponential(max(float(candle['volume']), 1.0) / count, count)
+        sides = np.where(rng.random(count) < 0.5, 'buy', 'sell')
+
+        trades = []
+        for i, (offset, price, amount, side) in enumerate(zip(offsets.tolist(), prices.tolist(),
+                                                              amounts.tolist(), sides.tolist())):
+            timestamp = open_ms + offset
+            if since is not None and timestamp < since:
+                continue
+            trades.append({
+                'id': str(row * BINANCE_MAX_LIMIT + i),
+                'timestamp': timestamp,
+                'datetime': pd.Timestamp(timestamp, unit='ms').isoformat(timespec='milliseconds') + 'Z',
+                'symbol': symbol,
+                'order': None,
+                'type': None,
+                'side': side,
+                'takerOrMaker': None,
+                'price': price,
+                'amount': amount,
+                'cost': price * amount,
+                'fee': None,
+                'info': {}
+            })
+        return trades
+
+    def fetch_balance(self, params: Optional[Dict] = None) -> Dict:
+        """The configured balances, all free"""
+        self._request('fetch_balance')
+        balance = {'info': {}, 'free': {}, 'used': {}, 'total': {}}
+        for currency, total in self.balance.items():
+            balance[currency] = {'free': float(total), 'used': 0.0, 'total': float(total)}
+            balance['free'][currency] = float(total)
+            balance['used'][currency] = 0.0
+            balance['total'][currency] = float(total)
+        return balance
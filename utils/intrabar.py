@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Intrabar Exit Resolution
+Decides which exit level a bar touched first by looking at the lower
+timeframe candles inside it
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import timedelta
+from typing import Dict
+from config import TradingConfig
+
+def _first_true(mask: np.ndarray) -> float:
+    """Index of the first True value, or inf when there is none"""
+    if not mask.any():
+        return np.inf
+    return int(np.argmax(mask))
+
+class IntrabarResolver:
+    """Resolves stop / take profit / trailing trigger order within a bar"""
+
+    def __init__(self, data: pd.DataFrame, timeframe: str, sub_data: pd.DataFrame, sub_timeframe: str):
+        """
+        Args:
+            data: Backtest DataFrame (bars indexed by open time)
+            timeframe: Timeframe of `data`
+            sub_data: Lower timeframe candles covering the same period
+            sub_timeframe: Timeframe of `sub_data` (e.g. '1m', '5m')
+        """
+        if TradingConfig.TIMEFRAME_MINUTES[sub_timeframe] >= TradingConfig.TIMEFRAME_MINUTES[timeframe]:
+            raise ValueError(f"Intrabar timeframe {sub_timeframe} must be lower than {timeframe}")
+
+        if sub_data.empty:
+            sub_data = pd.DataFrame({'high': [], 'low': []}, index=pd.DatetimeIndex([]))
+
+        self.high = data['high'].to_numpy(dtype=float)
+        self.low = data['low'].to_numpy(dtype=float)
+        self.sub_high = sub_data['high'].to_numpy(dtype=float)
+        self.sub_low = sub_data['low'].to_numpy(dtype=float)
+
+        # Sub-bars of bar i are sub_high[starts[i]:ends[i]]
+        bar_open = pd.DatetimeIndex(data.index).values
+        bar_close = (pd.DatetimeIndex(data.index) + timedelta(minutes=TradingConfig.TIMEFRAME_MINUTES[timeframe])).values
+        sub_open = pd.DatetimeIndex(sub_data.index).values
+        self.starts = np.searchsorted(sub_open, bar_open, side='left')
+        self.ends = np.searchsorted(sub_open, bar_close, side='left')
+
+        self.stats = {'bars_touched': 0, 'sub_bar_resolutions': 0, 'fallbacks': 0}
+
+    @staticmethod
+    def _stop_exit_type(position: Dict) -> str:
+        # Same classification as Backtester._should_close_position
+        if abs(position['stop_loss'] - position['entry_price']) < 0.01:
+            return 'stop_loss_at_entry'
+        return 'stop_loss'
+
+    def _touches(self, side: str, high: np.ndarray, low: np.ndarray, level: float, adverse: bool) -> np.ndarray:
+        """Mask of bars touching a level (adverse = stop side)"""
+        if (side == 'long') == adverse:
+            return low <= level
+        return high >= level
+
+    def _resolve_range(self, position: Dict, high: np.ndarray, low: np.ndarray):
+        """Walk candles in order; same-candle ties go to the stop (conservative)"""
+        side = position['side']
+        first_stop = _first_true(self._touches(side, high, low, position['stop_loss'], adverse=True))
+        first_tp = _first_true(self._touches(side, high, low, position['take_profit'], adverse=False))
+
+        trigger = position.get('trailing_trigger')
+        if trigger is not None:
+            first_trigger = _first_true(self._touches(side, high, low, trigger, adverse=False))
+            if first_trigger < min(first_stop, first_tp):
+                # Stop moves to breakeven from the trigger candle onwards
+                position['stop_loss'] = position['entry_price']
+                position.pop('trailing_trigger', None)
+                start = int(first_trigger)
+                first_stop = start + _first_true(
+                    self._touches(side, high[start:], low[start:], position['stop_loss'], adverse=True)
+                )
+
+        if first_stop == np.inf and first_tp == np.inf:
+            return False
+        if first_stop <= first_tp:
+            return self._stop_exit_type(position)
+        return 'take_profit'
+
+    def resolve(self, position: Dict, i: int):
+        """
+        Exit type for an open position at bar `i`
+
+        Exits trigger on high/low touches instead of the close. When the bar
+        touches any level, its sub-bars decide which level came first; bars
+        without sub-bars are treated as one candle (stop first on ties).
+        Like `_should_close_position`, a trailing trigger moves the stop to
+        the entry price in `position`.
+
+        Returns:
+            str or False: 'stop_loss', 'stop_loss_at_entry', 'take_profit' or False
+        """
+        bar_high = self.high[i:i + 1]
+        bar_low = self.low[i:i + 1]
+
+        levels = [(position['stop_loss'], True), (position['take_profit'], False)]
+        if position.get('trailing_trigger') is not None:
+            levels.append((position['trailing_trigger'], False))
+        if not any(self._touches(position['side'], bar_high, bar_low, level, adverse)[0] for level, adverse in levels):
+            return False
+
+        self.stats['bars_touched'] += 1
+        start, end = self.starts[i], self.ends[i]
+        if end > start:
+            self.stats['sub_bar_resolutions'] += 1
+            return self._resolve_range(position, self.sub_high[start:end], self.sub_low[start:end])
+
+        self.stats['fallbacks'] += 1
+        return self._resolve_range(position, bar_high, bar_low)
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Backtest Job Queue
+SQLite-backed queue of sweep cells shared by workers on any number of
+machines (point them at the same file on a shared filesystem with working
+file locks); claims are atomic, running jobs hold a lease that workers
+heartbeat, and expired leases return the job to the queue
+"""
+
+import os
+import json
+import time
+import socket
+import sqlite3
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+LEASE_SECONDS = 300
+
+def job_key(job: Dict) -> str:
+    """Identity of a job; enqueueing the same cell twice is a no-op"""
+    return hashlib.sha256(json.dumps(job, sort_keys=True, default=str).encode()).hexdigest()
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+class JobQueue:
+    """Jobs in a local or shared SQLite file"""
+
+    def __init__(self, path: str = 'cache/jobs.sqlite', max_attempts: int = 3):
+        """
+        Args:
+            path: Queue file
+            max_attempts: Claims per job before it is marked failed
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit; claims open their own write transaction
+        self.connection = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT UNIQUE,
+                payload TEXT,
+                status TEXT DEFAULT 'pending',
+                worker TEXT,
+                lease_expires REAL,
+                attempts INTEGER DEFAULT 0,
+                error TEXT,
+                created_at TEXT,
+                updated_at TEXT
+            )
+        """)
+        self.connection.execute('CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_expires)')
+
+    def enqueue(self, jobs: List[Dict]) -> int:
+        """Add jobs (JSON-serialisable dicts); returns how many were new"""
+        now = datetime.now().isoformat()
+        before = self.connection.total_changes
+        self.connection.execute('BEGIN IMMEDIATE')
+        try:
+            self.connection.executemany(
+                'INSERT OR IGNORE INTO jobs (key, payload, created_at, updated_at) VALUES (?, ?, ?, ?)',
+                [(job_key(job), json.dumps(job, sort_keys=True, default=str), now, now) for job in jobs]
+            )
+            self.connection.execute('COMMIT')
+        except Exception:
+            self.connection.execute('ROLLBACK')
+            raise
+        return self.connection.total_changes - before
+
+    def claim(self, worker: str, lease_seconds: float = LEASE_SECONDS) -> Optional[Tuple[int, Dict]]:
+        """
+        Atomically take the oldest pending job, or a running one whose lease expired
+
+        Returns:
+            tuple: (job id, job) or None when nothing is claimable
+        """
+        now = time.time()
+        self.connection.execute('BEGIN IMMEDIATE')
+        try:
+            # Jobs whose worker died too often are given up on
+            self.connection.execute(
+                "UPDATE jobs SET status = 'failed', error = 'lease expired too often', updated_at = ? "
+                "WHERE status = 'running' AND lease_expires < ? AND attempts >= ?",
+                (datetime.now().isoformat(), now, self.max_attempts)
+            )
+            row = self.connection.execute(
+                "SELECT id, payload FROM jobs WHERE status = 'pending' OR (status = 'running' AND lease_expires < ?) "
+                "ORDER BY id LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                self.connection.execute('COMMIT')
+                return None
+            self.connection.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, lease_expires = ?, attempts = attempts + 1, "
+                "updated_at = ? WHERE id = ?",
+                (worker, now + lease_seconds, datetime.now().isoformat(), row[0])
+            )
+            self.connection.execute('COMMIT')
+        except Exception:
+            self.connection.execute('ROLLBACK')
+            raise
+        return row[0], json.loads(row[1])
+
+    def heartbeat(self, job_id: int, worker: str, lease_seconds: float = LEASE_SECONDS) -> bool:
+        """Extend the lease; False when the job was taken over by another worker"""
+        cursor = self.connection.execute(
+            "UPDATE jobs SET lease_expires = ? WHERE id = ? AND worker = ? AND status = 'running'",
+            (time.time() + lease_seconds, job_id, worker)
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker: str):
+        self.connection.execute(
+            "UPDATE jobs SET status = 'done', lease_expires = NULL, updated_at = ? WHERE id = ? AND worker = ?",
+            (datetime.now().isoformat(), job_id, worker)
+        )
+
+    def fail(self, job_id: int, worker: str, error: str):
+        """Record an error; the job is retried until max_attempts"""
+        self.connection.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "error = ?, lease_expires = NULL, updated_at = ? WHERE id = ? AND worker = ?",
+            (self.max_attempts, error, datetime.now().isoformat(), job_id, worker)
+        )
+
+    def requeue_failed(self) -> int:
+        """Give failed jobs another max_attempts claims"""
+        cursor = self.connection.execute(
+            "UPDATE jobs SET status = 'pending', attempts = 0, error = NULL WHERE status = 'failed'"
+        )
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        """Job count per status"""
+        counts = dict(self.connection.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall())
+        return {status: counts.get(status, 0) for status in ('pending', 'running', 'done', 'failed')}
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class _Heartbeat(threading.Thread):
+    """Keeps a job's lease alive while the backtest runs"""
+
+    def __init__(self, path: str, job_id: int, worker: str, lease_seconds: float):
+        super().__init__(daemon=True)
+        self.path = path
+        self.job_id = job_id
+        self.worker = worker
+        self.lease_seconds = lease_seconds
+        self.stopped = threading.Event()
+
+    def run(self):
+        # sqlite3 connections stay in the thread that opened them
+        queue = JobQueue(self.path)
+        try:
+            while not self.stopped.wait(self.lease_seconds / 3):
+                if not queue.heartbeat(self.job_id, self.worker, self.lease_seconds):
+                    logging.warning(f"Lost the lease on job {self.job_id}")
+                    return
+        finally:
+            queue.close()
+
+_BACKTESTERS = {}
+
+def run_job(job: Dict, result_store=None) -> Optional[Dict]:
+    """
+    Run one job built by run_strategy_timeframe.strategy_job
+
+    Results go through the result store, so a cell already computed by any
+    worker (or a local sweep) is not recomputed.
+    """
+    from backtest import Backtester
+    from utils.result_store import cached_backtest
+
+    base_timeframe = job.get('base_timeframe')
+    if base_timeframe not in _BACKTESTERS:
+        _BACKTESTERS[base_timeframe] = Backtester(base_timeframe=base_timeframe)
+    backtester = _BACKTESTERS[base_timeframe]
+
+    start_date = datetime.strptime(job['start_date'], '%Y-%m-%d')
+    end_date = datetime.strptime(job['end_date'], '%Y-%m-%d')
+    data = backtester._fetch_historical_data(job['symbol'], start_date, end_date, job['timeframe'])
+    if data is None or data.empty:
+        raise RuntimeError(f"No data for {job['symbol']} {job['timeframe']} {job['start_date']} to {job['end_date']}")
+    return cached_backtest(result_store, backtester, data, job['symbol'], job['timeframe'], job['strategy_name'],
+                           start_date=start_date, end_date=end_date, **job['backtest'])
+
+def work(queue_path: str, store_path: str, worker: Optional[str] = None, lease_seconds: float = LEASE_SECONDS,
+         poll_seconds: float = 5.0, exit_when_idle: bool = True, store_journal_mode: str = 'DELETE') -> int:
+    """
+    Worker loop: claim, run, store, complete
+
+    Args:
+        queue_path: JobQueue file
+        store_path: ResultStore file the results are written to
+        worker: Worker id (default: hostname-pid)
+        lease_seconds: Lease length; the heartbeat renews it every third of it
+        poll_seconds: Wait between claims when the queue is empty
+        exit_when_idle: Return once nothing is pending or running
+        store_journal_mode: Result store journal mode; DELETE works on a store shared
+                            between machines, WAL only for a store local to all workers
+
+    Returns:
+        int: Jobs completed by this worker
+    """
+    from utils.result_store import ResultStore
+
+    worker = worker or default_worker_id()
+    completed = 0
+    with JobQueue(queue_path) as queue, ResultStore(store_path, journal_mode=store_journal_mode) as store:
+        while True:
+            claimed = queue.claim(worker, lease_seconds)
+            if claimed is None:
+                stats = queue.stats()
+                if exit_when_idle and stats['pending'] == 0 and stats['running'] == 0:
+                    return completed
+                time.sleep(poll_seconds)
+                continue
+
+            job_id, job = claimed
+            heartbeat = _Heartbeat(queue_path, job_id, worker, lease_seconds)
+            heartbeat.start()
+            try:
+                results = run_job(job, store)
+                if results is None:
+                    raise RuntimeError('Backtest returned no results')
+                queue.complete(job_id, worker)
+                completed += 1
+                logging.info(f"{worker}: job {job_id} done ({job['strategy_name']} {job['timeframe']})")
+            except Exception as e:
+                logging.error(f"{worker}: job {job_id} failed: {e}")
+                queue.fail(job_id, worker, str(e))
+            finally:
+                heartbeat.stopped.set()
+                heartbeat.join()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo Robustness Analysis
+Resamples a backtest's trade sequence into thousands of alternative equity
+paths and reports drawdown percentiles, ruin probability and return bands
+"""
+
+import numpy as np
+from typing import Dict, List, Optional
+
+METHODS = ('bootstrap', 'shuffle', 'skip')
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# Paths simulated per block; keeps the (paths x trades) matrix around 160MB
+_BLOCK_CELLS = 20_000_000
+
+def base_trade_pnl(trades: List[Dict]) -> np.ndarray:
+    """
+    PnL of each trade at 1x risk
+
+    run_backtest sizes positions from the initial balance (fixed R), so a
+    trade's PnL only depends on the balance through the scaling multiplier;
+    dividing it out gives a PnL that can be replayed in any order.
+    """
+    pnl = np.array([trade['pnl'] for trade in trades], dtype=np.float64)
+    multipliers = np.array([
+        (trade.get('scaling_info') or {}).get('multiplier', 1.0) or 1.0 for trade in trades
+    ], dtype=np.float64)
+    return pnl / multipliers
+
+def _sample_block(rng: np.random.Generator, base_pnl: np.ndarray, method: str, n_paths: int,
+                  skip_probability: float) -> np.ndarray:
+    """(n_paths, n_trades) matrix of 1x PnL per simulated trade"""
+    n_trades = len(base_pnl)
+    if method == 'bootstrap':
+        return base_pnl[rng.integers(0, n_trades, size=(n_paths, n_trades))]
+    if method == 'shuffle':
+        return base_pnl[rng.permuted(np.broadcast_to(np.arange(n_trades), (n_paths, n_trades)), axis=1)]
+    if method == 'skip':
+        # Original order, each trade missed (e.g. downtime, rejected order) with skip_probability
+        kept = rng.random((n_paths, n_trades)) >= skip_probability
+        return np.where(kept, base_pnl, 0.0)
+    raise ValueError(f"Unknown Monte Carlo method: {method} (use one of {METHODS})")
+
+def _simulate_block(pnl: np.ndarray, initial_balance: float, enable_scaling: bool, scaling_threshold: float,
+                    scaling_multiplier: float, savings_rate: float, ruin_balance: float) -> Dict[str, np.ndarray]:
+    """Replay every path with run_backtest's account rules, one trade step at a time"""
+    n_paths, n_trades = pnl.shape
+
+    balance = np.full(n_paths, float(initial_balance))
+    savings = np.zeros(n_paths)
+    peak = balance.copy()
+    max_drawdown = np.zeros(n_paths)
+    ruined = np.zeros(n_paths, dtype=bool)
+    one_r = initial_balance * 0.01
+
+    for t in range(n_trades):
+        trade_pnl = pnl[:, t]
+        if enable_scaling:
+            # Same rule as run_backtest: scale once account profit reaches the threshold in R
+            scaled = (balance - initial_balance) / one_r >= scaling_threshold
+            trade_pnl = np.where(scaled, trade_pnl * scaling_multiplier, trade_pnl)
+        trade_pnl = np.where(ruined, 0.0, trade_pnl)
+        balance = balance + trade_pnl
+
+        if savings_rate:
+            saving = ~ruined & (trade_pnl > 0) & (balance > initial_balance)
+            save_amount = np.where(saving, (balance - initial_balance) * savings_rate, 0.0)
+            savings += save_amount
+            balance = balance - save_amount
+
+        ruined |= balance <= ruin_balance
+        peak = np.maximum(peak, balance)
+        max_drawdown = np.maximum(max_drawdown, (peak - balance) / peak)
+
+    return {
+        'final_balance': balance,
+        'savings': savings,
+        'max_drawdown': max_drawdown * 100,
+        'ruined': ruined
+    }
+
+def run_monte_carlo(trades: List[Dict], initial_balance: float = 10000, n_paths: int = 10000,
+                    method: str = 'bootstrap', enable_scaling: bool = False, scaling_threshold: float = 1.0,
+                    scaling_multiplier: float = 2.0, savings_rate: float = 0.10, skip_probability: float = 0.1,
+                    ruin_threshold: float = 0.0, seed: Optional[int] = None,
+                    percentiles=PERCENTILES) -> Optional[Dict]:
+    """
+    Monte Carlo distribution of a backtest's outcome
+
+    Args:
+        trades: run_backtest results['trades']
+        initial_balance: Balance the backtest started with
+        n_paths: Number of simulated trade sequences (10k-100k)
+        method: 'bootstrap' (draw with replacement), 'shuffle' (random order)
+                or 'skip' (original order, trades randomly missed)
+        enable_scaling / scaling_threshold / scaling_multiplier: run_backtest's scaling settings
+        savings_rate: Share of profit above the initial balance swept to savings after a win
+        skip_probability: Chance of missing a trade ('skip' method)
+        ruin_threshold: Ruin when balance falls to this fraction of the initial
+                        balance (0 = account blown, as in run_backtest)
+        seed: Random seed for reproducible runs
+
+    Returns:
+        dict: ruin/profit probabilities and percentile bands of return, total
+              wealth and max drawdown (in %), or None without trades
+    """
+    if not trades:
+        return None
+
+    base_pnl = base_trade_pnl(trades)
+    rng = np.random.default_rng(seed)
+    ruin_balance = initial_balance * ruin_threshold
+    block = max(1, _BLOCK_CELLS // len(base_pnl))
+
+    outcomes = []
+    for start in range(0, n_paths, block):
+        pnl = _sample_block(rng, base_pnl, method, min(block, n_paths - start), skip_probability)
+        outcomes.append(_simulate_block(pnl, initial_balance, enable_scaling, scaling_threshold,
+                                        scaling_multiplier, savings_rate, ruin_balance))
+    outcome = {key: np.concatenate([o[key] for o in outcomes]) for key in outcomes[0]}
+
+    returns = (outcome['final_balance'] - initial_balance) / initial_balance * 100
+    wealth = outcome['final_balance'] + outcome['savings']
+
+    def bands(values):
+        return {f"p{p}": float(v) for p, v in zip(percentiles, np.percentile(values, percentiles))}
+
+    return {
+        'method': method,
+        'paths': n_paths,
+        'trades': len(base_pnl),
+        'ruin_probability': float(outcome['ruined'].mean()),
+        'profit_probability': float((wealth > initial_balance).mean()),
+        'return_bands': bands(returns),
+        'wealth_bands': bands(wealth),
+        'drawdown_bands': bands(outcome['max_drawdown']),
+        'mean_return': float(returns.mean()),
+        'worst_drawdown': float(outcome['max_drawdown'].max())
+    }
+
+def print_monte_carlo(summary: Optional[Dict]):
+    """Print a Monte Carlo summary"""
+    if not summary:
+        print("🎲 MONTE CARLO: no trades to resample")
+        return
+    print(f"\n🎲 MONTE CARLO ({summary['method']}, {summary['paths']:,} paths x {summary['trades']} trades):")
+    print("-" * 40)
+    print(f"🔥 Ruin probability: {summary['ruin_probability'] * 100:.2f}%")
+    print(f"✅ Profit probability: {summary['profit_probability'] * 100:.2f}%")
+    for label, key, unit in (("📈 Return", 'return_bands', '%'), ("📉 Max drawdown", 'drawdown_bands', '%'),
+                             ("💎 Total wealth", 'wealth_bands', '$')):
+        bands = summary[key]
+        values = ' | '.join(
+            f"{name}: ${value:,.2f}" if unit == '$' else f"{name}: {value:.2f}%" for name, value in bands.items()
+        )
+        print(f"{label}: {values}")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Multi-Timeframe Data View
+Maps every base bar to the last closed bar of each higher timeframe so
+strategies can read higher timeframe context without lookahead
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import timedelta
+from typing import Dict, Iterable, Optional
+from config import TradingConfig
+from .resampler import can_resample, resample_ohlcv
+
+class MultiTimeframeView:
+    """Base timeframe frame plus index-aligned higher timeframe frames"""
+
+    def __init__(self, base_data: pd.DataFrame, base_timeframe: str, higher_frames: Dict[str, pd.DataFrame]):
+        """
+        Args:
+            base_data: Base timeframe DataFrame indexed by candle open time
+            base_timeframe: Timeframe of `base_data` (e.g. '5m')
+            higher_frames: timeframe -> DataFrame indexed by candle open time
+        """
+        self.base_timeframe = base_timeframe
+        self.base_index = base_data.index
+        self.frames = {}
+        self.index_maps = {}
+        self._columns = {}
+
+        # A base bar's information is available once the bar has closed
+        base_close = self._close_times(base_data.index, base_timeframe)
+        for timeframe, frame in higher_frames.items():
+            higher_close = self._close_times(frame.index, timeframe)
+            # Last higher bar whose close is at or before the base bar's close (-1 = none yet)
+            self.index_maps[timeframe] = np.searchsorted(higher_close, base_close, side='right') - 1
+            self.frames[timeframe] = frame
+            self._columns[timeframe] = {}
+
+    @staticmethod
+    def _close_times(index: pd.Index, timeframe: str) -> np.ndarray:
+        minutes = TradingConfig.TIMEFRAME_MINUTES[timeframe]
+        return (pd.DatetimeIndex(index) + timedelta(minutes=minutes)).values
+
+    @classmethod
+    def from_base(cls, base_data: pd.DataFrame, base_timeframe: str, timeframes: Iterable[str],
+                  add_indicators=None, frames: Optional[Dict[str, pd.DataFrame]] = None):
+        """
+        Build the view, deriving each higher timeframe from the base candles
+
+        Args:
+            base_data: Base OHLCV DataFrame
+            base_timeframe: Timeframe of `base_data`
+            timeframes: Higher timeframes to include
+            add_indicators: Function applied to every derived frame (e.g. Backtester._add_indicators)
+            frames: Already loaded frames for timeframes that cannot be derived
+
+        Returns:
+            MultiTimeframeView
+        """
+        frames = dict(frames or {})
+        for timeframe in timeframes:
+            if timeframe in frames:
+                continue
+            if not can_resample(timeframe, base_timeframe):
+                raise ValueError(f"Cannot derive {timeframe} from {base_timeframe}; pass it in `frames`")
+            derived = resample_ohlcv(base_data, timeframe, base_timeframe)
+            if add_indicators is not None:
+                derived = add_indicators(derived)
+            frames[timeframe] = derived
+        return cls(base_data, base_timeframe, frames)
+
+    def __deepcopy__(self, memo):
+        # pandas deep-copies DataFrame.attrs on every slice; the view is read-only so share it
+        return self
+
+    @property
+    def timeframes(self):
+        return list(self.frames)
+
+    def bar_index(self, timeframe: str, i: int) -> int:
+        """Position of the last closed `timeframe` bar at base bar `i` (-1 if none)"""
+        return int(self.index_maps[timeframe][i])
+
+    def _column(self, timeframe: str, column: str) -> np.ndarray:
+        values = self._columns[timeframe].get(column)
+        if values is None:
+            values = self.frames[timeframe][column].to_numpy(dtype=float)
+            self._columns[timeframe][column] = values
+        return values
+
+    def value(self, timeframe: str, column: str, i: int) -> float:
+        """Higher timeframe column value visible at base bar `i` (NaN if none)"""
+        j = self.index_maps[timeframe][i]
+        if j < 0:
+            return np.nan
+        return self._column(timeframe, column)[j]
+
+    def aligned(self, timeframe: str, column: str) -> np.ndarray:
+        """Column aligned to every base bar (NaN before the first closed bar)"""
+        values = self._column(timeframe, column)
+        index_map = self.index_maps[timeframe]
+        aligned = np.full(len(index_map), np.nan)
+        available = index_map >= 0
+        aligned[available] = values[index_map[available]]
+        return aligned
+
+    def row(self, timeframe: str, i: int) -> Optional[pd.Series]:
+        """Last closed higher timeframe row at base bar `i`"""
+        j = self.index_maps[timeframe][i]
+        return self.frames[timeframe].iloc[j] if j >= 0 else None
+
+    def history(self, timeframe: str, i: int) -> pd.DataFrame:
+        """Higher timeframe bars closed by base bar `i`"""
+        return self.frames[timeframe].iloc[:self.index_maps[timeframe][i] + 1]
+
+    def trend(self, timeframe: str, fast: str = 'ema_20', slow: str = 'ema_50') -> np.ndarray:
+        """
+        Higher timeframe trend per base bar
+
+        Returns:
+            ndarray: 1 when fast > slow, -1 when fast < slow, 0 when unknown
+        """
+        difference = self.aligned(timeframe, fast) - self.aligned(timeframe, slow)
+        return np.nan_to_num(np.sign(difference)).astype(np.int8)
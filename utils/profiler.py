@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Backtest Profiler
+Opt-in per-stage timers for run_backtest (signals, exit checks, PnL, equity,
+indicators, ...), per-strategy signal call counts, the slowest bars and the
+peak and retained memory of each pipeline phase (fetch, indicators,
+simulation, metrics, reports)
+"""
+
+import sys
+import heapq
+import itertools
+import tracemalloc
+from collections import defaultdict
+from time import perf_counter
+from typing import Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MB = 1024 * 1024
+
+def max_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far (None where unavailable)"""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return max_rss / MB if sys.platform == 'darwin' else max_rss / 1024
+
+class _Stage:
+    """Times one with-block into a profiler stage"""
+
+    __slots__ = ('profiler', 'name', 'strategy', 'start')
+
+    def __init__(self, profiler, name, strategy):
+        self.profiler = profiler
+        self.name = name
+        self.strategy = strategy
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, perf_counter() - self.start, self.strategy)
+        return False
+
+class _MemoryPhase:
+    """Tracks tracemalloc memory over one with-block into a profiler phase"""
+
+    __slots__ = ('profiler', 'name', 'start', 'peak')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler._enter_memory(self)
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._exit_memory(self)
+        return False
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+class NullProfiler:
+    """Profiler interface that records nothing (run_backtest's default)"""
+
+    enabled = False
+    timing = False
+    _STAGE = _NullStage()
+
+    def stage(self, name: str, strategy: Optional[str] = None):
+        return self._STAGE
+
+    def memory(self, name: str):
+        return self._STAGE
+
+    def begin_bars(self):
+        pass
+
+    def bar(self, index: int, time, seconds: float):
+        pass
+
+NULL_PROFILER = NullProfiler()
+
+class BacktestProfiler:
+    """
+    Cumulative stage timings across one or more backtests
+
+    Pass the same instance to several run_backtest calls (e.g. a sweep) to
+    compare strategies; each run's results also get a 'profile' summary of
+    everything recorded so far.
+    """
+
+    enabled = True
+
+    def __init__(self, slowest_bars: int = 0, timing: bool = True, memory: bool = False):
+        """
+        Args:
+            slowest_bars: Keep the time and per-stage breakdown of this many slowest bars (0 = off)
+            timing: Time the stages (off = memory phases only, no per-bar cost)
+            memory: Record each phase's peak and retained memory with tracemalloc
+                    (started here if it isn't running; slows allocations while on)
+        """
+        self.slowest_bars = slowest_bars
+        self.timing = timing
+        self.track_memory = memory
+        self.stages = defaultdict(lambda: [0, 0.0])  # stage -> [calls, seconds]
+        self.strategies = defaultdict(lambda: [0, 0.0])  # strategy -> [signal calls, seconds]
+        self.bars = 0
+        self.bar_seconds = 0.0
+        self._slowest = []  # min-heap of (seconds, sequence, bar info)
+        self._sequence = itertools.count()
+        self._bar_stages = defaultdict(float) if slowest_bars and timing else None
+        # phase -> [calls, peak bytes above the phase start, retained bytes, traced bytes at the end, max RSS MB]
+        self.memory_phases = defaultdict(lambda: [0, 0, 0, 0, None])
+        self._open_phases = []
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stage(self, name: str, strategy: Optional[str] = None):
+        """Context manager timing a stage; strategy also attributes the time to a strategy"""
+        return _Stage(self, name, strategy) if self.timing else NullProfiler._STAGE
+
+    def memory(self, name: str):
+        """
+        Context manager recording a phase's memory: the peak above what was
+        allocated when it started (transient copies included) and what it left
+        allocated (retained); the largest of each over repeated calls is kept
+        """
+        return _MemoryPhase(self, name) if self.track_memory else NullProfiler._STAGE
+
+    def _enter_memory(self, phase: _MemoryPhase):
+        current, peak = tracemalloc.get_traced_memory()
+        # Enclosing phases keep the peak reached so far before it is reset
+        for enclosing in self._open_phases:
+            enclosing.peak = max(enclosing.peak, peak)
+        tracemalloc.reset_peak()
+        phase.start = current
+        phase.peak = current
+        self._open_phases.append(phase)
+
+    def _exit_memory(self, phase: _MemoryPhase):
+        current, peak = tracemalloc.get_traced_memory()
+        self._open_phases.remove(phase)
+        peak = max(phase.peak, peak)
+        for enclosing in self._open_phases:
+            enclosing.peak = max(enclosing.peak, peak)
+        totals = self.memory_phases[phase.name]
+        totals[0] += 1
+        totals[1] = max(totals[1], peak - phase.start)
+        totals[2] = max(totals[2], current - phase.start)
+        totals[3] = current
+        totals[4] = max_rss_mb()
+
+    def add(self, name: str, seconds: float, strategy: Optional[str] = None):
+        totals = self.stages[name]
+        totals[0] += 1
+        totals[1] += seconds
+        if strategy is not None:
+            totals = self.strategies[strategy]
+            totals[0] += 1
+            totals[1] += seconds
+        if self._bar_stages is not None:
+            self._bar_stages[name] += seconds
+
+    def begin_bars(self):
+        """The bar loop starts; setup stages before it belong to no bar"""
+        if self._bar_stages is not None:
+            self._bar_stages.clear()
+
+    def bar(self, index: int, time, seconds: float):
+        """One simulated bar took `seconds` (stages timed since the previous bar belong to it)"""
+        self.bars += 1
+        self.bar_seconds += seconds
+        if self._bar_stages is None:
+            return
+        entry = (seconds, next(self._sequence), {'bar': index, 'time': time, 'stages': dict(self._bar_stages)})
+        if len(self._slowest) < self.slowest_bars:
+            heapq.heappush(self._slowest, entry)
+        elif seconds > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+        self._bar_stages.clear()
+
+    def summary(self) -> Dict:
+        """Stage and strategy totals, mean time per bar, the slowest bars and memory by phase"""
+        measured = sum(seconds for name, (calls, seconds) in self.stages.items() if '.' not in name)
+
+        def rows(totals):
+            return {
+                name: {
+                    'calls': calls,
+                    'seconds': seconds,
+                    'mean_us': seconds / calls * 1e6 if calls else 0.0,
+                    'share': seconds / measured * 100 if measured else 0.0
+                }
+                for name, (calls, seconds) in sorted(totals.items(), key=lambda item: -item[1][1])
+            }
+
+        return {
+            'stages': rows(self.stages),
+            'strategies': rows(self.strategies),
+            'bars': self.bars,
+            'bar_seconds': self.bar_seconds,
+            'mean_bar_us': self.bar_seconds / self.bars * 1e6 if self.bars else 0.0,
+            'slowest_bars': [
+                dict(info, seconds=seconds) for seconds, _, info in sorted(self._slowest, reverse=True)
+            ],
+            'memory': {
+                name: {
+                    'calls': calls,
+                    'peak_mb': peak / MB,
+                    'retained_mb': retained / MB,
+                    'traced_mb': traced / MB,
+                    'max_rss_mb': rss
+                }
+                for name, (calls, peak, retained, traced, rss) in self.memory_phases.items()
+            },
+            'max_rss_mb': max_rss_mb()
+        }
+
+    def format_summary(self) -> str:
+        """summary() as a text table"""
+        return self.format_profile(self.summary())
+
+    @staticmethod
+    def format_profile(summary: Dict) -> str:
+        """A summary() (e.g. results['profile']) as a text table"""
+        lines = []
+        if summary['stages']:
+            lines += [
+                f"⏱️  {summary['bars']} bars, {summary['bar_seconds']:.2f}s in the bar loop "
+                f"({summary['mean_bar_us']:.0f} µs/bar)",
+                f"{'Stage':<28} {'Calls':>9} {'Total s':>9} {'µs/call':>9} {'Share':>7}"
+            ]
+
+        def line(label, row, share=True):
+            share = f"{row['share']:6.1f}%" if share else ''
+            return f"{label:<28} {row['calls']:>9} {row['seconds']:>9.3f} {row['mean_us']:>9.1f} {share:>7}"
+
+        stages = summary['stages']
+        for name, row in stages.items():
+            if '.' in name:
+                continue
+            lines.append(line(name, row))
+            # Sub-stages (e.g. 'indicators.rsi') follow their stage, indented
+            for sub_name, sub_row in stages.items():
+                if sub_name.startswith(f"{name}."):
+                    lines.append(line(f"  {sub_name[len(name) + 1:]}", sub_row, share=False))
+        if summary['strategies']:
+            lines.append('Signals by strategy')
+            for name, row in summary['strategies'].items():
+                lines.append(line(f"  {name}", row, share=False))
+        if summary['slowest_bars']:
+            lines.append('Slowest bars')
+            for bar in summary['slowest_bars']:
+                top = max(bar['stages'].items(), key=lambda item: item[1], default=('-', 0.0))
+                lines.append(f"  #{bar['bar']:<8} {str(bar['time']):<22} {bar['seconds'] * 1e3:8.2f} ms "
+                             f"(mostly {top[0]}: {top[1] * 1e3:.2f} ms)")
+        memory = summary.get('memory')
+        if memory:
+            lines.append("🧠 Memory by phase (peak and kept are above the phase start; max RSS is the process high-water mark at its end)")
+            lines.append(f"{'Phase':<28} {'Calls':>9} {'Peak MB':>9} {'Kept MB':>9} {'Traced MB':>10} {'Max RSS MB':>11}")
+            for name, row in memory.items():
+                rss = f"{row['max_rss_mb']:.1f}" if row['max_rss_mb'] is not None else '-'
+                lines.append(f"{name:<28} {row['calls']:>9} {row['peak_mb']:>9.1f} {row['retained_mb']:>9.1f} "
+                             f"{row['traced_mb']:>10.1f} {rss:>11}")
+        return '\n'.join(lines)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Timeframe Resampling
+Derives higher timeframe candles from a single base-resolution candle store
+"""
+
+import logging
+import pandas as pd
+from datetime import datetime
+from config import TradingConfig
+
+OHLCV_AGGREGATION = {
+    'open': 'first',
+    'high': 'max',
+    'low': 'min',
+    'close': 'last',
+    'volume': 'sum'
+}
+
+def can_resample(timeframe: str, base_timeframe: str) -> bool:
+    """True when `timeframe` is a whole multiple of `base_timeframe`"""
+    minutes = TradingConfig.TIMEFRAME_MINUTES.get(timeframe)
+    base_minutes = TradingConfig.TIMEFRAME_MINUTES.get(base_timeframe)
+    if not minutes or not base_minutes:
+        return False
+    return minutes > base_minutes and minutes % base_minutes == 0
+
+def derived_timeframe_key(timeframe: str, base_timeframe: str) -> str:
+    """Cache timeframe key for candles derived from a base timeframe"""
+    return f"{timeframe}_from_{base_timeframe}"
+
+def resample_ohlcv(data: pd.DataFrame, timeframe: str, base_timeframe: str) -> pd.DataFrame:
+    """
+    Aggregate base candles into `timeframe` candles
+
+    Bars are labelled by their open time and aligned to the Unix epoch, which
+    matches exchange candles (4h bars open at 00:00, 04:00, ... UTC). Leading
+    and trailing bars that are not fully covered by base candles are dropped,
+    since the exchange version of those bars includes data outside the range.
+    Only OHLCV columns are kept; indicators must be recomputed afterwards.
+
+    Args:
+        data: Base OHLCV DataFrame indexed by candle open time
+        timeframe: Target timeframe (e.g. '1h')
+        base_timeframe: Timeframe of `data` (e.g. '5m')
+
+    Returns:
+        DataFrame: Resampled OHLCV data
+    """
+    if not can_resample(timeframe, base_timeframe):
+        raise ValueError(f"Cannot derive {timeframe} candles from {base_timeframe}")
+    if data.empty:
+        return data[list(OHLCV_AGGREGATION)]
+
+    minutes = TradingConfig.TIMEFRAME_MINUTES[timeframe]
+    bars_per_candle = minutes // TradingConfig.TIMEFRAME_MINUTES[base_timeframe]
+
+    resampler = data[list(OHLCV_AGGREGATION)].resample(
+        f"{minutes}min", label='left', closed='left', origin='epoch'
+    )
+    resampled = resampler.agg(OHLCV_AGGREGATION)
+    counts = resampler.size()
+
+    # Empty bins come from gaps in the base data
+    resampled = resampled[counts > 0]
+    counts = counts[counts > 0]
+
+    if len(resampled) and counts.iloc[-1] < bars_per_candle:
+        resampled = resampled.iloc[:-1]
+    if len(resampled) and counts.iloc[0] < bars_per_candle:
+        resampled = resampled.iloc[1:]
+
+    resampled.index.name = data.index.name
+    return resampled
+
+def get_resampled_ohlcv(cached_fetcher, symbol: str, timeframe: str, start_date: datetime,
+                        end_date: datetime, max_age_hours: int = 24) -> pd.DataFrame:
+    """
+    Serve `timeframe` candles derived from the fetcher's base timeframe
+
+    Derived frames are cached under the '{timeframe}_from_{base}' key so a
+    sweep over several timeframes only ever downloads the base history.
+
+    Args:
+        cached_fetcher: CachedDataFetcher with `base_timeframe` set
+
+    Returns:
+        DataFrame: Derived OHLCV data with indicators
+    """
+    base_timeframe = cached_fetcher.base_timeframe
+    cache_timeframe = derived_timeframe_key(timeframe, base_timeframe)
+    logger = logging.getLogger(__name__)
+
+    cached_data = cached_fetcher.cache.load_data(symbol, cache_timeframe, start_date, end_date, max_age_hours)
+    if cached_data is not None:
+        logger.info(f"Using cached {timeframe} data derived from {base_timeframe} for {symbol}")
+        return cached_data
+
+    base_data = cached_fetcher.get_ohlcv_cached(
+        symbol, base_timeframe, start_date, end_date, max_age_hours, resample=False
+    )
+    if base_data.empty:
+        return pd.DataFrame()
+
+    data = resample_ohlcv(base_data, timeframe, base_timeframe)
+    if data.empty:
+        return pd.DataFrame()
+
+    data = cached_fetcher.data_fetcher._add_indicators(data)
+    cached_fetcher.cache.save_data(symbol, cache_timeframe, start_date, end_date, data)
+    logger.info(f"Derived {len(data)} {timeframe} candles from {len(base_data)} {base_timeframe} candles")
+    return data
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Backtest Result Store
+SQLite cache of backtest results keyed by a fingerprint of the candles,
+strategy, parameters and backtest code, so sweeps skip cells that were
+already computed and resume after a crash
+"""
+
+import os
+import json
+import glob
+import zlib
+import pickle
+import sqlite3
+import hashlib
+import logging
+import pandas as pd
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Optional
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Source files whose changes can alter a backtest result
+CODE_FILES = (
+    'backtest.py', 'config.py', 'strategies/*.py', 'indicators/*.py',
+    'utils/signal_arrays.py', 'utils/ensemble.py', 'utils/intrabar.py',
+    'utils/multi_timeframe.py', 'utils/resampler.py', 'utils/compact_frame.py'
+)
+
+DATA_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+@lru_cache(maxsize=1)
+def code_version() -> str:
+    """Hash of the backtest, strategy and indicator sources"""
+    digest = hashlib.sha256()
+    for pattern in CODE_FILES:
+        for path in sorted(glob.glob(os.path.join(ROOT_DIR, pattern))):
+            digest.update(os.path.relpath(path, ROOT_DIR).encode())
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+def data_fingerprint(data: pd.DataFrame) -> str:
+    """Hash of the candles (timestamps and OHLCV values) a backtest runs on"""
+    columns = [column for column in DATA_COLUMNS if column in data.columns]
+    hashed = pd.util.hash_pandas_object(data[columns], index=True).to_numpy()
+    return hashlib.sha256(hashed.tobytes()).hexdigest()[:16]
+
+def result_key(fingerprint: str, symbol: str, timeframe: str, strategy_name: str, params: Dict,
+               version: Optional[str] = None) -> str:
+    """Key of one backtest cell"""
+    payload = json.dumps({
+        'data': fingerprint,
+        'symbol': symbol,
+        'timeframe': timeframe,
+        'strategy': strategy_name,
+        'params': params,
+        'code': version or code_version()
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+class ResultStore:
+    """Backtest results in a local SQLite file, one row per result key"""
+
+    def __init__(self, path: str = 'cache/results.sqlite', journal_mode: str = 'WAL'):
+        """
+        Args:
+            path: Store file
+            journal_mode: SQLite journal mode; WAL keeps its index in shared memory,
+                          so every process must be on the same machine. Use 'DELETE'
+                          for a file on a network filesystem shared between machines
+                          (the mode is stored in the file; switching needs sole access)
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        # Several sweep processes may share the file
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.execute(f'PRAGMA journal_mode={journal_mode}')
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                symbol TEXT,
+                timeframe TEXT,
+                strategy TEXT,
+                params TEXT,
+                data_fingerprint TEXT,
+                code_version TEXT,
+                created_at TEXT,
+                total_return REAL,
+                total_trades INTEGER,
+                metrics TEXT,
+                results BLOB
+            )
+        """)
+        self.connection.commit()
+        self.logger = logging.getLogger(__name__)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Stored run_backtest results, or None"""
+        row = self.connection.execute('SELECT results FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        try:
+            return pickle.loads(zlib.decompress(row[0]))
+        except Exception as e:
+            self.logger.warning(f"Unreadable stored result {key[:12]}: {e}")
+            return None
+
+    def put(self, key: str, results: Dict, symbol: str, timeframe: str, strategy_name: str, params: Dict,
+            fingerprint: str):
+        """Store run_backtest results (metrics, trades, equity curve, ...)"""
+        metrics = results.get('metrics', {})
+        self.connection.execute(
+            'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (key, symbol, timeframe, strategy_name, json.dumps(params, sort_keys=True, default=str), fingerprint,
+             code_version(), datetime.now().isoformat(), float(results.get('total_return', 0)),
+             int(metrics.get('total_trades', 0)), json.dumps(metrics, default=float),
+             sqlite3.Binary(zlib.compress(pickle.dumps(results, protocol=pickle.HIGHEST_PROTOCOL))))
+        )
+        self.connection.commit()
+
+    def purge_stale(self) -> int:
+        """Delete results computed by other code versions; returns the row count"""
+        cursor = self.connection.execute('DELETE FROM results WHERE code_version != ?', (code_version(),))
+        self.connection.commit()
+        return cursor.rowcount
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def cached_backtest(store: Optional[ResultStore], backtester, data: pd.DataFrame, symbol: str, timeframe: str,
+                    strategy_name: str, **backtest_kwargs) -> Optional[Dict]:
+    """
+    run_backtest through the result store
+
+    Args:
+        store: ResultStore (None runs the backtest uncached)
+        backtester: Backtester
+        data: OHLCV candles for the run (part of the key)
+        backtest_kwargs: Remaining run_backtest arguments (part of the key)
+
+    Returns:
+        dict: run_backtest results, from the store when this cell was computed before
+    """
+    if store is None:
+        return backtester.run_backtest(symbol=symbol, timeframe=timeframe, strategy_name=strategy_name,
+                                       data=data, **backtest_kwargs)
+
+    fingerprint = data_fingerprint(data)
+    params = {name: value for name, value in backtest_kwargs.items() if name not in ('start_date', 'end_date', 'checkpoint', 'profiler')}
+    key = result_key(fingerprint, symbol, timeframe, strategy_name, params)
+
+    results = store.get(key)
+    if results is not None:
+        logging.info(f"Result store hit for {symbol} {timeframe} {strategy_name}")
+        backtester.results = results
+        return results
+
+    results = backtester.run_backtest(symbol=symbol, timeframe=timeframe, strategy_name=strategy_name,
+                                      data=data, **backtest_kwargs)
+    if results:
+        # Timings describe this run, not the cell
+        stored = {name: value for name, value in results.items() if name != 'profile'}
+        store.put(key, stored, symbol, timeframe, strategy_name, params, fingerprint)
+    return results
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Shared Candle Frames
+Publishes a precomputed indicator frame once (shared memory or a memory-mapped
+file) so process-pool workers attach zero-copy NumPy views instead of
+receiving a pickled copy each
+"""
+
+import os
+import logging
+import itertools
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+
+# Column blocks start on cache-line boundaries
+_ALIGNMENT = 64
+
+# Worker-side registry: (symbol, timeframe) -> (segment, DataFrame, location)
+_ATTACHED = {}
+
+# Memory-mapped files of one process get distinct names, so a republished frame never reuses a path
+_PUBLISHED = itertools.count()
+
+# Backtester reused by every job in a pool worker
+_WORKER_BACKTESTER = None
+
+def _aligned(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+class SharedFrameHandle:
+    """Picklable description of a published frame; this is all a worker receives"""
+
+    def __init__(self, symbol: str, timeframe: str, backend: str, location: str, size: int,
+                 n_rows: int, index: Dict, blocks: List[Dict], attrs: Optional[Dict] = None):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.backend = backend
+        self.location = location
+        self.size = size
+        self.n_rows = n_rows
+        self.index = index
+        self.blocks = blocks
+        self.attrs = attrs or {}
+
+    @property
+    def key(self):
+        return (self.symbol, self.timeframe)
+
+    def __repr__(self):
+        return f"SharedFrameHandle({self.symbol} {self.timeframe}, {self.n_rows} rows, {self.backend}:{self.location})"
+
+class SharedFrame:
+    """Owner of a published frame; close() releases the shared segment or file"""
+
+    def __init__(self, handle: SharedFrameHandle, segment):
+        self.handle = handle
+        self._segment = segment
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Detach and remove the published data (workers must be done with it)"""
+        if self._segment is None:
+            return
+        _ATTACHED.pop(self.handle.key, None)
+        if self.handle.backend == 'shm':
+            self._segment.close()
+            self._segment.unlink()
+        else:
+            del self._segment
+            if os.path.exists(self.handle.location):
+                os.remove(self.handle.location)
+        self._segment = None
+
+def _layout(df: pd.DataFrame):
+    """Group columns by dtype and compute each block's offset in the buffer"""
+    if not isinstance(df.index, pd.DatetimeIndex):
+        raise ValueError("Shared frames need a DatetimeIndex")
+    # Timezone-aware indexes are stored as naive UTC
+    index_values = df.index.tz_convert(None).values if df.index.tz is not None else df.index.values
+
+    groups = {}
+    for column in df.columns:
+        dtype = df[column].dtype
+        if not isinstance(dtype, np.dtype) or dtype.kind not in 'biuf':
+            raise ValueError(f"Column '{column}' has unsupported dtype {dtype}")
+        groups.setdefault(dtype.str, []).append(column)
+
+    n_rows = len(df)
+    offset = index_values.nbytes
+    blocks = []
+    for dtype_str, columns in groups.items():
+        offset = _aligned(offset)
+        blocks.append({'dtype': dtype_str, 'columns': columns, 'offset': offset})
+        offset += np.dtype(dtype_str).itemsize * n_rows * len(columns)
+
+    index = {
+        'dtype': index_values.dtype.str,
+        'name': df.index.name,
+        'tz': str(df.index.tz) if df.index.tz is not None else None
+    }
+    return index_values, index, blocks, max(offset, 1)
+
+def _views(buffer, handle: SharedFrameHandle):
+    """NumPy views over the buffer: index array and one 2-D array per dtype block"""
+    index_dtype = np.dtype(handle.index['dtype'])
+    index_values = np.ndarray((handle.n_rows,), dtype=index_dtype, buffer=buffer, offset=0)
+    blocks = []
+    for block in handle.blocks:
+        shape = (len(block['columns']), handle.n_rows)
+        values = np.ndarray(shape, dtype=np.dtype(block['dtype']), buffer=buffer, offset=block['offset'])
+        blocks.append((block['columns'], values))
+    return index_values, blocks
+
+def publish_frame(df: pd.DataFrame, symbol: str, timeframe: str, backend: str = 'shm',
+                  directory: str = 'cache/shared') -> SharedFrame:
+    """
+    Copy a candle/indicator frame into shared memory once
+
+    Args:
+        df: Frame with a DatetimeIndex and numeric/bool columns (e.g. the
+            output of Backtester._add_indicators)
+        symbol: Trading symbol the frame belongs to
+        timeframe: Timeframe of the frame
+        backend: 'shm' (multiprocessing.shared_memory) or 'mmap' (file under `directory`)
+        directory: Location of memory-mapped files
+
+    Returns:
+        SharedFrame: Owner object; pass `.handle` to workers and close() when done
+    """
+    # Duplicate column names (indicators added twice) would be ambiguous by name
+    df = df.loc[:, ~df.columns.duplicated()]
+    index_values, index, blocks, size = _layout(df)
+
+    if backend == 'shm':
+        segment = shared_memory.SharedMemory(create=True, size=size)
+        buffer = segment.buf
+        location = segment.name
+    elif backend == 'mmap':
+        os.makedirs(directory, exist_ok=True)
+        location = os.path.join(directory,
+                                f"{symbol.replace('/', '')}_{timeframe}_{os.getpid()}_{next(_PUBLISHED)}.frame")
+        segment = np.memmap(location, dtype=np.uint8, mode='w+', shape=(size,))
+        buffer = segment
+    else:
+        raise ValueError(f"Unknown shared frame backend: {backend}")
+
+    attrs = {k: v for k, v in df.attrs.items() if isinstance(v, (str, int, float, bool, list, tuple))}
+    handle = SharedFrameHandle(symbol, timeframe, backend, location, size, len(df), index, blocks, attrs)
+
+    shared_index, shared_blocks = _views(buffer, handle)
+    shared_index[:] = index_values
+    for columns, values in shared_blocks:
+        for row, column in enumerate(columns):
+            values[row] = df[column].to_numpy()
+    if backend == 'mmap':
+        segment.flush()
+
+    logging.getLogger(__name__).info(
+        f"Published {symbol} {timeframe} frame ({len(df)} rows, {size / (1024 * 1024):.2f}MB) via {backend}"
+    )
+    return SharedFrame(handle, segment)
+
+def attach_frame(handle: SharedFrameHandle) -> pd.DataFrame:
+    """
+    Read-only DataFrame over a published frame (no data is copied)
+
+    Frames are cached per (symbol, timeframe), so repeated calls in a worker
+    return the same object; a handle of a newer publish (e.g. the next live
+    cycle's window) replaces it. Treat it as immutable: use copy(deep=False)
+    before adding columns or attrs.
+    """
+    cached = _ATTACHED.get(handle.key)
+    if cached is not None:
+        if cached[2] == handle.location:
+            return cached[1]
+        _detach(handle.key)
+
+    if handle.backend == 'shm':
+        segment = shared_memory.SharedMemory(name=handle.location)
+        buffer = segment.buf
+    else:
+        segment = np.memmap(handle.location, dtype=np.uint8, mode='r', shape=(handle.size,))
+        buffer = segment
+
+    index_values, blocks = _views(buffer, handle)
+    index_values.flags.writeable = False
+    columns = {}
+    for names, values in blocks:
+        values.flags.writeable = False
+        for row, name in enumerate(names):
+            columns[name] = values[row]
+
+    index = pd.DatetimeIndex(index_values, copy=False, name=handle.index['name'])
+    if handle.index['tz']:
+        index = index.tz_localize('UTC').tz_convert(handle.index['tz'])
+    frame = pd.DataFrame(columns, index=index, copy=False)
+    frame.attrs.update(handle.attrs)
+
+    _ATTACHED[handle.key] = (segment, frame, handle.location)
+    return frame
+
+def _detach(key):
+    """Drop a worker's attached frame; its segment is released once nothing references it"""
+    segment, frame, _ = _ATTACHED.pop(key)
+    del frame
+    if isinstance(segment, shared_memory.SharedMemory):
+        try:
+            segment.close()
+        except BufferError:
+            # Views still in use; the segment closes when they are collected
+            pass
+
+def get_shared_frame(symbol: str, timeframe: str) -> pd.DataFrame:
+    """Frame attached in this process for symbol/timeframe"""
+    cached = _ATTACHED.get((symbol, timeframe))
+    if cached is None:
+        raise KeyError(f"No shared frame attached for {symbol} {timeframe}")
+    return cached[1]
+
+def _init_worker(handles: List[SharedFrameHandle]):
+    for handle in handles:
+        attach_frame(handle)
+
+def run_shared_backtest(symbol: str, timeframe: str, job: Dict) -> Optional[Dict]:
+    """
+    Worker side: run one backtest on the attached symbol/timeframe frame
+
+    Args:
+        job: run_backtest keyword arguments; optional start_date/end_date
+             slice the frame (labels, both inclusive)
+    """
+    global _WORKER_BACKTESTER
+    from backtest import Backtester
+
+    if _WORKER_BACKTESTER is None:
+        _WORKER_BACKTESTER = Backtester()
+    job = dict(job)
+    start_date = job.pop('start_date', None)
+    end_date = job.pop('end_date', None)
+    data = get_shared_frame(symbol, timeframe)
+    if start_date is not None or end_date is not None:
+        data = data.loc[start_date:end_date]
+    return _WORKER_BACKTESTER.run_backtest(
+        symbol, start_date, end_date, data=data, timeframe=timeframe, indicators_ready=True, **job
+    )
+
+class SharedBacktestPool:
+    """
+    Process pool whose workers share one published indicator frame
+
+    Usage:
+        with SharedBacktestPool(data, 'SUIUSDT', '5m') as pool:
+            futures = [pool.submit(job) for job in jobs]
+    """
+
+    def __init__(self, data: pd.DataFrame, symbol: str, timeframe: str, max_workers: Optional[int] = None,
+                 backend: str = 'shm', indicators_ready: bool = False):
+        """
+        Args:
+            data: OHLCV DataFrame for symbol/timeframe
+            symbol: Trading symbol
+            timeframe: Timeframe of `data`
+            max_workers: Pool size (default: CPU count)
+            backend: 'shm' or 'mmap'
+            indicators_ready: `data` already has Backtester indicators
+        """
+        self.data = data
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.max_workers = max_workers
+        self.backend = backend
+        self.indicators_ready = indicators_ready
+        self.shared = None
+        self.executor = None
+
+    def __enter__(self):
+        data = self.data
+        if not self.indicators_ready:
+            from backtest import Backtester
+            data = Backtester()._add_indicators(data.copy())
+        self.shared = publish_frame(data, self.symbol, self.timeframe, backend=self.backend)
+        self.executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                            initargs=([self.shared.handle],))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=exc_type is not None)
+            self.executor = None
+        if self.shared is not None:
+            self.shared.close()
+            self.shared = None
+
+    def submit(self, job: Dict, fn=None, *args):
+        """
+        Queue one job
+
+        Args:
+            job: run_backtest keyword arguments (see run_shared_backtest)
+            fn: Module-level worker function called as fn(symbol, timeframe, job, *args)
+                (default: run_shared_backtest)
+
+        Returns:
+            Future
+        """
+        return self.executor.submit(fn or run_shared_backtest, self.symbol, self.timeframe, job, *args)
+
+def run_shared_backtests(data: pd.DataFrame, symbol: str, timeframe: str, jobs: List[Dict],
+                         max_workers: Optional[int] = None, backend: str = 'shm',
+                         indicators_ready: bool = False) -> List[Optional[Dict]]:
+    """
+    Run many backtests over one frame in a process pool
+
+    The frame (with indicators) is published once; every worker attaches to it
+    at startup, so N parallel runs share one copy of the data.
+
+    Args:
+        data: OHLCV DataFrame for symbol/timeframe
+        symbol: Trading symbol
+        timeframe: Timeframe of `data`
+        jobs: run_backtest keyword arguments per run (e.g. strategy_name,
+              reward_ratio); optional start_date/end_date slice the frame
+        max_workers: Pool size (default: CPU count)
+        backend: 'shm' or 'mmap'
+        indicators_ready: `data` already has Backtester indicators
+
+    Returns:
+        list: run_backtest results in job order
+    """
+    with SharedBacktestPool(data, symbol, timeframe, max_workers, backend, indicators_ready) as pool:
+        futures = [pool.submit(job) for job in jobs]
+        return [future.result() for future in futures]
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Precomputed Signal Arrays
+Evaluates a strategy at most once per bar so simulations can look signals
+up by index instead of calling the strategy inside their loop
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+from indicators import TechnicalIndicators
+from .ensemble import parse_ensemble_name, combine_signal_matrix
+
+# Backtester.run_backtest only asks for signals once 50 candles are available
+WARMUP_BARS = 50
+
+SIDES = {'long': 1, 'short': -1}
+
+def parse_ultra_simple_name(strategy_name: str):
+    """
+    (reward_ratio, trailing_ratio, reverse) encoded in an ultra_simple_strategy
+    name, parsed like Backtester._get_signal; None for other strategies
+    """
+    if strategy_name == 'ultra_simple_strategy':
+        return 3.0, 1.0, False
+    if not strategy_name.startswith('ultra_simple_strategy_'):
+        return None
+
+    reward_ratio, trailing_ratio, reverse = 3.0, 1.0, False
+    for part in strategy_name.split('_'):
+        if part.startswith('rr'):
+            try:
+                reward_ratio = float(part[2:])
+            except ValueError:
+                pass
+        elif part.startswith('trail'):
+            try:
+                trailing_ratio = float(part[5:])
+            except ValueError:
+                pass
+        elif part == 'reverse':
+            reverse = True
+    return reward_ratio, trailing_ratio, reverse
+
+def empty_signal_arrays(n: int) -> Dict[str, np.ndarray]:
+    """Arrays for n bars without any signal"""
+    return {
+        'side': np.zeros(n, dtype=np.int8),          # 1 long, -1 short, 0 no signal
+        'entry_price': np.full(n, np.nan),
+        'stop_loss': np.full(n, np.nan),
+        'take_profit': np.full(n, np.nan),
+        'trailing_trigger': np.full(n, np.nan),      # NaN = no trailing stop
+        'risk_percent': np.full(n, np.nan),          # NaN = config default
+        'confidence': np.zeros(n),
+        'strategy': np.full(n, None, dtype=object)
+    }
+
+def _ultra_simple_arrays(data: pd.DataFrame, reward_ratio: float, trailing_ratio: float, reverse: bool,
+                         warmup: int) -> Dict[str, np.ndarray]:
+    """Vectorized ultra_simple_strategy (same arithmetic as the per-bar version)"""
+    close = data['close'].to_numpy(dtype=np.float64)
+    high = data['high'].to_numpy(dtype=np.float64)
+    low = data['low'].to_numpy(dtype=np.float64)
+    n = len(close)
+    arrays = empty_signal_arrays(n)
+    if n < 2:
+        return arrays
+
+    previous_close = np.concatenate([[np.nan], close[:-1]])
+    previous_low = np.concatenate([[np.nan], low[:-1]])
+    previous_high = np.concatenate([[np.nan], high[:-1]])
+    direction = np.sign(close - previous_close)
+    direction[:max(warmup - 1, 1)] = 0
+    direction = np.nan_to_num(direction).astype(np.int8)
+    long_ = direction == 1
+
+    stop_loss = np.where(long_, previous_low, previous_high)
+    risk_per_share = np.where(long_, close - stop_loss, stop_loss - close)
+    take_profit = np.where(long_, close + (risk_per_share * reward_ratio), close - (risk_per_share * reward_ratio))
+    trigger = np.where(long_, close + (risk_per_share * trailing_ratio), close - (risk_per_share * trailing_ratio))
+
+    signal = direction != 0
+    if reverse:
+        # Direction flips and SL/TP swap; the trailing trigger is left as computed
+        direction = -direction
+        stop_loss, take_profit = take_profit, stop_loss
+
+    arrays['side'] = direction
+    arrays['entry_price'] = np.where(signal, close, np.nan)
+    arrays['stop_loss'] = np.where(signal, stop_loss, np.nan)
+    arrays['take_profit'] = np.where(signal, take_profit, np.nan)
+    if trailing_ratio > 0:
+        arrays['trailing_trigger'] = np.where(signal, trigger, np.nan)
+    arrays['risk_percent'] = np.where(signal, 1.0, np.nan)
+    arrays['confidence'] = np.where(signal, 0.5, 0.0)
+    arrays['strategy'][signal] = 'ultra_simple_strategy'
+    return arrays
+
+def _column(data: pd.DataFrame, name: str) -> np.ndarray:
+    return data[name].to_numpy(dtype=np.float64)
+
+def _strategy_arrays(n: int, long_: np.ndarray, short_: np.ndarray, close: np.ndarray, stop_loss: np.ndarray,
+                     take_profit: np.ndarray, confidence: float, strategy: str,
+                     risk_percent: Optional[float] = None) -> Dict[str, np.ndarray]:
+    """Signal arrays from long/short masks and per-bar levels"""
+    arrays = empty_signal_arrays(n)
+    signal = long_ | short_
+    arrays['side'] = np.where(long_, 1, np.where(short_, -1, 0)).astype(np.int8)
+    arrays['entry_price'] = np.where(signal, close, np.nan)
+    arrays['stop_loss'] = np.where(signal, stop_loss, np.nan)
+    arrays['take_profit'] = np.where(signal, take_profit, np.nan)
+    if risk_percent is not None:
+        arrays['risk_percent'] = np.where(signal, risk_percent, np.nan)
+    arrays['confidence'] = np.where(signal, confidence, 0.0)
+    arrays['strategy'][signal] = strategy
+    return arrays
+
+def _atr_levels(close: np.ndarray, atr: np.ndarray, long_: np.ndarray):
+    """1.5 ATR stop and 1:3 target, with the strategies' `risk > 0` guard"""
+    stop_loss = np.where(long_, close - (atr * 1.5), close + (atr * 1.5))
+    risk = np.where(long_, close - stop_loss, stop_loss - close)
+    take_profit = np.where(long_, close + (risk * 3), close - (risk * 3))
+    return stop_loss, take_profit, risk > 0
+
+def _fixed_dollar_levels(close: np.ndarray, long_: np.ndarray):
+    """$10 stop and $30 target (ema_rsi / ichimoku)"""
+    stop_loss = np.where(long_, close - 10, close + 10)
+    take_profit = np.where(long_, close + (10 * 3), close - (10 * 3))
+    return stop_loss, take_profit
+
+def _ema_rsi_arrays(data: pd.DataFrame) -> Dict[str, np.ndarray]:
+    close, ema_20, ema_50, rsi = (_column(data, c) for c in ('close', 'ema_20', 'ema_50', 'rsi'))
+    rsi_ok = (30 < rsi) & (rsi < 70)
+    long_ = (close > ema_20) & (ema_20 > ema_50) & rsi_ok
+    short_ = ~long_ & (close < ema_20) & (ema_20 < ema_50) & rsi_ok
+    stop_loss, take_profit = _fixed_dollar_levels(close, long_)
+    return _strategy_arrays(len(close), long_, short_, close, stop_loss, take_profit, 0.7,
+                            'ema_rsi_strategy', risk_percent=1.0)
+
+def _bollinger_stochastic_arrays(data: pd.DataFrame) -> Dict[str, np.ndarray]:
+    close, upper, lower, k, d, atr = (_column(data, c) for c in
+                                      ('close', 'bb_upper', 'bb_lower', 'stoch_k', 'stoch_d', 'atr'))
+    long_ = (close <= lower * 1.02) & (k < 20) & (d < 20)
+    short_ = ~long_ & (close >= upper * 0.98) & (k > 80) & (d > 80)
+    stop_loss, take_profit, valid = _atr_levels(close, atr, long_)
+    return _strategy_arrays(len(close), long_ & valid, short_ & valid, close, stop_loss, take_profit, 0.7,
+                            'bollinger_stochastic_strategy')
+
+def _macd_vwap_arrays(data: pd.DataFrame) -> Dict[str, np.ndarray]:
+    close, macd, macd_signal, vwap, atr = (_column(data, c) for c in
+                                           ('close', 'macd', 'macd_signal', 'vwap', 'atr'))
+    previous_macd = np.concatenate([[np.nan], macd[:-1]])
+    previous_signal = np.concatenate([[np.nan], macd_signal[:-1]])
+    long_ = (macd > macd_signal) & (previous_macd <= previous_signal) & (close > vwap)
+    short_ = ~long_ & (macd < macd_signal) & (previous_macd >= previous_signal) & (close < vwap)
+    stop_loss, take_profit, valid = _atr_levels(close, atr, long_)
+    return _strategy_arrays(len(close), long_ & valid, short_ & valid, close, stop_loss, take_profit, 0.7,
+                            'macd_vwap_strategy')
+
+def _ichimoku_arrays(data: pd.DataFrame) -> Dict[str, np.ndarray]:
+    close, tenkan, kijun, senkou_a, senkou_b = (_column(data, c) for c in
+                                                ('close', 'tenkan_sen', 'kijun_sen', 'senkou_span_a', 'senkou_span_b'))
+    long_ = (close > senkou_a) & (close > senkou_b) & (tenkan > kijun)
+    short_ = ~long_ & (close < senkou_a) & (close < senkou_b) & (tenkan < kijun)
+    long_[:51] = short_[:51] = False  # ichimoku_strategy needs 52 candles
+    stop_loss, take_profit = _fixed_dollar_levels(close, long_)
+    return _strategy_arrays(len(close), long_, short_, close, stop_loss, take_profit, 0.7,
+                            'ichimoku_strategy', risk_percent=1.0)
+
+def _vsa_obv_arrays(data: pd.DataFrame) -> Dict[str, np.ndarray]:
+    close, obv, atr = (_column(data, c) for c in ('close', 'obv', 'atr'))
+    volume = data['volume']
+    high_volume = (volume > volume.rolling(20).mean() * 1.5).to_numpy()
+    previous_obv = np.concatenate([np.full(4, np.nan), obv[:-4]])[:len(obv)]
+    # Recomputed from OHLCV like the strategy does (cheap rolling means), so
+    # packed or duplicated VSA flag columns don't matter
+    vsa = TechnicalIndicators.calculate_vsa_signals(data['open'], data['high'], data['low'], data['close'], volume)
+    long_ = vsa['accumulation'].to_numpy(dtype=bool) & (obv > previous_obv) & high_volume
+    short_ = ~long_ & vsa['distribution'].to_numpy(dtype=bool) & (obv < previous_obv) & high_volume
+    stop_loss, take_profit, _ = _atr_levels(close, atr, long_)
+    return _strategy_arrays(len(close), long_, short_, close, stop_loss, take_profit, 0.8, 'vsa_obv_strategy')
+
+# Strategies computable from the Backtester indicator columns in one pass, in
+# Backtester._get_signal dispatch order: (name prefix, builder, reversal keeps
+# the fixed $10 stop instead of swapping stop loss and take profit)
+VECTORIZED_STRATEGIES = (
+    ('ema_rsi', _ema_rsi_arrays, True),
+    ('bollinger_stochastic', _bollinger_stochastic_arrays, False),
+    ('macd_vwap', _macd_vwap_arrays, False),
+    ('ichimoku', _ichimoku_arrays, False),
+    ('vsa_obv', _vsa_obv_arrays, False),
+)
+
+def _reverse_arrays(arrays: Dict[str, np.ndarray], fixed_dollar_stop: bool) -> Dict[str, np.ndarray]:
+    """Backtester's reverse-signal rules applied to every bar"""
+    side = -arrays['side']
+    arrays['side'] = side
+    if fixed_dollar_stop:
+        arrays['stop_loss'] = np.where(side == 1, arrays['entry_price'] - 10, arrays['entry_price'] + 10)
+        arrays['take_profit'] = np.where(side == 1, arrays['entry_price'] + 30, arrays['entry_price'] - 30)
+    else:
+        arrays['stop_loss'], arrays['take_profit'] = arrays['take_profit'], arrays['stop_loss']
+    return arrays
+
+def vectorized_signal_arrays(data: pd.DataFrame, strategy_name: str,
+                             warmup: int = WARMUP_BARS) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Signal arrays of `strategy_name` computed with array operations, or None
+    when the strategy has to be evaluated bar by bar
+
+    Needs the Backtester indicator columns (except for ultra_simple_strategy).
+    """
+    ultra_simple = parse_ultra_simple_name(strategy_name)
+    if ultra_simple is not None:
+        return _ultra_simple_arrays(data, *ultra_simple, warmup=warmup)
+
+    for prefix, builder, fixed_dollar_stop in VECTORIZED_STRATEGIES:
+        if strategy_name == prefix or strategy_name.startswith(prefix + '_'):
+            arrays = builder(data)
+            arrays['side'][:warmup - 1] = 0
+            if strategy_name != prefix and 'reverse' in strategy_name.split('_'):
+                arrays = _reverse_arrays(arrays, fixed_dollar_stop)
+            return arrays
+    return None
+
+def signal_matrix(backtester, data: pd.DataFrame, members, timeframe: str,
+                  warmup: int = WARMUP_BARS) -> Dict[str, np.ndarray]:
+    """
+    Signals of several strategies stacked into (strategies x bars) arrays
+
+    Vectorized members share the indicator columns of `data`; the others
+    are evaluated bar by bar.
+    """
+    columns = []
+    for name in members:
+        arrays = vectorized_signal_arrays(data, name, warmup)
+        if arrays is None:
+            arrays = compute_signal_arrays(backtester, data, name, timeframe, warmup)
+        columns.append(arrays)
+    return {key: np.stack([arrays[key] for arrays in columns]) for key in columns[0]}
+
+class SignalLookup:
+    """
+    Per-bar signals of one strategy, looked up by bar index
+
+    Vectorized strategies and ensembles ('all', 'all_vote') are computed up
+    front with array operations. Other strategies are evaluated through
+    Backtester._get_signal on the candles seen so far the first time a bar is
+    asked for, then memoised, so a simulation only pays for the bars where it
+    is flat (as run_backtest does).
+    """
+
+    def __init__(self, backtester, data: pd.DataFrame, strategy_name: str, timeframe: str,
+                 warmup: int = WARMUP_BARS):
+        """
+        Args:
+            backtester: Backtester (strategy dispatch)
+            data: Frame with Backtester indicators
+            strategy_name: Backtester strategy name (e.g. 'ema_rsi_reverse')
+            timeframe: Timeframe of `data`
+            warmup: Bars before the first evaluated signal
+        """
+        self.backtester = backtester
+        self.data = data
+        self.strategy_name = strategy_name
+        self.timeframe = timeframe
+
+        ensemble = parse_ensemble_name(strategy_name)
+        if ensemble is not None:
+            config = backtester.config
+            matrix = signal_matrix(backtester, data, config.ENSEMBLE_STRATEGIES, timeframe, warmup)
+            arrays = combine_signal_matrix(matrix, ensemble, config.ENSEMBLE_MIN_VOTES)
+        else:
+            arrays = vectorized_signal_arrays(data, strategy_name, warmup)
+
+        if arrays is not None:
+            self.arrays = arrays
+            self.evaluated = np.ones(len(data), dtype=bool)
+        else:
+            self.arrays = empty_signal_arrays(len(data))
+            self.evaluated = np.zeros(len(data), dtype=bool)
+            self.evaluated[:warmup - 1] = True
+
+    def evaluate(self, i: int):
+        """Fill the arrays for bar i (no-op when already known)"""
+        if self.evaluated[i]:
+            return
+        self.evaluated[i] = True
+        signal = self.backtester._get_signal(self.data.iloc[:i + 1], self.strategy_name, self.timeframe)
+        side = SIDES.get(signal.get('signal'))
+        if side is None:
+            return
+        arrays = self.arrays
+        arrays['side'][i] = side
+        arrays['entry_price'][i] = signal['entry_price']
+        arrays['stop_loss'][i] = signal['stop_loss']
+        arrays['take_profit'][i] = signal.get('take_profit', np.nan)
+        if signal.get('trailing_trigger') is not None:
+            arrays['trailing_trigger'][i] = signal['trailing_trigger']
+        if 'account_risk_percent' in signal:
+            arrays['risk_percent'][i] = signal['account_risk_percent']
+        arrays['confidence'][i] = signal.get('confidence', 0.0)
+        arrays['strategy'][i] = signal.get('strategy', self.strategy_name)
+
+    def side(self, i: int) -> int:
+        """1 long, -1 short, 0 no signal at bar i"""
+        self.evaluate(i)
+        return int(self.arrays['side'][i])
+
+    def value(self, key: str, i: int):
+        """Signal field at bar i (NaN/None when absent)"""
+        self.evaluate(i)
+        return self.arrays[key][i]
+
+    def signal(self, i: int) -> Dict:
+        """Bar i as a signal dict, in the shape Backtester._get_signal returns"""
+        side = self.side(i)
+        if side == 0:
+            return {'signal': 'no_signal'}
+        arrays = self.arrays
+        signal = {
+            'signal': 'long' if side == 1 else 'short',
+            'entry_price': float(arrays['entry_price'][i]),
+            'stop_loss': float(arrays['stop_loss'][i]),
+            'take_profit': float(arrays['take_profit'][i]),
+            'strategy': arrays['strategy'][i],
+            'confidence': float(arrays['confidence'][i])
+        }
+        if not np.isnan(arrays['trailing_trigger'][i]):
+            signal['trailing_trigger'] = float(arrays['trailing_trigger'][i])
+        if not np.isnan(arrays['risk_percent'][i]):
+            signal['account_risk_percent'] = float(arrays['risk_percent'][i])
+        return signal
+
+def compute_signal_arrays(backtester, data: pd.DataFrame, strategy_name: str, timeframe: str,
+                          warmup: int = WARMUP_BARS) -> Dict[str, np.ndarray]:
+    """
+    Signal of `strategy_name` at every bar of `data` (see SignalLookup)
+
+    Returns:
+        dict: Arrays keyed like the signal dicts (side, entry_price, stop_loss,
+              take_profit, trailing_trigger, risk_percent, confidence, strategy)
+    """
+    lookup = SignalLookup(backtester, data, strategy_name, timeframe, warmup)
+    for i in range(len(data)):
+        lookup.evaluate(i)
+    return lookup.arrays
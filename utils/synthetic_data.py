@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Synthetic Market Data
+Seeded, network-free candles for benchmarks and scaling tests: regime-switching
+GBM with stochastic (clustered) volatility, fat-tailed returns, occasional
+gaps and volatility-linked volume with an intraday cycle
+"""
+
+import zlib
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Union
+from config import TradingConfig
+
+# Annualised drift and volatility of each market regime
+DEFAULT_REGIMES = {
+    'bull': {'drift': 0.8, 'volatility': 0.7},
+    'bear': {'drift': -0.6, 'volatility': 1.0},
+    'range': {'drift': 0.0, 'volatility': 0.45},
+}
+
+MINUTES_PER_YEAR = 365 * 1440
+BLOCK_BARS = 16384
+BINANCE_MAX_LIMIT = 1000
+
+class SyntheticMarket:
+    """
+    Deterministic candles for any symbol and timeframe
+
+    Bars are counted from `start_date` and generated in fixed blocks, each
+    seeded by (seed, symbol, timeframe, block), so a candle only depends on
+    those and on its position: any window of a series (and any series
+    length) shows the same candles. Different timeframes of one symbol are
+    independent paths, not resamples of each other.
+
+    Besides candles() it answers ccxt's fetch_ohlcv, so
+    DataFetcher(exchange=SyntheticMarket()).get_ohlcv(...) returns exactly
+    what the live fetcher does.
+    """
+
+    def __init__(self, seed: int = 0, start_date: datetime = datetime(2024, 1, 1),
+                 start_price: Union[float, Dict[str, float]] = 100.0, regimes: Optional[Dict] = None,
+                 regime_days: float = 20.0, volatility_scale: float = 1.0, vol_of_vol: float = 0.5,
+                 vol_half_life_hours: float = 24.0, tail_df: float = 4.0, gap_probability: float = 0.0005,
+                 gap_size: float = 4.0, daily_volume: float = 1e6, volume_noise: float = 0.35,
+                 volume_elasticity: float = 1.0, tick_size: Optional[float] = None):
+        """
+        Args:
+            seed: Base seed; the same seed and arguments always give the same candles
+            start_date: Open time of each series' first bar
+            start_price: First open, for every symbol or by symbol
+            regimes: {name: {'drift', 'volatility'}} (annualised); one regime = plain GBM
+            regime_days: Mean regime length (geometric); a regime always hands over to another one
+            volatility_scale: Multiplies every regime's volatility (e.g. 0.6 for BTC-like, 1.5 for alts)
+            vol_of_vol: Std of log volatility (0 = constant volatility within a regime)
+            vol_half_life_hours: Half-life of volatility shocks (the clustering)
+            tail_df: Student-t degrees of freedom of the returns (None = normal)
+            gap_probability: Chance per bar that the open jumps away from the previous close
+            gap_size: Gap std in multiples of the bar volatility
+            daily_volume: Mean base-asset volume per day
+            volume_noise: Std of log volume noise
+            volume_elasticity: How strongly volume follows volatility and return size
+            tick_size: Round prices to this tick (None = unrounded)
+        """
+        self.seed = seed
+        self.start_date = pd.Timestamp(start_date)
+        self.start_price = start_price
+        self.regimes = list((regimes or DEFAULT_REGIMES).values())
+        self.regime_days = regime_days
+        self.volatility_scale = volatility_scale
+        self.vol_of_vol = vol_of_vol
+        self.vol_half_life_hours = vol_half_life_hours
+        self.tail_df = tail_df
+        self.gap_probability = gap_probability
+        self.gap_size = gap_size
+        self.daily_volume = daily_volume
+        self.volume_noise = volume_noise
+        self.volume_elasticity = volume_elasticity
+        self.tick_size = tick_size
+        # (symbol, timeframe) -> path state at the start of each generated block
+        self._block_states = {}
+
+    @staticmethod
+    def _symbol_key(symbol: str) -> str:
+        """'BTC/USDT' and 'BTCUSDT' are the same market"""
+        return symbol.replace('/', '').upper()
+
+    def _minutes(self, timeframe: str) -> int:
+        if timeframe not in TradingConfig.TIMEFRAME_MINUTES:
+            raise ValueError(f"Unknown timeframe {timeframe}")
+        return TradingConfig.TIMEFRAME_MINUTES[timeframe]
+
+    def _initial_state(self, symbol: str) -> Dict:
+        start_price = self.start_price
+        if isinstance(start_price, dict):
+            start_price = start_price.get(symbol, 100.0)
+        return {'close': float(start_price), 'log_vol': 0.0, 'regime': None, 'remaining': 0}
+
+    def _generate_block(self, symbol: str, timeframe: str, block: int, state: Dict):
+        """Candle arrays of one block and the state the next block starts from"""
+        minutes = self._minutes(timeframe)
+        bars = BLOCK_BARS
+        seed_sequence = np.random.SeedSequence([self.seed, zlib.crc32(symbol.encode()), minutes, block])
+        # Regime draws vary in number, so they get their own stream
+        regime_rng, rng = (np.random.default_rng(child) for child in seed_sequence.spawn(2))
+
+        # Regime of every bar: geometric durations, each regime followed by a different one
+        regime_of_bar = np.empty(bars, dtype=np.int64)
+        regime, remaining = state['regime'], state['remaining']
+        mean_bars = max(self.regime_days * 1440 / minutes, 1.0)
+        position = 0
+        while position < bars:
+            if remaining == 0:
+                choices = [index for index in range(len(self.regimes)) if index != regime] or [0]
+                regime = int(regime_rng.choice(choices))
+                remaining = int(regime_rng.geometric(1 / mean_bars))
+            taken = min(remaining, bars - position)
+            regime_of_bar[position:position + taken] = regime
+            position += taken
+            remaining -= taken
+        drift = np.array([regime_params['drift'] for regime_params in self.regimes])[regime_of_bar]
+        volatility = np.array([regime_params['volatility'] for regime_params in self.regimes])[regime_of_bar]
+
+        # Log volatility as a stationary AR(1) around 0 with std vol_of_vol
+        half_life_bars = max(self.vol_half_life_hours * 60 / minutes, 1e-9)
+        phi = 0.5 ** (1 / half_life_bars)
+        shocks = rng.standard_normal(bars) * self.vol_of_vol * np.sqrt(1 - phi * phi)
+        log_vol = np.empty(bars)
+        level = state['log_vol']
+        for i, shock in enumerate(shocks.tolist()):
+            level = phi * level + shock
+            log_vol[i] = level
+
+        # Bar volatility; exp(x - vol_of_vol²) keeps the mean variance at the regime's
+        dt = minutes / MINUTES_PER_YEAR
+        sigma = volatility * self.volatility_scale * np.sqrt(dt) * np.exp(log_vol - self.vol_of_vol ** 2)
+        if self.tail_df:
+            # Unit-variance Student-t
+            z = rng.standard_t(self.tail_df, bars) / np.sqrt(self.tail_df / (self.tail_df - 2))
+        else:
+            z = rng.standard_normal(bars)
+        returns = drift * dt - 0.5 * sigma ** 2 + sigma * z
+
+        gaps = np.where(rng.random(bars) < self.gap_probability,
+                        rng.standard_normal(bars) * sigma * self.gap_size, 0.0)
+        # Each open continues from the previous close (plus the gap)
+        log_close = np.log(state['close']) + np.cumsum(gaps + returns)
+        close = np.exp(log_close)
+        open_ = np.exp(log_close - returns)
+        # Wicks beyond the body, about as long as the bar's own volatility
+        high = np.maximum(open_, close) * np.exp(sigma * rng.exponential(0.5, bars))
+        low = np.minimum(open_, close) * np.exp(-sigma * rng.exponential(0.5, bars))
+
+        # Volume follows volatility, return size and the time of day
+        times = self.start_date + pd.to_timedelta((block * bars + np.arange(bars)) * minutes, unit='m')
+        hours = times.hour.to_numpy() + times.minute.to_numpy() / 60
+        session = 1 + 0.3 * np.cos(2 * np.pi * (hours - 14) / 24)
+        activity = self.volume_elasticity * (log_vol + 0.5 * np.abs(z))
+        noise = rng.standard_normal(bars) * self.volume_noise
+        volume = (self.daily_volume * minutes / 1440) * session * np.exp(
+            activity - activity.mean() + noise - self.volume_noise ** 2 / 2
+        )
+
+        next_state = {'close': float(close[-1]), 'log_vol': level, 'regime': regime, 'remaining': remaining}
+        return {'time': times, 'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume}, next_state
+
+    def _block_state(self, symbol: str, timeframe: str, block: int) -> Dict:
+        """Path state at the start of a block (earlier blocks are generated once to get it)"""
+        states = self._block_states.setdefault((symbol, timeframe), [self._initial_state(symbol)])
+        while len(states) <= block:
+            _, next_state = self._generate_block(symbol, timeframe, len(states) - 1, states[-1])
+            states.append(next_state)
+        return states[block]
+
+    def _bar_index(self, timeframe: str, date) -> int:
+        """Bars between start_date and the first bar opening at or after `date`"""
+        offset = (pd.Timestamp(date) - self.start_date) / timedelta(minutes=self._minutes(timeframe))
+        return max(int(np.ceil(offset)), 0)
+
+    def candles(self, symbol: str, timeframe: str, n_bars: Optional[int] = None, start_date=None,
+                end_date=None, first_bar: Optional[int] = None, with_indicators: bool = False) -> pd.DataFrame:
+        """
+        OHLCV candles, indexed by open time ('timestamp') like DataFetcher.get_ohlcv
+
+        Args:
+            n_bars: Number of candles (from start_date, or first_bar)
+            start_date: First candle opening at or after this time (default: the market's start)
+            end_date: Last candle opens before this time (instead of n_bars)
+            first_bar: Bar position to start from (instead of start_date)
+            with_indicators: Add DataFetcher's indicators (and compact the frame when
+                             TradingConfig.COMPACT_FRAMES is on), as get_ohlcv does
+
+        Returns:
+            DataFrame: Candles (empty when the range is)
+        """
+        symbol = self._symbol_key(symbol)
+        if first_bar is None:
+            first_bar = 0 if start_date is None else self._bar_index(timeframe, start_date)
+        if end_date is not None:
+            stop = self._bar_index(timeframe, end_date)
+        elif n_bars is not None:
+            stop = first_bar + n_bars
+        else:
+            raise ValueError("candles needs n_bars or end_date")
+
+        parts = []
+        blocks = range(first_bar // BLOCK_BARS, (stop - 1) // BLOCK_BARS + 1) if stop > first_bar else []
+        for block in blocks:
+            columns, next_state = self._generate_block(symbol, timeframe, block,
+                                                       self._block_state(symbol, timeframe, block))
+            states = self._block_states[(symbol, timeframe)]
+            if len(states) == block + 1:
+                states.append(next_state)
+            block_start = block * BLOCK_BARS
+            window = slice(max(first_bar - block_start, 0), min(stop - block_start, BLOCK_BARS))
+            parts.append({name: values[window] for name, values in columns.items()})
+
+        if not parts:
+            data = pd.DataFrame(columns=['open', 'high', 'low', 'close', 'volume'], dtype=np.float64,
+                                index=pd.DatetimeIndex([], dtype='datetime64[ns]', name='timestamp'))
+        else:
+            index = pd.DatetimeIndex(np.concatenate([part['time'].to_numpy() for part in parts]), name='timestamp').as_unit('ns')
+            data = pd.DataFrame({
+                name: np.concatenate([part[name] for part in parts])
+                for name in ['open', 'high', 'low', 'close', 'volume']
+            }, index=index)
+            if self.tick_size:
+                # Rounding is monotonic, so high/low still bound open/close
+                for name in ['open', 'high', 'low', 'close']:
+                    data[name] = np.round(data[name] / self.tick_size) * self.tick_size
+
+        if with_indicators:
+            from utils.data_fetcher import DataFetcher
+            from utils.compact_frame import compact_frame
+
+            fetcher = DataFetcher(exchange=self)
+            data = fetcher._add_indicators(data)
+            if fetcher.config.COMPACT_FRAMES:
+                data = compact_frame(data)
+        return data
+
+    def markets(self, symbols: Iterable[str], timeframe: str, n_bars: Optional[int] = None, start_date=None,
+                end_date=None, with_indicators: bool = False) -> Dict[str, pd.DataFrame]:
+        """candles() of several symbols over the same bars"""
+        return {
+            symbol: self.candles(symbol, timeframe, n_bars, start_date, end_date, with_indicators=with_indicators)
+            for symbol in symbols
+        }
+
+    def fill_store(self, store, symbols: Iterable[str], timeframe: str, n_bars: int,
+                   chunk_bars: int = 262144) -> int:
+        """
+        Append n_bars candles per symbol to a utils.candle_store.CandleStore, chunk
+        by chunk (continuing after what the store already holds)
+
+        Returns:
+            int: Rows written
+        """
+        written = 0
+        for symbol in symbols:
+            first_bar = store.rows(symbol, timeframe)
+            for chunk_start in range(first_bar, n_bars, chunk_bars):
+                chunk = self.candles(symbol, timeframe, min(chunk_bars, n_bars - chunk_start), first_bar=chunk_start)
+                written += store.append(symbol, timeframe, chunk)
+        return written
+
+    def fetch_ohlcv(self, symbol: str, timeframe: str = '1m', since: Optional[int] = None,
+                    limit: Optional[int] = None, params: Optional[Dict] = None) -> List[list]:
+        """
+        ccxt-style [[ms, open, high, low, close, volume], ...]: `limit` candles from
+        `since` (ms), or the latest ones up to now; at most 1000 like Binance
+        """
+        limit = min(limit or 500, BINANCE_MAX_LIMIT)
+        if since is None:
+            stop = self._bar_index(timeframe, pd.Timestamp.now('UTC').tz_localize(None)) + 1
+            first_bar = max(stop - limit, 0)
+        else:
+            first_bar = self._bar_index(timeframe, pd.Timestamp(since, unit='ms'))
+        data = self.candles(symbol, timeframe, limit, first_bar=first_bar)
+        times = data.index.as_unit('ms').asi8
+        return [
+            [int(ms), float(o), float(h), float(l), float(c), float(v)]
+            for ms, o, h, l, c, v in zip(times, data['open'], data['high'], data['low'], data['close'], data['volume'])
+        ]
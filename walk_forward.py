@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Walk-Forward Optimization
+Optimizes a parameter grid on each in-sample window, validates the winner on
+the following out-of-sample window and stitches the out-of-sample equity
+"""
+
+import sys
+import argparse
+import itertools
+import logging
+import pandas as pd
+from datetime import datetime
+from typing import Dict, List, Optional
+from utils.shared_frames import SharedBacktestPool, run_shared_backtest
+
+# Backtester.run_backtest only trades once 50 candles are available
+WARMUP_BARS = 50
+
+# Objectives that grow with the window length; efficiency compares them per day
+CUMULATIVE_OBJECTIVES = frozenset({'total_return', 'total_pnl', 'total_trades', 'winning_trades', 'losing_trades'})
+
+DAY = pd.Timedelta(days=1)
+
+def expand_grid(param_grid) -> List[Dict]:
+    """
+    Parameter combinations from a grid
+
+    Args:
+        param_grid: dict of run_backtest argument -> list of values, or a list
+                    of ready-made parameter dicts
+
+    Returns:
+        list: One dict of run_backtest keyword arguments per combination
+    """
+    if isinstance(param_grid, (list, tuple)):
+        return [dict(params) for params in param_grid]
+    names = list(param_grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(param_grid[name] for name in names))]
+
+def walk_forward_windows(index: pd.DatetimeIndex, in_sample: str, out_of_sample: str,
+                         step: Optional[str] = None, anchored: bool = False,
+                         warmup_bars: int = WARMUP_BARS) -> List[Dict]:
+    """
+    In-sample / out-of-sample splits over a candle index
+
+    Args:
+        index: Candle open times
+        in_sample: In-sample length (pandas offset, e.g. '14D')
+        out_of_sample: Out-of-sample length (e.g. '7D')
+        step: Shift between windows (default: out_of_sample); shorter than
+              out_of_sample is rejected, since overlapping out-of-sample
+              windows would count the same trades twice when stitched
+        anchored: Keep every in-sample window starting at the first candle
+        warmup_bars: Candles run_backtest skips before trading; each window's
+                     slice starts this many bars early when history allows,
+                     so trading starts at the window start
+
+    Returns:
+        list: Windows with in-sample/out-of-sample bounds (inclusive labels),
+              the slice start (`*_from`) to pass to run_backtest and the
+              length each covers in days (`*_days`)
+    """
+    in_sample = pd.Timedelta(in_sample)
+    out_of_sample = pd.Timedelta(out_of_sample)
+    step = pd.Timedelta(step) if step else out_of_sample
+    if step < out_of_sample:
+        raise ValueError(f"step {step} is shorter than the out-of-sample length {out_of_sample}; "
+                         f"out-of-sample windows would overlap")
+    if len(index) == 0:
+        return []
+
+    def first_bar(time):
+        return int(index.searchsorted(time, side='left'))
+
+    def slice_from(position):
+        return index[max(position - (warmup_bars - 1), 0)]
+
+    windows = []
+    origin = index[0]
+    start = origin
+    while True:
+        is_start = origin if anchored else start
+        oos_start = start + in_sample
+        oos_end = oos_start + out_of_sample
+        # Only complete out-of-sample windows
+        if oos_end > index[-1]:
+            break
+
+        is_first, oos_first, oos_stop = first_bar(is_start), first_bar(oos_start), first_bar(oos_end)
+        if oos_stop > oos_first and oos_first > is_first:
+            windows.append({
+                'window': len(windows) + 1,
+                'is_start': index[is_first],
+                'is_end': index[oos_first - 1],
+                'is_from': slice_from(is_first),
+                'oos_start': index[oos_first],
+                'oos_end': index[oos_stop - 1],
+                'oos_from': slice_from(oos_first),
+                'is_days': (index[oos_first] - index[is_first]) / DAY,
+                'oos_days': (oos_end - index[oos_first]) / DAY
+            })
+        start += step
+    return windows
+
+def _score(results: Optional[Dict], objective) -> float:
+    if not results:
+        return float('-inf')
+    if callable(objective):
+        return float(objective(results))
+    if objective in results:
+        return float(results[objective])
+    return float(results['metrics'].get(objective, float('-inf')))
+
+def _in_sample_job(symbol: str, timeframe: str, job: Dict, objective) -> Dict:
+    """Worker side: score one in-sample run without shipping trades/equity back"""
+    results = run_shared_backtest(symbol, timeframe, job)
+    return {
+        'score': _score(results, objective),
+        'total_trades': results['metrics']['total_trades'] if results else 0,
+        'total_return': results['total_return'] if results else 0.0
+    }
+
+class WalkForward:
+    """Rolling or anchored walk-forward optimization on top of Backtester"""
+
+    def __init__(self, backtester=None, max_workers: Optional[int] = None, backend: str = 'shm'):
+        """
+        Args:
+            backtester: Backtester used for fetching data and stitched metrics
+            max_workers: Process pool size for in-sample grids (default: CPU count)
+            backend: Shared frame backend ('shm' or 'mmap')
+        """
+        if backtester is None:
+            from backtest import Backtester
+            backtester = Backtester()
+        self.backtester = backtester
+        self.max_workers = max_workers
+        self.backend = backend
+
+    def run(self, symbol: str, timeframe: str, param_grid, in_sample: str, out_of_sample: str,
+            step: Optional[str] = None, anchored: bool = False, objective='total_return',
+            min_trades: int = 1, initial_balance: float = 10000, data: Optional[pd.DataFrame] = None,
+            start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+            **backtest_kwargs) -> Optional[Dict]:
+        """
+        Run walk-forward optimization for one symbol
+
+        Indicators are computed once over the whole history and shared with
+        the pool, so overlapping windows reuse them. Every window's in-sample
+        grid is queued at once, then the winners run out-of-sample.
+
+        Args:
+            symbol: Trading symbol
+            timeframe: Candle timeframe
+            param_grid: See expand_grid (e.g. {'strategy_name': [...], 'reward_ratio': [...]})
+            in_sample / out_of_sample / step / anchored: See walk_forward_windows
+            objective: results or metrics key to maximise, or a picklable
+                       function of run_backtest results (CUMULATIVE_OBJECTIVES
+                       are compared per day in the efficiency)
+            min_trades: In-sample runs with fewer trades are not eligible
+            initial_balance: Balance every window starts with
+            data: Pre-loaded OHLCV DataFrame (optional, skips fetching)
+            start_date / end_date: History to fetch when `data` is not given
+            **backtest_kwargs: Fixed run_backtest arguments (e.g. no_fees=True)
+
+        Returns:
+            dict: windows, stitched out-of-sample trades/equity and metrics
+        """
+        if data is None:
+            data = self.backtester._fetch_historical_data(symbol, start_date, end_date, timeframe)
+        if data is None or data.empty:
+            logging.error(f"No historical data available for {symbol} {timeframe}")
+            return None
+
+        windows = walk_forward_windows(data.index, in_sample, out_of_sample, step, anchored)
+        if not windows:
+            logging.error(f"Not enough {symbol} {timeframe} history for {in_sample} + {out_of_sample} windows")
+            return None
+        combinations = expand_grid(param_grid)
+        base_job = dict(backtest_kwargs, initial_balance=initial_balance)
+        logging.info(f"Walk-forward {symbol} {timeframe}: {len(windows)} windows x {len(combinations)} combinations")
+
+        with SharedBacktestPool(data, symbol, timeframe, self.max_workers, self.backend) as pool:
+            in_sample_futures = [
+                [pool.submit(dict(base_job, **params, start_date=window['is_from'], end_date=window['is_end']),
+                             _in_sample_job, objective)
+                 for params in combinations]
+                for window in windows
+            ]
+
+            for window, futures in zip(windows, in_sample_futures):
+                scores = [future.result() for future in futures]
+                eligible = [j for j, score in enumerate(scores) if score['total_trades'] >= min_trades]
+                best = max(eligible, key=lambda j: scores[j]['score']) if eligible else None
+                window['params'] = combinations[best] if best is not None else None
+                window['is_score'] = scores[best]['score'] if best is not None else None
+                window['is_trades'] = scores[best]['total_trades'] if best is not None else 0
+
+            out_of_sample_futures = [
+                pool.submit(dict(base_job, **window['params'], start_date=window['oos_from'], end_date=window['oos_end']))
+                if window['params'] is not None else None
+                for window in windows
+            ]
+            out_of_sample_results = [future.result() if future else None for future in out_of_sample_futures]
+
+        return self._stitch(windows, out_of_sample_results, initial_balance, objective)
+
+    def _stitch(self, windows: List[Dict], out_of_sample_results: List[Optional[Dict]],
+                initial_balance: float, objective) -> Dict:
+        """Chain out-of-sample windows into one trade list and equity curve"""
+        trades = []
+        equity_curve = []
+        # Fixed-R sizing does not compound, so windows chain by adding their PnL
+        offset = 0.0
+        savings = 0.0
+        for window, results in zip(windows, out_of_sample_results):
+            window['oos_score'] = _score(results, objective) if results else None
+            window['oos_trades'] = results['metrics']['total_trades'] if results else 0
+            window['oos_return'] = results['total_return'] if results else 0.0
+            if not results:
+                continue
+            trades.extend(results['trades'])
+            for point in results['equity_curve']:
+                equity_curve.append(dict(point, balance=point['balance'] + offset))
+            offset += results['final_balance'] - initial_balance
+            savings += results['savings_account']
+
+        metrics = self.backtester._calculate_metrics(trades, initial_balance, equity_curve)
+        scored = [w for w in windows if w['is_score'] is not None and w['oos_score'] is not None]
+        # In-sample windows are longer than out-of-sample ones (and grow when
+        # anchored), so cumulative objectives are compared per day
+        per_day = not callable(objective) and objective in CUMULATIVE_OBJECTIVES
+
+        def mean_score(side):
+            if not scored:
+                return 0
+            return sum(w[f'{side}_score'] / w[f'{side}_days'] if per_day else w[f'{side}_score']
+                       for w in scored) / len(scored)
+
+        is_mean = mean_score('is')
+        oos_mean = mean_score('oos')
+        return {
+            'windows': windows,
+            'trades': trades,
+            'equity_curve': equity_curve,
+            'metrics': metrics,
+            'final_balance': initial_balance + offset,
+            'savings_account': savings,
+            'total_wealth': initial_balance + offset + savings,
+            'total_return': offset / initial_balance * 100,
+            # Out-of-sample vs in-sample objective (per day when cumulative); near 1 means the optimum carried over
+            'efficiency': oos_mean / is_mean if is_mean else 0
+        }
+
+def print_walk_forward(symbol: str, timeframe: str, results: Dict):
+    """Print the per-window table and the stitched out-of-sample summary"""
+    print(f"\n🚶 WALK-FORWARD: {symbol} {timeframe}")
+    print("=" * 100)
+    print(f"{'#':<4}{'In-sample':<25}{'Out-of-sample':<25}{'IS':>9}{'OOS':>9}{'Trades':>8}  Params")
+    print("-" * 100)
+    for window in results['windows']:
+        is_range = f"{window['is_start']:%m-%d %H:%M}→{window['is_end']:%m-%d %H:%M}"
+        oos_range = f"{window['oos_start']:%m-%d %H:%M}→{window['oos_end']:%m-%d %H:%M}"
+        is_score = f"{window['is_score']:.2f}" if window['is_score'] is not None else 'n/a'
+        oos_score = f"{window['oos_score']:.2f}" if window['oos_score'] is not None else 'n/a'
+        print(f"{window['window']:<4}{is_range:<25}{oos_range:<25}{is_score:>9}{oos_score:>9}"
+              f"{window['oos_trades']:>8}  {window['params']}")
+    metrics = results['metrics']
+    print("-" * 100)
+    print(f"📈 Out-of-sample return: {results['total_return']:.2f}% | Savings: ${results['savings_account']:,.2f} | "
+          f"Total wealth: ${results['total_wealth']:,.2f}")
+    print(f"🎯 Trades: {metrics['total_trades']} | Win rate: {metrics['win_rate']:.2f}% | "
+          f"Max DD: {metrics['max_drawdown']:.2f}% | Profit factor: {metrics['profit_factor']:.2f}")
+    print(f"⚖️  Walk-forward efficiency: {results['efficiency']:.2f}")
+
+def _parse_values(value):
+    values = []
+    for part in value.split(','):
+        try:
+            values.append(float(part))
+        except ValueError:
+            values.append(part)
+    return values
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Walk-forward optimization of backtest parameters')
+    parser.add_argument('timeframe', help='Timeframe (5m, 15m, 30m, 1h, 2h, 4h)')
+    parser.add_argument('--symbols', default='SUIUSDT', help='Comma-separated symbols (e.g., SUIUSDT,BTCUSDT)')
+    parser.add_argument('--start_date', default='2025-06-01', help='Start date (YYYY-MM-DD)')
+    parser.add_argument('--end_date', default='2025-08-22', help='End date (YYYY-MM-DD)')
+    parser.add_argument('--balance', type=float, default=10000, help='Initial balance per window')
+    parser.add_argument('--strategies', default='ultra_simple_strategy', help='Comma-separated strategy names')
+    parser.add_argument('--reward_ratios', default='1.0,2.0,3.0', help='Comma-separated reward ratios')
+    parser.add_argument('--in_sample', default='14D', help='In-sample length (e.g., 14D, 30D)')
+    parser.add_argument('--out_of_sample', default='7D', help='Out-of-sample length (e.g., 7D)')
+    parser.add_argument('--step', default=None, help='Window shift (default: out-of-sample length)')
+    parser.add_argument('--anchored', type=int, choices=[0, 1], default=0, help='Anchored in-sample windows (0=rolling, 1=anchored)')
+    parser.add_argument('--objective', default='total_return', help='Metric to maximise (total_return, sharpe_ratio, profit_factor, ...)')
+    parser.add_argument('--min_trades', type=int, default=5, help='Minimum in-sample trades for a combination to qualify')
+    parser.add_argument('--no_fees', type=int, choices=[0, 1], default=0, help='Disable trading fees (0=normal fees, 1=no fees)')
+    parser.add_argument('--workers', type=int, default=None, help='Process pool size (default: CPU count)')
+    parser.add_argument('--base_timeframe', default=None, help='Derive the timeframe from cached candles of this timeframe (e.g., 5m)')
+    parser.add_argument('--output', default=None, help='CSV file for the per-window table')
+
+    if len(sys.argv) < 2:
+        parser.print_help()
+        print("\n📝 Examples:")
+        print("   python walk_forward.py 5m --symbols SUIUSDT --in_sample 14D --out_of_sample 7D")
+        print("   python walk_forward.py 1h --symbols SUIUSDT,BTCUSDT --strategies ema_rsi,ultra_simple_strategy --anchored 1")
+        return
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    from backtest import Backtester
+    walk_forward = WalkForward(Backtester(base_timeframe=args.base_timeframe), max_workers=args.workers)
+    param_grid = {
+        'strategy_name': args.strategies.split(','),
+        'reward_ratio': _parse_values(args.reward_ratios)
+    }
+
+    rows = []
+    for symbol in args.symbols.split(','):
+        results = walk_forward.run(
+            symbol, args.timeframe, param_grid, args.in_sample, args.out_of_sample,
+            step=args.step,
+            anchored=bool(args.anchored),
+            objective=args.objective,
+            min_trades=args.min_trades,
+            initial_balance=args.balance,
+            start_date=datetime.strptime(args.start_date, '%Y-%m-%d'),
+            end_date=datetime.strptime(args.end_date, '%Y-%m-%d'),
+            no_fees=bool(args.no_fees)
+        )
+        if results is None:
+            print(f"❌ {symbol}: walk-forward failed")
+            continue
+        print_walk_forward(symbol, args.timeframe, results)
+        rows.extend(dict(window, symbol=symbol) for window in results['windows'])
+
+    if args.output and rows:
+        pd.DataFrame(rows).to_csv(args.output, index=False)
+        print(f"\n💾 Windows saved to {args.output}")
+
+if __name__ == "__main__":
+    main()